@@ -9,9 +9,10 @@ from food_project.database.sqlite_connector import get_connection
 from food_project.database.nutritionix_service import get_nutrition_data
 from food_project.database.sqlite_connector import save_recipe_and_ingredients
 from food_project.ingestion.parse_recipe_url import parse_recipe
-from food_project.ui.review_log_viewer import show_review_log
-from food_project.ui.review_matches_app import get_fuzzy_matches
+from food_project.ui.review_log_viewer import show_call_metrics, show_review_log
+from food_project.ui.review_matches_app import show_review_matches
 from food_project.processing.ingredient_updater import update_ingredients
+from food_project.ui.progress_view import streamlit_reporter
 from food_project.ingestion.match_ingredients_to_food_info import match_ingredients
 
 # Title banner for environment
@@ -72,7 +73,7 @@ with tab1:
                 recipe_id = save_recipe_and_ingredients(recipe_data)
                 st.success(f"✅ Added '{recipe_data['title']}' to the database.")
                 st.write("🚀 Calling update_ingredients")
-                update_ingredients(force=True)
+                update_ingredients(force=True, progress=streamlit_reporter())
                 match_ingredients()
                 st.rerun()
             except Exception as e:
@@ -142,7 +143,7 @@ with tab1:
 
         if raw_ingredient_count > 0:
             st.warning("🔄 Some ingredients are unparsed — running updater...")
-            update_ingredients(force=True)
+            update_ingredients(force=True, progress=streamlit_reporter())
             match_ingredients()
 
         # Pull parsed ingredients
@@ -233,18 +234,10 @@ with tab1:
 
 with tab2:
     st.markdown("## 🧪 Review Fuzzy Matches")
-    matches = get_fuzzy_matches()
-    if not matches:
-        st.success("✅ No fuzzy matches to review.")
-    else:
-        for row in matches[:20]:
-            with st.expander(f"{row['raw_name']} → {row['matched_food']}"):
-                st.markdown(f"- **Normalized:** `{row['normalized_name']}`")
-                st.markdown(f"- **Fuzz Score:** `{row['fuzz_score']}`")
-                st.markdown(f"- **Match Type:** `{row['match_type']}`")
-        st.info("More detailed review available via CLI or future admin tab.")
+    show_review_matches()
 
     st.markdown("---")
     st.markdown("## 🧾 Ingredient Parsing Logs")
     show_review_log()
+    show_call_metrics()
 
@@ -0,0 +1,113 @@
+"""Buffered, checkpointed SQLite writes for long pipeline runs."""
+
+import re
+import sqlite3
+import time
+from typing import Dict, List, Sequence
+
+from .food_info_cache import food_info_cache
+
+# Flush once this many statements are buffered ...
+DEFAULT_BATCH_ROWS = 200
+# ... or once this many seconds have passed since the last checkpoint.
+DEFAULT_BATCH_SECONDS = 5.0
+
+# Statements whose checkpoint must invalidate ``food_info_cache``
+_FOOD_INFO_WRITE = re.compile(
+    r"\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+food_info\b", re.I
+)
+
+
+class BatchWriter:
+    """Collect write statements and apply them in periodic checkpoints.
+
+    Statements are grouped by SQL text and sent with ``executemany``
+    inside a savepoint, then committed.  A checkpoint happens every
+    ``batch_rows`` statements or ``batch_seconds`` seconds, whichever
+    comes first, so a long run pays one fsync per batch instead of one
+    per row and only holds the write lock while a batch is applied.
+    Groups are applied in the order their SQL was first seen.  A
+    checkpoint that writes to ``food_info`` invalidates the connection's
+    ``food_info_cache`` entries.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_rows: int = DEFAULT_BATCH_ROWS,
+                 batch_seconds: float = DEFAULT_BATCH_SECONDS):
+        self.conn = conn
+        self.batch_rows = max(1, batch_rows)
+        self.batch_seconds = batch_seconds
+        self._pending: Dict[str, List[Sequence]] = {}
+        self._pending_rows = 0
+        self._last_checkpoint = time.monotonic()
+        self.checkpoints = 0
+        self.rows_written = 0
+
+    def add(self, sql: str, params: Sequence) -> None:
+        """Queue one statement; may trigger a checkpoint."""
+        self._pending.setdefault(sql, []).append(params)
+        self._pending_rows += 1
+        self.maybe_checkpoint()
+
+    @property
+    def pending(self) -> int:
+        return self._pending_rows
+
+    def maybe_checkpoint(self) -> None:
+        """Checkpoint if the row or time threshold has been reached."""
+        if not self._pending_rows:
+            return
+        elapsed = time.monotonic() - self._last_checkpoint
+        if self._pending_rows >= self.batch_rows or elapsed >= self.batch_seconds:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Apply every buffered statement and commit.
+
+        If applying or committing fails, the batch is rolled back and
+        dropped before the error is re-raised, so a later checkpoint does
+        not retry (and fail on) the same statements.
+        """
+        self._last_checkpoint = time.monotonic()
+        if not self._pending_rows:
+            return
+
+        cur = self.conn.cursor()
+        try:
+            cur.execute("SAVEPOINT batch_writer")
+            try:
+                for sql, rows in self._pending.items():
+                    cur.executemany(sql, rows)
+            except Exception:
+                cur.execute("ROLLBACK TO batch_writer")
+                cur.execute("RELEASE batch_writer")
+                raise
+            cur.execute("RELEASE batch_writer")
+            self.conn.commit()
+        except Exception:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            self.discard()
+            raise
+
+        if any(_FOOD_INFO_WRITE.search(sql) for sql in self._pending):
+            food_info_cache.invalidate(self.conn)
+        self.rows_written += self._pending_rows
+        self.checkpoints += 1
+        self._pending = {}
+        self._pending_rows = 0
+
+    def discard(self) -> None:
+        """Drop anything still buffered without writing it."""
+        if self._pending_rows:
+            print(f"⚠️ Discarding {self._pending_rows} unwritten statement(s)")
+        self._pending = {}
+        self._pending_rows = 0
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.checkpoint()
+        else:
+            self.discard()
@@ -0,0 +1,159 @@
+"""Persist external call telemetry and summarise it per run and provider.
+
+``food_project.net.http_client.metrics`` records every Together, Hugging
+Face, Nutritionix and recipe-site call, plus every cache hit that made a
+call unnecessary.  Pipelines call :func:`save_call_metrics` at the end of
+a run so the events land in ``call_metrics`` tagged with the run id.
+"""
+
+import argparse
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from food_project.net.http_client import metrics
+
+
+def ensure_call_metrics_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS call_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            provider TEXT NOT NULL,
+            status TEXT,
+            ok INTEGER NOT NULL,
+            latency_ms REAL,
+            retries INTEGER DEFAULT 0,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            cache_hit INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_call_metrics_run ON call_metrics(run_id, provider)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_call_metrics_provider ON call_metrics(provider, created_at)")
+    conn.commit()
+
+
+def run_id_for(job_type: str, job_id: Any) -> str:
+    """Run id stored with each call, e.g. ``update_ingredients:12``."""
+    return f"{job_type}:{job_id}"
+
+
+def save_call_metrics(conn: sqlite3.Connection, run_id: Optional[str],
+                      events: Optional[Iterable[dict]] = None) -> int:
+    """Insert ``events`` (by default everything buffered in ``metrics``); return the count."""
+    events = metrics.drain() if events is None else list(events)
+    if not events:
+        return 0
+    ensure_call_metrics_table(conn)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO call_metrics (
+                run_id, provider, status, ok, latency_ms, retries,
+                prompt_tokens, completion_tokens, cache_hit, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (run_id, e["provider"], e["status"], int(e["ok"]), round(e["seconds"] * 1000, 2),
+                 e["retries"], e["prompt_tokens"], e["completion_tokens"], int(e["cache_hit"]), e["ts"])
+                for e in events
+            ],
+        )
+    return len(events)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _has_table(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'call_metrics'"
+    ).fetchone() is not None
+
+
+def summarize(conn: sqlite3.Connection, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per ``(run_id, provider)``: calls, cache hit rate, errors, p50/p95 latency and total time.
+
+    Limited to one run when ``run_id`` is given.  Rows are ordered with
+    the provider that spent the most wall time first within each run.
+    """
+    if not _has_table(conn):
+        return []
+    where, params = ("WHERE run_id = ?", (run_id,)) if run_id is not None else ("", ())
+    groups: Dict[tuple, dict] = {}
+    for row in conn.execute(
+        f"SELECT run_id, provider, ok, latency_ms, cache_hit, prompt_tokens, completion_tokens, created_at "
+        f"FROM call_metrics {where} ORDER BY latency_ms",
+        params,
+    ):
+        run, provider, ok, latency_ms, cache_hit, prompt_tokens, completion_tokens, created_at = row
+        g = groups.setdefault((run, provider), {
+            "run_id": run, "provider": provider, "calls": 0, "cache_hits": 0, "errors": 0,
+            "latencies": [], "prompt_tokens": 0, "completion_tokens": 0, "last_at": created_at,
+        })
+        g["last_at"] = max(g["last_at"], created_at)
+        if cache_hit:
+            g["cache_hits"] += 1
+            continue
+        g["calls"] += 1
+        g["errors"] += 0 if ok else 1
+        g["latencies"].append(latency_ms)
+        g["prompt_tokens"] += prompt_tokens or 0
+        g["completion_tokens"] += completion_tokens or 0
+
+    out = []
+    for g in groups.values():
+        latencies = g.pop("latencies")
+        lookups = g["calls"] + g["cache_hits"]
+        g["hit_rate"] = round(g["cache_hits"] / lookups, 3) if lookups else None
+        g["p50_ms"] = _percentile(latencies, 0.50)
+        g["p95_ms"] = _percentile(latencies, 0.95)
+        g["total_seconds"] = round(sum(latencies) / 1000, 2)
+        out.append(g)
+    latest = {}
+    for g in out:
+        latest[g["run_id"]] = max(latest.get(g["run_id"], 0), g["last_at"])
+    out.sort(key=lambda g: (-latest[g["run_id"]], -g["total_seconds"]))
+    return out
+
+
+def recent_latency(conn: sqlite3.Connection, provider: str, limit: int = 500) -> Optional[float]:
+    """Median latency in seconds of the last ``limit`` successful calls to ``provider``."""
+    if not _has_table(conn):
+        return None
+    latencies = sorted(r[0] for r in conn.execute(
+        "SELECT latency_ms FROM call_metrics WHERE provider = ? AND cache_hit = 0 AND ok = 1 "
+        "ORDER BY created_at DESC LIMIT ?",
+        (provider, limit),
+    ))
+    median = _percentile(latencies, 0.50)
+    return median / 1000 if median is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise recorded external call latency and cache hit rates")
+    parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
+    parser.add_argument("--run", help="Only this run id (e.g. update_ingredients:12)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    rows = summarize(conn, args.run)
+    conn.close()
+    if not rows:
+        print("📭 No call metrics recorded yet.")
+        return
+    for r in rows:
+        hit_rate = f"{r['hit_rate']:.0%}" if r["hit_rate"] is not None else "-"
+        print(f"{str(r['run_id']):<28} {r['provider']:<14} calls={r['calls']:<5} hits={hit_rate:<5} "
+              f"errors={r['errors']:<3} p50={r['p50_ms']}ms p95={r['p95_ms']}ms total={r['total_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
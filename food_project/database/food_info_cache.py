@@ -0,0 +1,113 @@
+"""Read-through cache of ``food_info`` rows keyed by normalized name.
+
+Entries are kept per connection.  Before answering from memory the
+cache reads ``PRAGMA data_version``, which changes whenever another
+connection commits to the database; if it moved, the connection's
+entries are dropped.  The connection's own writes to other tables
+(ingredients, review logs, metrics) leave the cache alone.  Its own
+``food_info`` writes must be reported: services that insert a row pass
+it to :meth:`FoodInfoCache.put` so it stays warm, and bulk writes
+(including ``BatchWriter`` checkpoints that touch ``food_info``) call
+:meth:`FoodInfoCache.invalidate`.  Names known to be missing are cached
+too.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+# Connections whose entries are kept; the oldest is dropped past this
+MAX_CONNECTIONS = 8
+
+_MISSING = object()
+
+
+class _ConnectionEntries:
+    def __init__(self, conn: sqlite3.Connection, version: int):
+        # Held so ``id(conn)`` cannot be reused while the entry exists
+        self.conn = conn
+        self.version = version
+        self.rows: Dict[str, Any] = {}
+        self.columns: list = []
+
+
+class FoodInfoCache:
+    """Per-connection ``{normalized_name: row}`` maps with hit/miss counters."""
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._by_conn: "OrderedDict[int, _ConnectionEntries]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entries(self, conn: sqlite3.Connection) -> _ConnectionEntries:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            old = self._by_conn.get(id(conn))
+            entries = old
+            if old is None or old.conn is not conn or old.version != version:
+                entries = _ConnectionEntries(conn, version)
+                if old is not None and old.conn is conn:
+                    entries.columns = old.columns
+                self._by_conn[id(conn)] = entries
+            self._by_conn.move_to_end(id(conn))
+            while len(self._by_conn) > self.max_connections:
+                self._by_conn.popitem(last=False)
+            return entries
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, names: list, entries: _ConnectionEntries) -> Dict[str, dict]:
+        found = {}
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            marks = ", ".join("?" for _ in chunk)
+            cur = conn.execute(f"SELECT * FROM food_info WHERE normalized_name IN ({marks})", chunk)
+            columns = entries.columns = [c[0] for c in cur.description]
+            for row in cur:
+                found[row[columns.index("normalized_name")]] = dict(zip(columns, row))
+        return found
+
+    def get_many(self, conn: sqlite3.Connection, names: Iterable[str]) -> Dict[str, dict]:
+        """``{normalized_name: row}`` for the ``names`` in ``food_info``; one query for all misses."""
+        names = list(dict.fromkeys(n for n in names if n))
+        entries = self._entries(conn)
+        with self._lock:
+            cached = {n: entries.rows[n] for n in names if n in entries.rows}
+            todo = [n for n in names if n not in cached]
+            self.hits += len(cached)
+            self.misses += len(todo)
+        if todo:
+            found = self._select(conn, todo, entries)
+            with self._lock:
+                for name in todo:
+                    entries.rows[name] = found.get(name, _MISSING)
+            cached.update(found)
+        return {n: dict(row) for n, row in cached.items() if row is not _MISSING}
+
+    def get(self, conn: sqlite3.Connection, name: str) -> Optional[dict]:
+        """The ``food_info`` row for ``name`` as a dict, or ``None``."""
+        return self.get_many(conn, [name]).get(name)
+
+    def put(self, conn: sqlite3.Connection, row: dict) -> None:
+        """Record a row this connection just committed; columns it lacks are ``None``."""
+        entries = self._entries(conn)
+        with self._lock:
+            if entries.columns:
+                row = {c: row.get(c) for c in entries.columns}
+            entries.rows[row["normalized_name"]] = dict(row)
+
+    def invalidate(self, conn: sqlite3.Connection) -> None:
+        """Forget ``conn``'s entries after it wrote to ``food_info`` itself."""
+        with self._lock:
+            old = self._by_conn.get(id(conn))
+            if old is not None and old.conn is conn:
+                del self._by_conn[id(conn)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_conn.clear()
+
+
+food_info_cache = FoodInfoCache()
@@ -0,0 +1,190 @@
+"""Remember foods a provider could not resolve so they are not looked up again.
+
+Each failed lookup is stored per ``(normalized_name, provider)`` with its
+reason.  The name is skipped until ``retry_at``.  The wait starts at the
+reason's base interval and doubles with every further failure, up to
+``MAX_RETRY_SECONDS``, so a hopeless name costs a handful of calls over
+months instead of one per run.  A later successful lookup removes the
+entry.
+"""
+
+import argparse
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+DAY = 24 * 3600
+
+# First retry interval per failure reason; doubled after each repeat
+RETRY_SECONDS = {
+    "not_found": DAY,        # no foods returned / HTTP 404
+    "no_match": DAY,         # foods returned, none close to the requested name
+    "server_error": 3600,    # the provider kept answering 5xx for this name
+}
+DEFAULT_RETRY_SECONDS = 3600
+MAX_RETRY_SECONDS = 90 * DAY
+
+UPSERT_FAILURE_SQL = """
+    INSERT INTO lookup_failures (
+        normalized_name, provider, reason, attempts, first_failed_at, last_failed_at, retry_at
+    ) VALUES (:name, :provider, :reason, 1, :now, :now, :now + :base)
+    ON CONFLICT(normalized_name, provider) DO UPDATE SET
+        reason = excluded.reason,
+        attempts = lookup_failures.attempts + 1,
+        last_failed_at = excluded.last_failed_at,
+        retry_at = excluded.last_failed_at + MIN(:max, :base * (1 << MIN(lookup_failures.attempts, 30)))
+"""
+
+DELETE_FAILURE_SQL = "DELETE FROM lookup_failures WHERE normalized_name = ? AND provider = ?"
+
+
+def ensure_lookup_failures_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lookup_failures (
+            normalized_name TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            first_failed_at REAL NOT NULL,
+            last_failed_at REAL NOT NULL,
+            retry_at REAL NOT NULL,
+            PRIMARY KEY (normalized_name, provider)
+        )
+        """
+    )
+    conn.commit()
+
+
+def _has_table(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lookup_failures'"
+    ).fetchone() is not None
+
+
+def blocked_names(conn: sqlite3.Connection, names: Optional[Iterable[str]] = None,
+                  provider: str = "nutritionix", now: Optional[float] = None) -> Set[str]:
+    """The subset of normalized ``names`` (all names when ``None``) not to look up yet.
+
+    Read-only: safe on connections opened with ``mode=ro``.
+    """
+    if not _has_table(conn):
+        return set()
+    now = time.time() if now is None else now
+    if names is None:
+        return {r[0] for r in conn.execute(
+            "SELECT normalized_name FROM lookup_failures WHERE provider = ? AND retry_at > ?",
+            (provider, now),
+        )}
+    names = list(set(n for n in names if n))
+    blocked = set()
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        marks = ", ".join("?" for _ in chunk)
+        blocked.update(r[0] for r in conn.execute(
+            f"SELECT normalized_name FROM lookup_failures "
+            f"WHERE provider = ? AND retry_at > ? AND normalized_name IN ({marks})",
+            (provider, now, *chunk),
+        ))
+    return blocked
+
+
+def failure_params(name: str, reason: str, provider: str = "nutritionix",
+                   now: Optional[float] = None) -> dict:
+    """Parameters for ``UPSERT_FAILURE_SQL`` (e.g. to queue on a ``BatchWriter``)."""
+    return {
+        "name": name, "provider": provider, "reason": reason,
+        "now": time.time() if now is None else now,
+        "base": RETRY_SECONDS.get(reason, DEFAULT_RETRY_SECONDS),
+        "max": MAX_RETRY_SECONDS,
+    }
+
+
+def record_failures(conn: sqlite3.Connection, failures: Dict[str, str], provider: str = "nutritionix",
+                    writer=None) -> None:
+    """Store ``{normalized_name: reason}``; queued on ``writer`` when given.
+
+    With ``writer`` nothing is committed here, so the table must already
+    exist: call :func:`ensure_lookup_failures_table` before the run.
+    """
+    if not failures:
+        return
+    now = time.time()
+    params = [failure_params(name, reason, provider, now) for name, reason in failures.items()]
+    if writer is not None:
+        for p in params:
+            writer.add(UPSERT_FAILURE_SQL, p)
+        return
+    ensure_lookup_failures_table(conn)
+    with conn:
+        conn.executemany(UPSERT_FAILURE_SQL, params)
+
+
+def clear_failures(conn: sqlite3.Connection, names: Iterable[str], provider: str = "nutritionix",
+                   writer=None) -> None:
+    """Forget failures for ``names`` that have since resolved."""
+    names = [n for n in names if n]
+    if not names or not _has_table(conn):
+        return
+    params = [(name, provider) for name in names]
+    if writer is not None:
+        for p in params:
+            writer.add(DELETE_FAILURE_SQL, p)
+        return
+    with conn:
+        conn.executemany(DELETE_FAILURE_SQL, params)
+
+
+def list_failures(conn: sqlite3.Connection, provider: Optional[str] = None) -> List[dict]:
+    if not _has_table(conn):
+        return []
+    where, params = ("WHERE provider = ?", (provider,)) if provider else ("", ())
+    cur = conn.execute(
+        f"SELECT normalized_name, provider, reason, attempts, last_failed_at, retry_at "
+        f"FROM lookup_failures {where} ORDER BY retry_at",
+        params,
+    )
+    columns = [c[0] for c in cur.description]
+    return [dict(zip(columns, row)) for row in cur]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or clear remembered lookup failures")
+    parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
+    parser.add_argument("--provider", help="Only this provider (e.g. nutritionix)")
+    parser.add_argument("--clear", nargs="*", metavar="NAME",
+                        help="Forget failures for these normalized names (all when none given)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if args.clear is not None:
+        if not _has_table(conn):
+            print("📭 No lookup failures recorded.")
+            return
+        where, params = ["1 = 1"], []
+        if args.provider:
+            where.append("provider = ?")
+            params.append(args.provider)
+        if args.clear:
+            where.append(f"normalized_name IN ({', '.join('?' for _ in args.clear)})")
+            params.extend(args.clear)
+        with conn:
+            deleted = conn.execute(f"DELETE FROM lookup_failures WHERE {' AND '.join(where)}", params).rowcount
+        print(f"🧹 Cleared {deleted} lookup failure(s)")
+        return
+
+    rows = list_failures(conn, args.provider)
+    conn.close()
+    if not rows:
+        print("📭 No lookup failures recorded.")
+        return
+    now = time.time()
+    for r in rows:
+        wait = r["retry_at"] - now
+        when = f"retry in {wait / 3600:.1f}h" if wait > 0 else "retry due"
+        print(f"{r['normalized_name']:<32} {r['provider']:<12} {r['reason']:<13} "
+              f"attempts={r['attempts']:<3} {when}")
+
+
+if __name__ == "__main__":
+    main()
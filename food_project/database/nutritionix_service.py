@@ -2,44 +2,262 @@
 
 import os
 import sqlite3
-from typing import Optional, Dict, Any
-import requests
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 from .sqlite_connector import get_connection, init_db
+from .batch_writer import BatchWriter
+from .food_info_cache import food_info_cache
+from .lookup_failures import blocked_names, clear_failures, record_failures
 from food_project.processing.normalization import normalize_food_name
+from food_project.net.http_client import CircuitOpenError, build_session, metrics, request
+from food_project.llm.rate_limiter import RateLimiter
 
 # -----------------------------------------
 # 🔐 Load Nutritionix API credentials
 # -----------------------------------------
-try:
-    import streamlit as st
-    NUTRITIONIX_APP_ID = st.secrets["nutritionix"]["app_id"]
-    NUTRITIONIX_API_KEY = st.secrets["nutritionix"]["api_key"]
-except:
+@lru_cache(maxsize=None)
+def get_credentials() -> Tuple[str, str]:
+    """Return ``(app_id, api_key)``, resolved on the first real API call.
+
+    Environment / .env first so headless workers never import Streamlit;
+    Streamlit secrets are only consulted when the env vars are missing.
+    """
     load_dotenv()
-    NUTRITIONIX_APP_ID = os.getenv("NUTRITIONIX_APP_ID")
-    NUTRITIONIX_API_KEY = os.getenv("NUTRITIONIX_API_KEY")
+    app_id = os.getenv("NUTRITIONIX_APP_ID")
+    api_key = os.getenv("NUTRITIONIX_API_KEY")
+    if not app_id or not api_key:
+        try:
+            import streamlit as st
+            app_id = st.secrets["nutritionix"]["app_id"]
+            api_key = st.secrets["nutritionix"]["api_key"]
+        except Exception:
+            pass
+
+    if not app_id or not api_key:
+        raise Exception("❌ Nutritionix credentials not set.")
+    return app_id, api_key
+
+
+# Point at a local stand-in server to benchmark without the real API
+API_BASE_URL = os.getenv("NUTRITIONIX_BASE_URL", "https://trackapi.nutritionix.com/v2")
+API_URL = f"{API_BASE_URL.rstrip('/')}/natural/nutrients"
+
+# Request budget shared by every lookup thread and process (0 = no limit)
+NUTRITIONIX_REQUESTS_PER_MINUTE = int(os.getenv("NUTRITIONIX_REQUESTS_PER_MINUTE", 60))
+NUTRITIONIX_REQUESTS_PER_DAY = int(os.getenv("NUTRITIONIX_REQUESTS_PER_DAY", 0))
+
+# Food names packed into one natural/nutrients query
+BATCH_SIZE = 10
+# Returned foods this similar (0-100) to a requested name are matched to it
+MATCH_THRESHOLD = 80
 
-if not NUTRITIONIX_APP_ID or not NUTRITIONIX_API_KEY:
-    raise Exception("❌ Nutritionix credentials not set.")
+FOOD_INFO_INSERT_SQL = """
+    INSERT OR IGNORE INTO food_info (
+        raw_name, normalized_name, serving_qty, serving_unit,
+        serving_weight_grams, calories, fat, saturated_fat, cholesterol,
+        sodium, carbs, fiber, sugars, protein, potassium
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-API_URL = "https://trackapi.nutritionix.com/v2/natural/nutrients"
+FOOD_INFO_INSERT_COLUMNS = (
+    "raw_name", "normalized_name", "serving_qty", "serving_unit",
+    "serving_weight_grams", "calories", "fat", "saturated_fat", "cholesterol",
+    "sodium", "carbs", "fiber", "sugars", "protein", "potassium",
+)
+
+
+def food_info_values(food_name: str, normalized: str, data: Dict[str, Any]) -> tuple:
+    """Map a Nutritionix ``foods[]`` entry onto ``FOOD_INFO_INSERT_SQL`` params."""
+    return (
+        food_name,
+        normalized,
+        data.get("serving_qty"),
+        data.get("serving_unit"),
+        data.get("serving_weight_grams"),
+        data.get("nf_calories"),
+        data.get("nf_total_fat"),
+        data.get("nf_saturated_fat"),
+        data.get("nf_cholesterol"),
+        data.get("nf_sodium"),
+        data.get("nf_total_carbohydrate"),
+        data.get("nf_dietary_fiber"),
+        data.get("nf_sugars"),
+        data.get("nf_protein"),
+        data.get("nf_potassium"),
+    )
 
 # -----------------------------------------
 # 🌐 Make request to Nutritionix API
 # -----------------------------------------
-def _fetch_from_api(query: str) -> Dict[str, Any]:
-    headers = {
-        "x-app-id": NUTRITIONIX_APP_ID,
-        "x-app-key": NUTRITIONIX_API_KEY,
-    }
-    response = requests.post(API_URL, json={"query": query}, headers=headers, timeout=10)
+@lru_cache(maxsize=None)
+def get_session():
+    """Keep-alive session with the credential headers, shared by every lookup thread."""
+    app_id, api_key = get_credentials()
+    return build_session(headers={
+        "x-app-id": app_id,
+        "x-app-key": api_key,
+        "Accept": "application/json",
+    })
+
+
+@lru_cache(maxsize=None)
+def get_limiter() -> RateLimiter:
+    """Nutritionix rate limiter; waits for a slot before every request."""
+    return RateLimiter("nutritionix", per_minute=NUTRITIONIX_REQUESTS_PER_MINUTE,
+                       per_day=NUTRITIONIX_REQUESTS_PER_DAY)
+
+
+def _post_query(query: str, on_call: Optional[Callable[[], None]] = None) -> List[Dict[str, Any]]:
+    """Send one natural-language query and return its ``foods`` array.
+
+    ``on_call`` runs once the request has gone out, whatever the reply;
+    it does not run when the open circuit fails the call fast.
+    """
+    session = get_session()
+    get_limiter().acquire()
+    try:
+        response = request("nutritionix", "POST", API_URL, session=session, json={"query": query})
+    except CircuitOpenError:
+        raise
+    except Exception:
+        if on_call is not None:
+            on_call()
+        raise
+    if on_call is not None:
+        on_call()
     response.raise_for_status()
-    foods = response.json().get("foods", [])
+    return response.json().get("foods", [])
+
+
+class FoodNotFoundError(LookupError):
+    """Nutritionix answered, but with no foods for the query."""
+
+
+def _fetch_from_api(query: str, on_call: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    foods = _post_query(query, on_call)
     if not foods:
-        raise ValueError(f"No foods returned for query: '{query}'")
+        raise FoodNotFoundError(f"No foods returned for query: '{query}'")
     return foods[0]
 
+
+def failure_reason(error: Exception) -> Optional[str]:
+    """Reason to remember a failed lookup, or ``None`` when the name is not to blame.
+
+    Empty replies and 404s mean Nutritionix does not know the food;
+    repeated 5xx for one query suggest it chokes on that name.  Auth
+    errors, rate limits, timeouts and open circuits say nothing about the
+    food and are not remembered, nor are malformed or truncated replies.
+    """
+    if isinstance(error, FoodNotFoundError):
+        return "not_found"
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status in (400, 404):
+        return "not_found"
+    if status is not None and status >= 500:
+        return "server_error"
+    return None
+
+
+def match_foods(names: List[str], foods: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map the ``foods`` of a multi-food reply back to the requested ``names``.
+
+    Exact normalized-name matches are taken first, then the closest
+    remaining pairs by fuzzy similarity.  Each food is used at most once;
+    names left without a match are simply missing from the result.
+    """
+    from rapidfuzz import fuzz
+
+    matched: Dict[str, Dict[str, Any]] = {}
+    free = list(range(len(foods)))
+    by_norm = {}
+    for i in free:
+        by_norm.setdefault(normalize_food_name(foods[i].get("food_name", "")), i)
+    for name in names:
+        i = by_norm.get(normalize_food_name(name))
+        if i is not None and i in free:
+            matched[name] = foods[i]
+            free.remove(i)
+
+    pairs = sorted(
+        ((fuzz.token_set_ratio(normalize_food_name(name), normalize_food_name(foods[i].get("food_name", ""))), name, i)
+         for name in names if name not in matched for i in free),
+        reverse=True,
+    )
+    for score, name, i in pairs:
+        if score < MATCH_THRESHOLD:
+            break
+        if name not in matched and i in free:
+            matched[name] = foods[i]
+            free.remove(i)
+    return matched
+
+
+def fetch_many_from_api(names: Iterable[str], batch_size: int = BATCH_SIZE,
+                        on_call: Optional[Callable[[], None]] = None,
+                        failures: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Look up many foods, ``batch_size`` names per request.
+
+    Returns ``{name: foods[] entry}`` for every name that resolved.  Names
+    a successful batch reply does not cover are retried one per request;
+    when the batch request itself fails, its names are not retried, since
+    the same outage would fail each of them again.  ``on_call`` runs after
+    every request actually sent.  When ``failures`` is given, names that
+    failed for a reason worth remembering are added to it as
+    ``{name: reason}`` (see :func:`failure_reason`).
+    """
+    names = list(dict.fromkeys(n for n in names if n))
+    failures = {} if failures is None else failures
+    found: Dict[str, Dict[str, Any]] = {}
+    retry = []
+    for i in range(0, len(names), max(1, batch_size)):
+        chunk = names[i:i + max(1, batch_size)]
+        try:
+            foods = _post_query("\n".join(chunk), on_call)
+        except Exception as e:
+            print(f"❌ Batch lookup failed for {len(chunk)} food(s): {e}")
+            reason = failure_reason(e)
+            if reason:
+                failures.update((name, reason) for name in chunk)
+            continue
+        found.update(match_foods(chunk, foods))
+        if len(chunk) > 1:
+            retry.extend(n for n in chunk if n not in found)
+        elif chunk[0] not in found:
+            failures[chunk[0]] = "no_match" if foods else "not_found"
+
+    if retry:
+        print(f"🔁 Retrying {len(retry)} unresolved food(s) one at a time")
+    for name in retry:
+        try:
+            found[name] = _fetch_from_api(name, on_call)
+        except Exception as e:
+            print(f"❌ API fetch failed for '{name}': {e}")
+            reason = failure_reason(e)
+            if reason:
+                failures[name] = reason
+    return found
+
+
+def mock_food(food_name: str) -> Dict[str, Any]:
+    """Fixed ``foods[]`` entry used instead of the API in mock mode."""
+    return {
+        "food_name": food_name,
+        "serving_qty": 100,
+        "serving_unit": "g",
+        "serving_weight_grams": 100,
+        "nf_calories": 100,
+        "nf_total_fat": 1,
+        "nf_saturated_fat": 0.2,
+        "nf_cholesterol": 0,
+        "nf_sodium": 10,
+        "nf_total_carbohydrate": 20,
+        "nf_dietary_fiber": 3,
+        "nf_sugars": 15,
+        "nf_protein": 1,
+        "nf_potassium": 200,
+    }
+
 # -----------------------------------------
 # 🍽 Main function to get nutrition data
 # -----------------------------------------
@@ -47,8 +265,18 @@ def get_nutrition_data(
     food_name: str,
     conn: Optional[sqlite3.Connection] = None,
     use_mock: bool = False,
-    skip_if_exists: bool = False
+    skip_if_exists: bool = False,
+    writer: Optional[BatchWriter] = None,
 ) -> Optional[Dict[str, Any]]:
+    """Return the ``food_info`` row for ``food_name``, fetching it if needed.
+
+    When ``writer`` is given the insert is queued on it instead of being
+    committed immediately, and the returned dict has no ``id`` yet; the
+    ``lookup_failures`` table must then exist already.  Names
+    that recently failed to resolve (see ``lookup_failures``) are not sent
+    to the API again until their retry time.  Rows are read through
+    ``food_info_cache``, so repeated lookups of a name cost no query.
+    """
     normalized = normalize_food_name(food_name)
 
     created = False
@@ -57,82 +285,149 @@ def get_nutrition_data(
         created = True
 
     conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
 
     # Initial existence check
-    cur.execute("SELECT * FROM food_info WHERE normalized_name = ?", (normalized,))
-    row = cur.fetchone()
+    row = food_info_cache.get(conn, normalized)
+    if row:
+        # Already stored locally: a Nutritionix call saved
+        metrics.record_cache_hit("nutritionix")
 
     if skip_if_exists and row:
         print(f"⏩ Skipped (already exists in DB): {normalized}")
         return None
 
     if row:
-        return dict(zip(row.keys(), row))
+        return row
 
     if use_mock:
         print(f"⚠️ Mocking Nutritionix API for '{food_name}'")
-        mock_data = {
-            "food_name": food_name,
-            "serving_qty": 100,
-            "serving_unit": "g",
-            "serving_weight_grams": 100,
-            "nf_calories": 100,
-            "nf_total_fat": 1,
-            "nf_saturated_fat": 0.2,
-            "nf_cholesterol": 0,
-            "nf_sodium": 10,
-            "nf_total_carbohydrate": 20,
-            "nf_dietary_fiber": 3,
-            "nf_sugars": 15,
-            "nf_protein": 1,
-            "nf_potassium": 200,
-        }
+        mock_data = mock_food(food_name)
+    elif blocked_names(conn, [normalized]):
+        # Failed recently; the answer will not have changed yet
+        metrics.record_cache_hit("nutritionix")
+        print(f"🚫 Skipped (lookup failed recently): {normalized}")
+        return None
     else:
         try:
             mock_data = _fetch_from_api(food_name)
         except Exception as e:
             print(f"❌ API fetch failed for '{food_name}': {e}")
+            reason = failure_reason(e)
+            if reason:
+                record_failures(conn, {normalized: reason}, writer=writer)
             return None
+        clear_failures(conn, [normalized], writer=writer)
 
     norm = normalize_food_name(mock_data["food_name"])
 
-    # Final check before insert
-    cur.execute("SELECT id FROM food_info WHERE normalized_name = ?", (norm,))
-    if cur.fetchone():
+    # Final check before insert; only queries if the DB changed meanwhile
+    if food_info_cache.get(conn, norm):
         print(f"⚠️ Already exists just before insert: {norm}")
         return None
 
+    values = food_info_values(food_name, norm, mock_data)
+    if writer is not None:
+        writer.add(FOOD_INFO_INSERT_SQL, values)
+        return dict(zip(FOOD_INFO_INSERT_COLUMNS, values))
+
     with conn:
-        conn.execute("""
-            INSERT INTO food_info (
-                raw_name, normalized_name, serving_qty, serving_unit,
-                serving_weight_grams, calories, fat, saturated_fat, cholesterol,
-                sodium, carbs, fiber, sugars, protein, potassium
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            food_name,
-            norm,
-            mock_data.get("serving_qty"),
-            mock_data.get("serving_unit"),
-            mock_data.get("serving_weight_grams"),
-            mock_data.get("nf_calories"),
-            mock_data.get("nf_total_fat"),
-            mock_data.get("nf_saturated_fat"),
-            mock_data.get("nf_cholesterol"),
-            mock_data.get("nf_sodium"),
-            mock_data.get("nf_total_carbohydrate"),
-            mock_data.get("nf_dietary_fiber"),
-            mock_data.get("nf_sugars"),
-            mock_data.get("nf_protein"),
-            mock_data.get("nf_potassium"),
-        ))
-
-    cur.execute("SELECT * FROM food_info WHERE normalized_name = ?", (norm,))
-    row = cur.fetchone()
-    result = dict(zip(row.keys(), row)) if row else None
+        cur = conn.execute(FOOD_INFO_INSERT_SQL, values)
+    if cur.rowcount:
+        # Cache the new row rather than selecting it back
+        food_info_cache.put(conn, {"id": cur.lastrowid, **dict(zip(FOOD_INFO_INSERT_COLUMNS, values))})
+    result = food_info_cache.get(conn, norm)
 
     if created:
         conn.close()
 
     return result
+
+
+def get_nutrition_data_many(
+    food_names: Iterable[str],
+    conn: sqlite3.Connection,
+    use_mock: bool = False,
+    skip_if_exists: bool = False,
+    writer: Optional[BatchWriter] = None,
+    batch_size: int = BATCH_SIZE,
+    on_call: Optional[Callable[[], None]] = None,
+    resolved_as: Optional[Dict[str, str]] = None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Batch version of :func:`get_nutrition_data`: ``{food_name: row or None}``.
+
+    Names already in ``food_info`` are answered from ``food_info_cache``
+    (or ``None`` with ``skip_if_exists``).  Names that recently failed to
+    resolve are skipped without a call.  The rest are fetched with
+    :func:`fetch_many_from_api` and inserted in one ``executemany`` (or
+    queued on ``writer``); new failures are remembered the same way.  As
+    with the single lookup, a food that maps to a name already stored is
+    not inserted again and comes back ``None``; ``resolved_as``, when
+    given, is filled with ``{food_name: normalized name returned}`` for
+    every fetched name so callers can still match it.
+    """
+    food_names = list(dict.fromkeys(n for n in food_names if n))
+    conn.row_factory = sqlite3.Row
+    normalized = {name: normalize_food_name(name) for name in food_names}
+    existing = food_info_cache.get_many(conn, normalized.values())
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing = []
+    for name in food_names:
+        row = existing.get(normalized[name])
+        if row is None:
+            missing.append(name)
+            continue
+        metrics.record_cache_hit("nutritionix")
+        results[name] = None if skip_if_exists else row
+    if skip_if_exists and len(missing) < len(food_names):
+        print(f"⏩ Skipped {len(food_names) - len(missing)} food(s) already in DB")
+
+    blocked = set() if use_mock else blocked_names(conn, [normalized[n] for n in missing])
+    to_fetch = [name for name in missing if normalized[name] not in blocked]
+    if len(to_fetch) < len(missing):
+        metrics.record_cache_hit("nutritionix", len(missing) - len(to_fetch))
+        print(f"🚫 Skipped {len(missing) - len(to_fetch)} food(s) whose lookup failed recently")
+
+    if not to_fetch:
+        fetched = {}
+    elif use_mock:
+        print(f"⚠️ Mocking Nutritionix API for {len(to_fetch)} food(s)")
+        fetched = {name: mock_food(name) for name in to_fetch}
+    else:
+        failures: Dict[str, str] = {}
+        fetched = fetch_many_from_api(to_fetch, batch_size=batch_size, on_call=on_call, failures=failures)
+        record_failures(conn, {normalized[name]: reason for name, reason in failures.items()}, writer=writer)
+        clear_failures(conn, [normalized[name] for name in fetched], writer=writer)
+
+    rows = []
+    claimed = set(existing)
+    returned = {name: normalize_food_name(data["food_name"]) for name, data in fetched.items()}
+    if resolved_as is not None:
+        resolved_as.update(returned)
+    # Final check before insert: one query for every returned name not seen yet
+    claimed.update(food_info_cache.get_many(conn, returned.values()))
+    for name in missing:
+        data = fetched.get(name)
+        if data is None:
+            results[name] = None
+            continue
+        norm = returned[name]
+        if norm in claimed:
+            print(f"⚠️ Already exists just before insert: {norm}")
+            results[name] = None
+            continue
+        claimed.add(norm)
+        values = food_info_values(name, norm, data)
+        rows.append(values)
+        results[name] = dict(zip(FOOD_INFO_INSERT_COLUMNS, values))
+
+    if writer is not None:
+        for values in rows:
+            writer.add(FOOD_INFO_INSERT_SQL, values)
+    elif rows:
+        with conn:
+            conn.executemany(FOOD_INFO_INSERT_SQL, rows)
+        food_info_cache.invalidate(conn)
+    unresolved = sum(1 for name in missing if results[name] is None)
+    print(f"🍽 Nutritionix: {len(food_names) - len(missing)} in DB, {len(rows)} new, {unresolved} unresolved")
+    return results
@@ -0,0 +1,187 @@
+"""Checkpoint tables that let long pipeline runs be resumed.
+
+Each job records the pid and host of the process running it.  A job
+still marked ``running`` is only resumed once that process is gone, or,
+when the owner cannot be checked (another host, Windows), once the job
+has shown no activity for ``STALE_AFTER_SECONDS``.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Item statuses
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Job statuses
+RUNNING = "running"
+COMPLETED = "completed"
+
+# A running job whose owner cannot be checked counts as abandoned after this long idle
+STALE_AFTER_SECONDS = 30 * 60
+
+MARK_ITEM_SQL = """
+    UPDATE pipeline_job_items
+    SET status = ?, error = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE job_id = ? AND item_key = ?
+"""
+
+
+def ensure_pipeline_tables(conn: sqlite3.Connection) -> None:
+    """Create ``pipeline_jobs`` and ``pipeline_job_items`` if needed."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type TEXT NOT NULL,
+            params TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_job_items (
+            job_id INTEGER NOT NULL,
+            item_key TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            attempts INTEGER DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, item_key),
+            FOREIGN KEY (job_id) REFERENCES pipeline_jobs(id)
+        )
+        """
+    )
+    # Owner columns were added after the first release
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(pipeline_jobs)")}
+    for column, kind in (("owner_pid", "INTEGER"), ("owner_host", "TEXT")):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE pipeline_jobs ADD COLUMN {column} {kind}")
+    conn.commit()
+
+
+def _pid_alive(pid: int) -> Optional[bool]:
+    """Whether ``pid`` runs on this host; ``None`` when that cannot be checked."""
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return None
+    return True
+
+
+def job_is_live(owner_pid: Optional[int], owner_host: Optional[str], idle_seconds: float) -> bool:
+    """Whether a ``running`` job still belongs to a live process."""
+    if owner_pid and owner_host == socket.gethostname():
+        alive = _pid_alive(owner_pid)
+        if alive is not None:
+            return alive
+    return idle_seconds < STALE_AFTER_SECONDS
+
+
+def start_job(conn: sqlite3.Connection, job_type: str, params: Dict[str, Any],
+              item_keys: Iterable[Any]) -> int:
+    """Record a new run and its work items (all ``pending``); return the job id."""
+    ensure_pipeline_tables(conn)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO pipeline_jobs (job_type, params, status, owner_pid, owner_host) VALUES (?, ?, ?, ?, ?)",
+        (job_type, json.dumps(params), RUNNING, os.getpid(), socket.gethostname()),
+    )
+    job_id = cur.lastrowid
+    cur.executemany(
+        "INSERT OR IGNORE INTO pipeline_job_items (job_id, item_key, status) VALUES (?, ?, ?)",
+        ((job_id, str(key), PENDING) for key in item_keys),
+    )
+    conn.commit()
+    return job_id
+
+
+def find_resumable_job(conn: sqlite3.Connection, job_type: str) -> Optional[Dict[str, Any]]:
+    """Claim the most recent unfinished job of ``job_type`` for this process, or ``None``.
+
+    Jobs still running in another live process are skipped (see
+    :func:`job_is_live`).  Finding and claiming happen in one write
+    transaction, so two ``--resume`` runs never take the same job.
+    """
+    ensure_pipeline_tables(conn)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            """
+            SELECT j.id, j.params, j.status, j.owner_pid, j.owner_host,
+                   ? - MAX(CAST(strftime('%s', j.updated_at) AS REAL),
+                           COALESCE((SELECT MAX(CAST(strftime('%s', i.updated_at) AS REAL))
+                                     FROM pipeline_job_items i WHERE i.job_id = j.id), 0))
+            FROM pipeline_jobs j
+            WHERE j.job_type = ? AND j.status != ?
+            ORDER BY j.id DESC
+            """,
+            (time.time(), job_type, COMPLETED),
+        ).fetchall()
+        job = None
+        for job_id, params, status, owner_pid, owner_host, idle in rows:
+            if status == RUNNING and job_is_live(owner_pid, owner_host, idle or 0):
+                print(f"⏳ Job {job_id} is still running (pid {owner_pid} on {owner_host}); not resuming it")
+                continue
+            job = {"id": job_id, "params": json.loads(params or "{}"), "status": status}
+            conn.execute(
+                "UPDATE pipeline_jobs SET status = ?, owner_pid = ?, owner_host = ?, "
+                "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (RUNNING, os.getpid(), socket.gethostname(), job_id),
+            )
+            break
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return job
+
+
+def unfinished_items(conn: sqlite3.Connection, job_id: int) -> List[str]:
+    """Keys of items that are still pending or previously failed."""
+    rows = conn.execute(
+        "SELECT item_key FROM pipeline_job_items WHERE job_id = ? AND status != ? ORDER BY rowid",
+        (job_id, DONE),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def mark_item(conn: sqlite3.Connection, job_id: int, item_key: Any, status: str,
+              error: Optional[str] = None, commit: bool = True) -> None:
+    """Set one item's status.  Use ``MARK_ITEM_SQL`` to queue it on a BatchWriter instead."""
+    conn.execute(MARK_ITEM_SQL, (status, error, job_id, str(item_key)))
+    if commit:
+        conn.commit()
+
+
+def finish_job(conn: sqlite3.Connection, job_id: int) -> Dict[str, int]:
+    """Close out a run: ``completed`` if every item is done, else left resumable.
+
+    Returns a ``{status: count}`` summary of the job's items.
+    """
+    counts = dict(conn.execute(
+        "SELECT status, COUNT(*) FROM pipeline_job_items WHERE job_id = ? GROUP BY status",
+        (job_id,),
+    ).fetchall())
+    status = COMPLETED if not counts.get(PENDING) and not counts.get(FAILED) else FAILED
+    conn.execute(
+        "UPDATE pipeline_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, job_id),
+    )
+    conn.commit()
+    return counts
@@ -0,0 +1,187 @@
+"""Local OpenAI-compatible stand-in for the Together chat completions API.
+
+Replays recorded cassettes (see ``food_project.llm.cassette``) and answers
+anything it has not seen with a deterministic parse from the rule-based
+parser, so the pipeline can be benchmarked offline.  Latency and error
+rates are configurable to exercise retries and concurrency.
+
+    python -m food_project.dev.llm_stub_server --cassette calls.jsonl --latency 0.8 --error-rate 0.05
+    TOGETHER_BASE_URL=http://127.0.0.1:8765/v1 TOGETHER_API_KEY=stub \\
+        TOGETHER_REQUESTS_PER_MINUTE=0 TOGETHER_REQUESTS_PER_DAY=0 \\
+        python -m food_project.processing.update_worker --mode all
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from food_project.llm.cassette import Cassette, request_key
+from food_project.processing.normalization import parse_ingredient
+
+BATCH_LINE = re.compile(r'^(\d+)\. (".*")$', re.MULTILINE)
+SINGLE_TEXT = re.compile(r'Text to parse: "(.*)"')
+FALLBACK_TEXT = re.compile(r"raw text of a recipe step: '(.*)'")
+# Name-review prompts from food_project.llm.ingredient_name_reviewer
+REVIEW_OPTIONS = re.compile(r"Closest food options: (.*)")
+REVIEW_BATCH_LINE = re.compile(r'^(\d+)\. Raw: .*\| Options: (.*)$', re.MULTILINE)
+
+
+def synthesize_item(raw_text: str) -> dict:
+    """Answer in the LLM's format using the deterministic parser."""
+    amount, unit, normalized_name, _ = parse_ingredient(raw_text)
+    return {
+        "food": normalized_name or raw_text,
+        "amount": amount,
+        "unit": unit,
+        "normalized_name": normalized_name or raw_text,
+        "food_score": 0.9,
+        "unit_score": 0.9 if unit else 0.6,
+    }
+
+
+def synthesize_content(messages: list) -> str:
+    """Build a reply for a request that is not in any cassette."""
+    prompt = messages[-1]["content"] if messages else ""
+    # Review prompts are answered with the closest catalog option
+    review_lines = REVIEW_BATCH_LINE.findall(prompt)
+    if review_lines:
+        return "\n".join(f"{i}. {options.split(', ')[0]}" for i, options in review_lines)
+    options = REVIEW_OPTIONS.search(prompt)
+    if options:
+        return options.group(1).split(", ")[0]
+
+    lines = BATCH_LINE.findall(prompt)
+    if lines:
+        items = []
+        for index, quoted in lines:
+            item = synthesize_item(json.loads(quoted))
+            items.append({"index": int(index), **item})
+        return json.dumps(items)
+    match = SINGLE_TEXT.search(prompt) or FALLBACK_TEXT.search(prompt)
+    return json.dumps(synthesize_item(match.group(1) if match else prompt))
+
+
+class StubState:
+    """Recorded answers, fault settings and request counters shared by handler threads."""
+
+    def __init__(self, recordings, latency, jitter, error_rate, error_status, seed):
+        self.recordings = recordings
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "replayed": 0, "synthesized": 0, "errors": 0}
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def draw(self):
+        """Return ``(delay_seconds, fail)`` for the next request."""
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            return delay, self.random.random() < self.error_rate
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, state.stats)
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            state.count("requests")
+
+            delay, fail = state.draw()
+            time.sleep(delay)
+            if fail:
+                state.count("errors")
+                self._send_json(state.error_status, {"error": {"message": "stub injected error"}})
+                return
+
+            model = request.get("model", "")
+            messages = request.get("messages", [])
+            entry = state.recordings.get(request_key(model, messages))
+            if entry is not None:
+                state.count("replayed")
+                content = entry["content"]
+            else:
+                state.count("synthesized")
+                content = synthesize_content(messages)
+
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+            completion_tokens = len(content) // 4
+            self._send_json(200, {
+                "id": f"stub-{state.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic LLM completions locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cassette", action="append", default=[], help="Recorded JSONL cassette (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform +/- jitter on the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected failures (e.g. 429)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and error draws")
+    args = parser.parse_args()
+
+    recordings = {}
+    for path in args.cassette:
+        recordings.update(Cassette(path).load())
+
+    state = StubState(recordings, args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"🧪 LLM stub on http://{args.host}:{args.port}/v1 with {len(recordings)} recorded answer(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {state.stats}")
+
+
+if __name__ == "__main__":
+    main()
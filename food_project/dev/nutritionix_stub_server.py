@@ -0,0 +1,299 @@
+"""Local stand-in for the Nutritionix ``/v2/natural/nutrients`` endpoint.
+
+Answers from fixture data: the ``fake_foods`` in
+``food_project.dev.create_fake_food_info``, ``food_info`` rows from a
+database (``--db``) and recorded API responses (``--fixtures``, JSON
+files holding a ``{"foods": [...]}`` reply or a list of foods).  Each
+line of the query is one food, as in the multi-food lookups the service
+sends.  Names with no fixture get a deterministic made-up entry, or are
+left out with ``--unknown skip``; a query matching nothing gets the
+API's 404.  Latency, rate limiting (429 with ``Retry-After``) and
+injected failures are configurable.
+
+    python -m food_project.dev.nutritionix_stub_server --db food_info.db --latency 0.3 --rate-limit 5
+    NUTRITIONIX_BASE_URL=http://127.0.0.1:8766/v2 NUTRITIONIX_APP_ID=stub NUTRITIONIX_API_KEY=stub \\
+        python -m food_project.ingestion.populate_food_info --db /tmp/copy.db --file foods.txt
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from food_project.processing.normalization import normalize_food_name
+from food_project.processing.validator import FoodIndex
+
+# food_info column -> Nutritionix field
+NUTRIENT_FIELDS = {
+    "calories": "nf_calories",
+    "fat": "nf_total_fat",
+    "saturated_fat": "nf_saturated_fat",
+    "cholesterol": "nf_cholesterol",
+    "sodium": "nf_sodium",
+    "carbs": "nf_total_carbohydrate",
+    "fiber": "nf_dietary_fiber",
+    "sugars": "nf_sugars",
+    "protein": "nf_protein",
+    "potassium": "nf_potassium",
+}
+# Fixture names at least this similar (0-100) answer for a query line
+FUZZY_THRESHOLD = 85
+NOT_FOUND = {"message": "We couldn't match any of your foods"}
+
+
+def food_from_row(row: dict) -> dict:
+    """A ``foods[]`` entry built from a ``food_info``-shaped dict."""
+    food = {
+        "food_name": row["normalized_name"],
+        "serving_qty": row.get("serving_qty"),
+        "serving_unit": row.get("serving_unit"),
+        "serving_weight_grams": row.get("serving_weight_grams"),
+    }
+    for column, field in NUTRIENT_FIELDS.items():
+        food[field] = row.get(column)
+    return food
+
+
+def synthesize_food(name: str) -> dict:
+    """Deterministic made-up per-100g entry for a name with no fixture."""
+    seed = zlib.crc32(name.encode("utf-8"))
+    rng = random.Random(seed)
+    carbs, fat, protein = rng.uniform(0, 60), rng.uniform(0, 30), rng.uniform(0, 25)
+    return {
+        "food_name": name,
+        "serving_qty": 100,
+        "serving_unit": "g",
+        "serving_weight_grams": 100,
+        "nf_calories": round(4 * carbs + 9 * fat + 4 * protein, 1),
+        "nf_total_fat": round(fat, 1),
+        "nf_saturated_fat": round(fat * rng.uniform(0.1, 0.5), 1),
+        "nf_cholesterol": rng.choice([0, 0, 0, round(rng.uniform(5, 120))]),
+        "nf_sodium": round(rng.uniform(0, 800)),
+        "nf_total_carbohydrate": round(carbs, 1),
+        "nf_dietary_fiber": round(carbs * rng.uniform(0, 0.2), 1),
+        "nf_sugars": round(carbs * rng.uniform(0, 0.6), 1),
+        "nf_protein": round(protein, 1),
+        "nf_potassium": round(rng.uniform(20, 600)),
+    }
+
+
+def load_fixtures(db_path: Optional[str] = None, fixture_paths: Iterable[str] = (),
+                  include_fake: bool = True) -> Dict[str, dict]:
+    """``{normalized_name: foods[] entry}`` from every fixture source; later sources win."""
+    fixtures: Dict[str, dict] = {}
+    if include_fake:
+        from food_project.dev.create_fake_food_info import fake_foods
+        for row in fake_foods:
+            fixtures[row["normalized_name"]] = food_from_row(row)
+    if db_path:
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        conn.row_factory = sqlite3.Row
+        for row in conn.execute("SELECT * FROM food_info"):
+            fixtures[row["normalized_name"]] = food_from_row(dict(row))
+        conn.close()
+    for path in fixture_paths:
+        data = json.loads(Path(path).read_text())
+        for food in data.get("foods", []) if isinstance(data, dict) else data:
+            fixtures[normalize_food_name(food.get("food_name", ""))] = food
+    return fixtures
+
+
+class StubState:
+    """Fixtures, fault settings and counters shared by handler threads."""
+
+    def __init__(self, fixtures: Dict[str, dict], latency=0.2, jitter=0.05, per_food_latency=0.02,
+                 rate_limit=0.0, error_rate=0.0, error_status=503, unknown="synthesize", seed=0):
+        self.fixtures = fixtures
+        self.index = FoodIndex(fixtures)
+        self.latency = latency
+        self.jitter = jitter
+        self.per_food_latency = per_food_latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.unknown = unknown
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self._recent = deque()
+        self.stats = {
+            "connections": 0, "requests": 0, "foods_requested": 0, "foods_returned": 0,
+            "fixture_hits": 0, "synthesized": 0, "not_found": 0, "rate_limited": 0, "errors": 0,
+        }
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.stats[name] += n
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.stats)
+
+    def admit(self) -> bool:
+        """Sliding one-second window; ``False`` once ``rate_limit`` requests are in it."""
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return False
+            self._recent.append(now)
+            return True
+
+    def draw(self, foods: int):
+        """Return ``(delay_seconds, fail)`` for a request of ``foods`` lines."""
+        with self.lock:
+            delay = self.latency + self.per_food_latency * foods + self.random.uniform(-self.jitter, self.jitter)
+            return max(0.0, delay), self.random.random() < self.error_rate
+
+    def lookup(self, line: str) -> Optional[dict]:
+        name = normalize_food_name(line)
+        food = self.fixtures.get(name)
+        if food is None and name:
+            match, score = self.index.best_match(name)
+            if match is not None and score >= FUZZY_THRESHOLD:
+                food = self.fixtures[match]
+        if food is not None:
+            self.count("fixture_hits")
+            return food
+        if self.unknown == "synthesize" and name:
+            self.count("synthesized")
+            return synthesize_food(name)
+        self.count("not_found")
+        return None
+
+    def answer(self, query: str) -> List[dict]:
+        lines = [line.strip() for line in query.splitlines() if line.strip()]
+        self.count("foods_requested", len(lines))
+        foods = [food for food in map(self.lookup, lines) if food is not None]
+        self.count("foods_returned", len(foods))
+        return foods
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, like the real API, so pooled sessions reuse connections
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            state.count("connections")
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, state.snapshot())
+            else:
+                self._send_json(404, {"message": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = self.rfile.read(length)
+            if not self.path.rstrip("/").endswith("/natural/nutrients"):
+                self._send_json(404, {"message": "not found"})
+                return
+            state.count("requests")
+            if not self.headers.get("x-app-id") or not self.headers.get("x-app-key"):
+                self._send_json(401, {"message": "unauthorized"})
+                return
+            if not state.admit():
+                state.count("rate_limited")
+                self._send_json(429, {"message": "usage limits exceeded"}, {"Retry-After": "1"})
+                return
+            try:
+                query = json.loads(payload or b"{}").get("query", "")
+            except ValueError:
+                self._send_json(400, {"message": "invalid json"})
+                return
+
+            delay, fail = state.draw(len(query.splitlines()))
+            time.sleep(delay)
+            if fail:
+                state.count("errors")
+                self._send_json(state.error_status, {"message": "stub injected error"})
+                return
+            foods = state.answer(query)
+            if foods:
+                self._send_json(200, {"foods": foods})
+            else:
+                self._send_json(404, NOT_FOUND)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def start_server(state: StubState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve ``state`` on a background thread; returns the server (``port=0`` picks a free one)."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency and fault options shared with the load test."""
+    parser.add_argument("--latency", type=float, default=0.2, help="Base response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Uniform +/- jitter on the delay")
+    parser.add_argument("--per-food-latency", type=float, default=0.02, help="Extra delay per food in a query")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second before answering 429 (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected failures")
+    parser.add_argument("--unknown", choices=("synthesize", "skip"), default="synthesize",
+                        help="Make up entries for names with no fixture, or leave them out")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and error draws")
+
+
+def state_from_args(args, fixtures: Dict[str, dict]) -> StubState:
+    return StubState(fixtures, latency=args.latency, jitter=args.jitter, per_food_latency=args.per_food_latency,
+                     rate_limit=args.rate_limit, error_rate=args.error_rate, error_status=args.error_status,
+                     unknown=args.unknown, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Nutritionix natural/nutrients answers from fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--db", help="Serve food_info rows from this database (opened read-only)")
+    parser.add_argument("--fixtures", action="append", default=[],
+                        help="Recorded natural/nutrients reply or list of foods as JSON (repeatable)")
+    parser.add_argument("--no-fake-foods", action="store_true", help="Leave out create_fake_food_info rows")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.db, args.fixtures, include_fake=not args.no_fake_foods)
+    state = state_from_args(args, fixtures)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"🧪 Nutritionix stub on http://{args.host}:{args.port}/v2 with {len(fixtures)} fixture food(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {state.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
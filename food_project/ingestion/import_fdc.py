@@ -0,0 +1,339 @@
+"""Bulk-load a USDA FoodData Central CSV export into ``food_info``.
+
+Reads ``nutrient.csv``, ``food.csv`` and ``food_nutrient.csv`` straight
+from the export directory or its ``.zip``, with no network calls.  Each
+food's description goes through ``normalize_food_name``; when several
+foods normalize to the same name, the one from the earliest
+``--data-type`` wins, and names already in ``food_info`` are left alone.
+New foods get one ``food_info`` row (per 100 g, ``match_type = 'fdc'``),
+a ``food_sources`` row with their FDC id and every reported amount in
+``food_nutrients``.
+
+Rows are written with ``executemany`` in batches of ``BATCH_ROWS`` and
+committed every ``COMMIT_ROWS``.  Indexes on the nutrient tables are
+dropped for the load and built afterwards, even when the load fails,
+then the ``food_info`` nutrient columns are filled from
+``food_nutrients`` in one statement.
+
+New foods are stored with ``match_type = 'fdc_loading'`` until that last
+statement marks them ``'fdc'``.  A failed import removes them again, and
+the next import removes any left by a killed one, so a partial load is
+never mistaken for finished foods and simply re-running picks up the
+same foods.
+
+    python -m food_project.ingestion.import_fdc FoodData_Central_csv_2024-10-31.zip --db food_info.db
+    python -m food_project.ingestion.import_fdc fdc/ --data-type sr_legacy_food --data-type branded_food
+"""
+
+import argparse
+import csv
+import io
+import sqlite3
+import time
+import zipfile
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Sequence
+
+from food_project.database.food_info_cache import food_info_cache
+from food_project.database.sqlite_connector import get_connection
+from food_project.processing.normalization import normalize_food_name
+from food_project.processing.progress import ProgressReporter, default_reporter
+
+SOURCE = "fdc"
+# match_type of foods whose import has not finished yet
+LOADING = "fdc_loading"
+# Preferred first: a name shared by several foods keeps the earliest type's food
+DEFAULT_DATA_TYPES = ("foundation_food", "sr_legacy_food", "survey_fndds_food")
+# branded_food adds roughly two million foods; opt in with --data-type
+DATA_TYPES = DEFAULT_DATA_TYPES + ("branded_food",)
+
+# food_info column -> FDC nutrient ids, preferred first.  FDC amounts are
+# per 100 g, in the same units food_info uses (kcal, g, mg).
+NUTRIENT_COLUMNS = {
+    "calories": (1008, 2047, 2048),  # Energy; Atwater general / specific factors
+    "fat": (1004,),
+    "saturated_fat": (1258,),
+    "cholesterol": (1253,),
+    "sodium": (1093,),
+    "carbs": (1005, 1050),           # by difference; by summation
+    "fiber": (1079,),
+    "sugars": (2000, 1063),          # total; total NLEA
+    "protein": (1003,),
+    "potassium": (1092,),
+}
+
+# Rows per executemany call ...
+BATCH_ROWS = 10_000
+# ... and rows per commit
+COMMIT_ROWS = 500_000
+
+FOOD_INSERT_SQL = f"""
+    INSERT INTO food_info (id, raw_name, normalized_name, serving_qty, serving_unit,
+                           serving_weight_grams, match_type)
+    VALUES (?, ?, ?, 100, 'g', 100, '{LOADING}')
+"""
+SOURCE_INSERT_SQL = "INSERT INTO food_sources (food_info_id, source, source_id, data_type) VALUES (?, ?, ?, ?)"
+NUTRIENT_INSERT_SQL = "INSERT INTO food_nutrients (food_info_id, nutrient_id, amount) VALUES (?, ?, ?)"
+
+# Built after the load; dropped first so the load does not maintain them
+INDEXES = {
+    "idx_food_nutrients_food": "CREATE INDEX IF NOT EXISTS idx_food_nutrients_food "
+                               "ON food_nutrients (food_info_id, nutrient_id)",
+    "idx_food_nutrients_nutrient": "CREATE INDEX IF NOT EXISTS idx_food_nutrients_nutrient "
+                                   "ON food_nutrients (nutrient_id)",
+    "idx_food_sources_source": "CREATE INDEX IF NOT EXISTS idx_food_sources_source "
+                               "ON food_sources (source, source_id)",
+}
+
+
+def ensure_fdc_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS nutrients (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            unit_name TEXT,
+            nutrient_nbr TEXT
+        );
+        CREATE TABLE IF NOT EXISTS food_sources (
+            food_info_id INTEGER PRIMARY KEY REFERENCES food_info(id),
+            source TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            data_type TEXT
+        );
+        CREATE TABLE IF NOT EXISTS food_nutrients (
+            food_info_id INTEGER NOT NULL REFERENCES food_info(id),
+            nutrient_id INTEGER NOT NULL REFERENCES nutrients(id),
+            amount REAL
+        );
+        """
+    )
+
+
+@contextmanager
+def open_csv(export: Path, name: str) -> Iterator[Iterator[list]]:
+    """Stream ``name`` from an export directory or ``.zip`` as ``csv.reader`` rows (header included)."""
+    if export.suffix.lower() == ".zip":
+        with zipfile.ZipFile(export) as zf:
+            members = [m for m in zf.namelist() if m == name or m.endswith("/" + name)]
+            if not members:
+                raise FileNotFoundError(f"❌ {name} not found in {export}")
+            with zf.open(members[0]) as raw:
+                yield csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        return
+    path = export / name
+    if not path.exists():
+        path = next(export.rglob(name), None)
+    if path is None:
+        raise FileNotFoundError(f"❌ {name} not found in {export}")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield csv.reader(f)
+
+
+def select_columns(rows: Iterator[list], *names: str) -> Iterator[tuple]:
+    """Pick ``names`` out of each row, by position from the header row."""
+    header = next(rows)
+    try:
+        positions = [header.index(n) for n in names]
+    except ValueError as e:
+        raise ValueError(f"❌ Missing column in FDC export: {e}") from None
+    for row in rows:
+        yield tuple(row[i] for i in positions)
+
+
+def _float(text: str):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def write_batches(conn: sqlite3.Connection, sql: str, rows: Iterable[Sequence],
+                  progress: ProgressReporter, label: str, commit_rows: int = COMMIT_ROWS) -> int:
+    """``executemany`` ``rows`` ``BATCH_ROWS`` at a time, committing every ``commit_rows`` (0 = only at the end)."""
+    rows = iter(rows)
+    written = since_commit = 0
+    while True:
+        batch = list(islice(rows, BATCH_ROWS))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+        written += len(batch)
+        since_commit += len(batch)
+        if commit_rows and since_commit >= commit_rows:
+            conn.commit()
+            since_commit = 0
+            progress.message(f"   💾 {written:,} {label}")
+    conn.commit()
+    return written
+
+
+def load_nutrients(conn: sqlite3.Connection, export: Path) -> int:
+    with open_csv(export, "nutrient.csv") as rows:
+        defs = [(int(i), name, unit, nbr or None)
+                for i, name, unit, nbr in select_columns(rows, "id", "name", "unit_name", "nutrient_nbr")]
+    conn.executemany("INSERT OR REPLACE INTO nutrients (id, name, unit_name, nutrient_nbr) VALUES (?, ?, ?, ?)",
+                     defs)
+    conn.commit()
+    return len(defs)
+
+
+def choose_foods(export: Path, data_types: Sequence[str], known: set) -> tuple:
+    """One food per new normalized name: ``({normalized: (fdc_id, description, data_type)}, stats)``."""
+    rank = {t: i for i, t in enumerate(data_types)}
+    best: Dict[str, tuple] = {}
+    stats = {"read": 0, "other_types": 0, "unnamed": 0, "already_in_db": 0, "duplicates": 0}
+    with open_csv(export, "food.csv") as rows:
+        for fdc_id, data_type, description in select_columns(rows, "fdc_id", "data_type", "description"):
+            stats["read"] += 1
+            r = rank.get(data_type)
+            if r is None:
+                stats["other_types"] += 1
+                continue
+            norm = normalize_food_name(description)
+            if not norm:
+                stats["unnamed"] += 1
+            elif norm in known:
+                stats["already_in_db"] += 1
+            elif norm not in best:
+                best[norm] = (r, fdc_id, description, data_type)
+            else:
+                stats["duplicates"] += 1
+                if r < best[norm][0]:
+                    best[norm] = (r, fdc_id, description, data_type)
+    return {norm: entry[1:] for norm, entry in best.items()}, stats
+
+
+def next_food_id(conn: sqlite3.Connection) -> int:
+    """First id AUTOINCREMENT would hand out next (never reuses a deleted one)."""
+    top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM food_info").fetchone()[0]
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'food_info'").fetchone()
+    return max(top, seq[0] if seq else 0) + 1
+
+
+def fill_nutrient_columns(conn: sqlite3.Connection, first_id: int, last_id: int) -> int:
+    """Set the ``food_info`` nutrient columns of ids ``first_id..last_id`` from ``food_nutrients``.
+
+    Also marks those foods as finished (``match_type = 'fdc'``).
+    """
+    def pick(ids):
+        amounts = [f"(SELECT amount FROM food_nutrients n "
+                   f"WHERE n.food_info_id = food_info.id AND n.nutrient_id = {i})" for i in ids]
+        return amounts[0] if len(amounts) == 1 else f"COALESCE({', '.join(amounts)})"
+    assignments = ",\n".join(f"{column} = {pick(ids)}" for column, ids in NUTRIENT_COLUMNS.items())
+    with conn:
+        return conn.execute(f"UPDATE food_info SET match_type = ?, {assignments} WHERE id BETWEEN ? AND ?",
+                            (SOURCE, first_id, last_id)).rowcount
+
+
+def remove_unfinished(conn: sqlite3.Connection) -> int:
+    """Delete foods (and their sources and amounts) an import added but never finished."""
+    unfinished = f"SELECT id FROM food_info WHERE match_type = '{LOADING}'"
+    with conn:
+        conn.execute(f"DELETE FROM food_nutrients WHERE food_info_id IN ({unfinished})")
+        conn.execute(f"DELETE FROM food_sources WHERE food_info_id IN ({unfinished})")
+        removed = conn.execute("DELETE FROM food_info WHERE match_type = ?", (LOADING,)).rowcount
+    if removed:
+        food_info_cache.invalidate(conn)
+    return removed
+
+
+def import_fdc(conn: sqlite3.Connection, export, data_types: Sequence[str] = DEFAULT_DATA_TYPES,
+               progress: ProgressReporter = None) -> dict:
+    """Load one FDC export into ``conn``; returns counts for the summary.
+
+    Foods left by an earlier import that did not finish are removed
+    first.  If this one fails, the foods it added are removed before the
+    error propagates; the indexes are rebuilt either way.
+    """
+    progress = default_reporter(progress)
+    export = Path(export)
+    ensure_fdc_tables(conn)
+    # Bigger page cache and in-memory temp b-trees for the index builds
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+    removed = remove_unfinished(conn)
+    if removed:
+        progress.message(f"🧹 Removed {removed:,} foods left by an unfinished import")
+
+    for index in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    try:
+        with progress.stage("nutrients"):
+            nutrient_defs = load_nutrients(conn, export)
+
+        with progress.stage("foods"):
+            known = {r[0] for r in conn.execute("SELECT normalized_name FROM food_info")}
+            chosen, stats = choose_foods(export, data_types, known)
+
+            # Explicit ids so nutrient rows can point at foods without a lookup;
+            # one BEGIN IMMEDIATE transaction keeps other writers off those ids
+            conn.execute("BEGIN IMMEDIATE")
+            first_id = next_food_id(conn)
+            food_ids: Dict[str, int] = {}
+            food_rows, source_rows = [], []
+            for food_id, (norm, (fdc_id, description, data_type)) in enumerate(chosen.items(), start=first_id):
+                food_ids[fdc_id] = food_id
+                food_rows.append((food_id, description, norm))
+                source_rows.append((food_id, SOURCE, fdc_id, data_type))
+            inserted = write_batches(conn, FOOD_INSERT_SQL, food_rows, progress, "foods", commit_rows=0)
+            write_batches(conn, SOURCE_INSERT_SQL, source_rows, progress, "food sources")
+            del food_rows, source_rows
+
+        with progress.stage("food_nutrients"):
+            with open_csv(export, "food_nutrient.csv") as rows:
+                amounts = ((food_ids[fdc_id], int(nutrient_id), _float(amount))
+                           for fdc_id, nutrient_id, amount in select_columns(rows, "fdc_id", "nutrient_id", "amount")
+                           if fdc_id in food_ids)
+                nutrient_rows = write_batches(conn, NUTRIENT_INSERT_SQL, amounts, progress, "nutrient amounts")
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        remove_unfinished(conn)
+        raise
+    finally:
+        with progress.stage("indexes"):
+            for sql in INDEXES.values():
+                conn.execute(sql)
+            conn.commit()
+
+    with progress.stage("columns"):
+        if inserted:
+            fill_nutrient_columns(conn, first_id, first_id + inserted - 1)
+        conn.execute("ANALYZE food_nutrients")
+        conn.commit()
+
+    return {"nutrient_definitions": nutrient_defs, "foods_inserted": inserted,
+            "nutrient_amounts": nutrient_rows, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a USDA FoodData Central CSV export into food_info")
+    parser.add_argument("export", help="FDC CSV export directory or its .zip")
+    parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
+    parser.add_argument("--data-type", action="append", choices=DATA_TYPES, dest="data_types",
+                        help="FDC data type to import, most preferred first (repeatable; "
+                             f"default: {', '.join(DEFAULT_DATA_TYPES)})")
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    print(f"📍 Using database at: {db_path.resolve()}")
+    conn = get_connection(db_path)
+    start = time.monotonic()
+    counts = import_fdc(conn, args.export, args.data_types or DEFAULT_DATA_TYPES)
+    elapsed = time.monotonic() - start
+    conn.close()
+
+    print(f"📊 {counts['foods_inserted']:,} foods inserted from {counts['read']:,} read: "
+          f"{counts['already_in_db']:,} already in food_info, {counts['duplicates']:,} duplicate names, "
+          f"{counts['other_types']:,} other data types, {counts['unnamed']:,} without a usable name")
+    print(f"⏱ {counts['nutrient_amounts']:,} nutrient amounts and {counts['nutrient_definitions']} nutrient "
+          f"definitions in {elapsed:.1f}s ({counts['foods_inserted'] / elapsed if elapsed else 0:,.0f} foods/s)")
+
+
+if __name__ == "__main__":
+    main()
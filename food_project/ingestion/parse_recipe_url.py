@@ -1,12 +1,18 @@
 """Utility to scrape a recipe webpage and store its data."""
 
 import argparse
-from recipe_scrapers import scrape_me
+from urllib.parse import urlparse
+from recipe_scrapers import HEADERS, scrape_html
 from food_project.database.sqlite_connector import save_recipe_and_ingredients
+from food_project.net.http_client import request
 
 def parse_recipe(url: str) -> dict:
     """Download recipe details from the provided URL."""
-    scraper = scrape_me(url)
+    # Fetched through the shared HTTP layer so a slow site times out instead of hanging
+    response = request("recipe_sites", "GET", url, breaker_key=f"recipe_sites:{urlparse(url).netloc}",
+                       headers=HEADERS)
+    response.raise_for_status()
+    scraper = scrape_html(response.text, org_url=url)
     return {
         "title": scraper.title(),
         "ingredients": scraper.ingredients(),
@@ -2,20 +2,39 @@
 
 import argparse
 import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import sqlite3
 
 from food_project.database.sqlite_connector import get_connection, init_db
-from food_project.database.nutritionix_service import get_nutrition_data
+from food_project.database.batch_writer import BatchWriter
+from food_project.database.food_info_cache import food_info_cache
+from food_project.database.lookup_failures import (
+    blocked_names, clear_failures, ensure_lookup_failures_table, record_failures,
+)
+from food_project.database.nutritionix_service import (
+    BATCH_SIZE, FOOD_INFO_INSERT_SQL, fetch_many_from_api, food_info_values, mock_food,
+)
+from food_project.database.call_metrics import run_id_for, save_call_metrics
+from food_project.database.pipeline_jobs import (
+    DONE, FAILED, MARK_ITEM_SQL, find_resumable_job, finish_job, start_job, unfinished_items,
+)
+from food_project.processing.normalization import normalize_food_name
+from food_project.processing.progress import ProgressReporter, default_reporter
 
 DEFAULT_FILE = "food_project/ingestion/foods.txt"
 MAX_API_CALLS = 200
+# Lookup threads; keep at or below HTTP_POOL_SIZE so every thread keeps its connection
+DEFAULT_WORKERS = 4
+JOB_TYPE = "populate_food_info"
 
 def clear_existing_data(conn):
     """Delete all rows in food_info table."""
     with conn:
         conn.execute("DELETE FROM food_info")
-        print("🧹 Cleared existing food_info data.")
+    food_info_cache.invalidate(conn)
+    print("🧹 Cleared existing food_info data.")
 
 def read_food_list(path: str):
     """Read list of food names from a file, one per line."""
@@ -24,34 +43,137 @@ def read_food_list(path: str):
     with open(path, encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
-def fetch_and_insert(conn, food_name: str, use_mock=False, skip_existing=False) -> bool:
-    """Fetch and insert food data from Nutritionix. Return True if inserted."""
-    print(f"🔍 Inserting {food_name}...")
-    food_data = get_nutrition_data(
-        food_name,
-        conn,
-        use_mock=use_mock,
-        skip_if_exists=skip_existing,
-    )
-    if not food_data:
-        print(f"❌ No data found for: {food_name}")
-        return False
-    print(f"✅ Inserted: {food_data['normalized_name']}")
-    return True
+def _lookup_chunk(chunk, use_mock):
+    """Worker thread: resolve one chunk of names.  Touches the network only, never the DB."""
+    if use_mock:
+        return {name: mock_food(name) for name in chunk}, {}, 0
+    failures, calls = {}, []
+    found = fetch_many_from_api(chunk, batch_size=len(chunk), failures=failures,
+                                on_call=lambda: calls.append(1))
+    return found, failures, len(calls)
+
+
+def populate_parallel(conn, job_id, foods, use_mock=False, batch_size=BATCH_SIZE,
+                      workers=DEFAULT_WORKERS, max_calls=MAX_API_CALLS,
+                      progress: ProgressReporter = None) -> Counter:
+    """Resolve ``foods`` on a thread pool and insert the results in batches.
+
+    Worker threads only call Nutritionix, through the shared pooled
+    session and rate limiter, ``batch_size`` names per request.  New rows,
+    lookup failures and job item statuses are written from this thread on
+    a :class:`BatchWriter`.  Foods already in ``food_info`` or that
+    failed recently are settled without a call, and each distinct
+    normalized name is looked up once.  At most ``max_calls`` names are
+    looked up; the rest stay pending for ``--resume``.  Returns outcome
+    counts.
+    """
+    progress = default_reporter(progress)
+    counts = Counter()
+    normalized = {food: normalize_food_name(food) for food in foods}
+    existing = food_info_cache.get_many(conn, normalized.values())
+    missing = {n for n in normalized.values() if n not in existing}
+    blocked = set() if use_mock else blocked_names(conn, missing)
+
+    # Created up front: the writer queues failures without committing
+    ensure_lookup_failures_table(conn)
+    writer = BatchWriter(conn)
+    by_norm = {}
+    for food in foods:
+        norm = normalized[food]
+        if norm in existing:
+            counts["already_in_db"] += 1
+            writer.add(MARK_ITEM_SQL, (DONE, None, job_id, food))
+        elif norm in blocked:
+            counts["recently_failed"] += 1
+            writer.add(MARK_ITEM_SQL, (FAILED, "lookup failed recently", job_id, food))
+        else:
+            by_norm.setdefault(norm, []).append(food)
+
+    # One representative name per normalized name
+    names = [group[0] for group in by_norm.values()]
+    if len(names) > max_calls:
+        print(f"🔁 Reached API limit: looking up {max_calls} of {len(names)} food(s); --resume continues")
+        names = names[:max_calls]
+    chunks = [names[i:i + max(1, batch_size)] for i in range(0, len(names), max(1, batch_size))]
+
+    def settle(food_name, status, error=None):
+        for food in by_norm[normalized[food_name]]:
+            writer.add(MARK_ITEM_SQL, (status, error, job_id, food))
+
+    claimed = set(existing)
+    done = 0
+    with progress.stage("lookup", total=len(names)):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(_lookup_chunk, chunk, use_mock): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    found, failures, calls = future.result()
+                except Exception as e:
+                    print(f"\n❌ Failed on {len(chunk)} food(s): {e}")
+                    for name in chunk:
+                        settle(name, FAILED, str(e))
+                    counts["unresolved"] += len(chunk)
+                    done += len(chunk)
+                    progress.rows_done(done, len(names), stage="lookup")
+                    continue
+                if calls:
+                    progress.external_call("nutritionix", calls)
+
+                returned = {name: normalize_food_name(data["food_name"]) for name, data in found.items()}
+                claimed.update(food_info_cache.get_many(conn, set(returned.values()) - claimed))
+                record_failures(conn, {normalized[name]: reason for name, reason in failures.items() if reason},
+                                writer=writer)
+                for name in chunk:
+                    norm = returned.get(name)
+                    if norm is None:
+                        counts["unresolved"] += 1
+                        settle(name, FAILED, "No data found")
+                    elif norm in claimed:
+                        # Already covered by that row; nothing left to retry
+                        counts["matched_existing"] += 1
+                        settle(name, DONE, f"Nutritionix returned existing food '{norm}'")
+                    else:
+                        claimed.add(norm)
+                        counts["inserted"] += 1
+                        writer.add(FOOD_INFO_INSERT_SQL, food_info_values(name, norm, found[name]))
+                        settle(name, DONE)
+                clear_failures(conn, [normalized[name] for name in returned], writer=writer)
+                done += len(chunk)
+                progress.rows_done(done, len(names), stage="lookup")
+    writer.checkpoint()
+    counts["requests"] = progress.external_calls.get("nutritionix", 0)
+    return counts
 
 def main():
     # Command line interface for bulk populating the database
     parser = argparse.ArgumentParser(description="Populate food_info from Nutritionix")
     parser.add_argument("--food", help="Fetch a single food item by name")
     parser.add_argument("--file", default=DEFAULT_FILE, help="Path to foods.txt")
-    parser.add_argument("--skip-existing", action="store_true", help="Skip foods already in DB")
     parser.add_argument("--clear", action="store_true", help="Delete existing food_info entries")
-    parser.add_argument("--max", type=int, default=MAX_API_CALLS, help="Max API calls to use")
+    parser.add_argument("--max", type=int, default=MAX_API_CALLS, help="Max foods to look up in this run")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Foods packed into each Nutritionix request")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Parallel lookup threads (requests still share one rate limit)")
     parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
     parser.add_argument("--mock", action="store_true", help="Use mocked data instead of API")
     parser.add_argument("--init", action="store_true", help="Recreate DB schema (drops data!)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last unfinished run, retrying only failed foods")
+    parser.add_argument("--plan", action="store_true",
+                        help="Report expected API calls, cost and time without calling or writing anything")
     args = parser.parse_args()
 
+    if args.plan:
+        from food_project.processing.planner import plan_populate, print_plan
+        foods_path = args.file
+        if args.food:
+            print("⚠️ --plan ignores --food and plans the --file list")
+        print_plan(plan_populate(foods_path, db_path=args.db, max_calls=args.max,
+                                 batch_size=args.batch_size, workers=args.workers))
+        return
+
     db_path = Path(args.db)
     print(f"📍 Using database at: {db_path.resolve()}")
 
@@ -64,34 +186,41 @@ def main():
         clear_existing_data(conn)
 
     # Get food names to insert
-    if args.food:
-        foods = [args.food]
+    if args.resume:
+        job = find_resumable_job(conn, JOB_TYPE)
+        if not job:
+            print("✅ No unfinished populate_food_info run to resume.")
+            conn.close()
+            return
+        job_id = job["id"]
+        params = job["params"]
+        args.mock = params.get("mock", args.mock)
+        foods = unfinished_items(conn, job_id)
+        print(f"🔁 Resuming job {job_id}: {len(foods)} unfinished food(s)")
     else:
-        foods = read_food_list(args.file)
-
-    used = 0
-    for food in foods:
-        if used >= args.max:
-            print("🔁 Reached API limit.")
-            break
-
-        if fetch_and_insert(conn, food, use_mock=args.mock, skip_existing=args.skip_existing):
-            used += 1
-
-        # Show partial DB state
-        cur = conn.cursor()
-        cur.execute("SELECT id, raw_name, normalized_name FROM food_info")
-        print("📄 Current DB rows:")
-        for row in cur.fetchall():
-            print(" -", tuple(row))
-
-    # Final DB content
-    print("\n📋 Final DB content:")
-    cur = conn.cursor()
-    cur.execute("SELECT id, raw_name, normalized_name FROM food_info")
-    for row in cur.fetchall():
-        print(" -", tuple(row))
-
+        if args.food:
+            foods = [args.food]
+        else:
+            foods = read_food_list(args.file)
+        params = {"food": args.food, "file": args.file, "max": args.max,
+                  "mock": args.mock}
+        job_id = start_job(conn, JOB_TYPE, params, foods)
+        print(f"🗂 Started job {job_id}")
+
+    start = time.monotonic()
+    counts = populate_parallel(conn, job_id, foods, use_mock=args.mock, batch_size=args.batch_size,
+                               workers=args.workers, max_calls=args.max)
+    elapsed = time.monotonic() - start
+    looked_up = counts["inserted"] + counts["unresolved"] + counts["matched_existing"]
+    print(f"📊 {counts['inserted']} inserted, {counts['already_in_db']} already in DB, "
+          f"{counts['unresolved']} unresolved, {counts['matched_existing']} matched an existing food, "
+          f"{counts['recently_failed']} skipped after recent failures")
+    print(f"⏱ {looked_up} food(s) looked up with {counts['requests']} request(s) in {elapsed:.1f}s "
+          f"({looked_up / elapsed if elapsed else 0:.1f} foods/s)")
+
+    job_counts = finish_job(conn, job_id)
+    print(f"🗂 Job {job_id} items: {job_counts}")
+    save_call_metrics(conn, run_id_for(JOB_TYPE, job_id))
     conn.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+"""Async variant of the LLM fallback parser with a concurrency limit and request coalescing."""
+
+import asyncio
+import traceback
+from typing import Callable, Dict, Iterable, Optional
+
+from food_project.llm.full_parser import (
+    BATCH_SIZE,
+    build_batch_messages,
+    build_messages,
+    empty_result,
+    mock_result,
+    parse_batch_response_text,
+    parse_response_text,
+    template_key,
+    with_local_amount,
+)
+from food_project.llm.llm_cache import LLMCache, get_cache
+from food_project.llm.providers import ChatProvider, get_provider
+from food_project.llm.rate_limiter import RateLimitExceeded
+from food_project.net.http_client import metrics
+
+# Maximum number of Together requests allowed in flight at once.
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncLLMParser:
+    """Run many ``parse_with_llm``-style lookups concurrently.
+
+    A semaphore caps how many requests are in flight.  Lines
+    with the same :func:`template_key` that overlap in time share one call and
+    every waiter receives the same result.  Results are written to the
+    shared :class:`LLMCache` as they arrive.  Requests go through
+    ``provider`` (the shared default when omitted), which applies the
+    rate limit, retries and circuit breaker.
+
+    :meth:`parse_many` packs up to ``batch_size`` uncached lines into one
+    request; lines whose batch item is missing or invalid are retried
+    on their own.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, mock: bool = False,
+                 provider: Optional[ChatProvider] = None,
+                 on_call: Optional[Callable[[], None]] = None,
+                 cache: Optional[LLMCache] = None,
+                 batch_size: int = BATCH_SIZE):
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.mock = mock
+        self.on_call = on_call
+        self._provider = provider if provider is not None else get_provider()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._cache = cache if cache is not None else get_cache()
+        self._hits: Dict[str, dict] = {}
+        self.calls_made = 0
+        self.rate_limited = 0
+        self.retried_alone = 0
+
+    async def parse(self, raw_text: str) -> dict:
+        """Return the parsed result for ``raw_text``, coalescing duplicate requests.
+
+        Lines are cached and coalesced by :func:`template_key`, so lines
+        that differ only in quantity share one call; each caller gets its
+        own amount back from :func:`with_local_amount`.
+        """
+        key = template_key(raw_text)
+        cached = self._hits.get(key)
+        if cached is None:
+            cached = self._cache.get(key)
+        if cached is not None:
+            metrics.record_cache_hit(self._provider.name)
+            return with_local_amount(cached, raw_text)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call(raw_text, key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _t: self._in_flight.pop(key, None))
+        # ``shield`` keeps one cancelled waiter from cancelling the shared call
+        return with_local_amount(await asyncio.shield(task), raw_text)
+
+    def _use_api(self) -> bool:
+        return not self.mock and self._provider.available()
+
+    async def _request(self, messages: list, max_tokens: int, label: str) -> Optional[str]:
+        """Send one chat completion; ``None`` when skipped or failed."""
+        async with self._semaphore:
+            try:
+                print(f"🚀 Calling {self._provider.name} LLM (async) for: {label}")
+                content = await self._provider.acomplete(messages, max_tokens=max_tokens)
+            except RateLimitExceeded as e:
+                self.rate_limited += 1
+                print(f"🚫 {e}. Skipping: {label}")
+                return None
+            except Exception as e:
+                print("❌ LLM call failed:", e)
+                traceback.print_exc()
+                return None
+            self.calls_made += 1
+            if self.on_call is not None:
+                self.on_call()
+            return content
+
+    async def _call(self, raw_text: str, key: str) -> dict:
+        if not self._use_api():
+            # Not cached: a canned answer must never stand in for a real one later
+            return mock_result()
+
+        content = await self._request(build_messages(raw_text), 200, raw_text)
+        parsed = parse_response_text(content) if content is not None else None
+        if parsed is None:
+            return empty_result()
+
+        self._store(key, parsed)
+        return parsed
+
+    async def _call_batch(self, raw_texts: list, futures: Dict[str, asyncio.Future]) -> None:
+        """Parse ``raw_texts`` in one request and resolve the future of each text's key."""
+        try:
+            label = f"{len(raw_texts)} lines (batch)"
+            content = await self._request(build_batch_messages(raw_texts), 80 * len(raw_texts) + 100, label)
+            results = parse_batch_response_text(content, len(raw_texts)) if content is not None else []
+            results += [None] * (len(raw_texts) - len(results))
+
+            retries = []
+            for raw_text, result in zip(raw_texts, results):
+                key = template_key(raw_text)
+                if result is None:
+                    retries.append(raw_text)
+                else:
+                    self._store(key, result)
+                    futures[key].set_result(result)
+
+            if retries and content is not None:
+                self.retried_alone += len(retries)
+                retried = await asyncio.gather(*(self._call(t, template_key(t)) for t in retries))
+            else:
+                # Skipped by the rate limiter or failed outright: don't spend more calls
+                retried = [empty_result() for _ in retries]
+            for raw_text, result in zip(retries, retried):
+                futures[template_key(raw_text)].set_result(result)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    def _store(self, key: str, result: dict) -> None:
+        self._cache.set(key, result)
+
+    async def parse_many(self, raw_texts: Iterable[str]) -> Dict[str, dict]:
+        """Parse every text concurrently and return ``{raw_text: result}``."""
+        texts = [t for t in raw_texts if t]
+        keys = {t: template_key(t) for t in texts}
+        # One indexed query for every hit instead of a lookup per text
+        self._hits.update(self._cache.get_many(keys.values()))
+        # Entries cached before template keys were keyed by the raw text
+        legacy = self._cache.get_many(t for t, k in keys.items() if k not in self._hits)
+        self._hits.update((keys[t], result) for t, result in legacy.items())
+
+        # One representative line per uncached template
+        misses = {}
+        for raw_text, key in keys.items():
+            if key not in self._hits and key not in self._in_flight:
+                misses.setdefault(key, raw_text)
+        if self.batch_size > 1 and len(misses) > 1 and self._use_api():
+            loop = asyncio.get_running_loop()
+            lines = list(misses.values())
+            for i in range(0, len(lines), self.batch_size):
+                chunk = lines[i:i + self.batch_size]
+                futures = {keys[t]: loop.create_future() for t in chunk}
+                for key, future in futures.items():
+                    self._in_flight[key] = future
+                    future.add_done_callback(lambda _f, k=key: self._in_flight.pop(k, None))
+                asyncio.ensure_future(self._call_batch(chunk, futures))
+
+        results = await asyncio.gather(*(self.parse(t) for t in texts))
+        return dict(zip(texts, results))
+
+    async def aclose(self) -> None:
+        if self.retried_alone:
+            print(f"🔁 {self.retried_alone} line(s) retried individually after invalid batch items")
+        if self.rate_limited:
+            print(f"🚫 {self.rate_limited} request(s) skipped by the Together rate limit; "
+                  f"rerun with --resume once it resets.")
+
+
+def parse_many_with_llm(raw_texts: Iterable[str], mock: bool = False,
+                        concurrency: int = DEFAULT_CONCURRENCY,
+                        on_call: Optional[Callable[[], None]] = None,
+                        batch_size: int = BATCH_SIZE) -> Dict[str, dict]:
+    """Synchronous batch entry point for callers like ``update_ingredients``.
+
+    Runs all lookups on a private event loop, ``batch_size`` lines per
+    request, so N fallbacks cost roughly ``N / (batch_size * concurrency)``
+    round trips instead of N.  ``on_call`` is invoked after every real
+    LLM request.
+    """
+    texts = list(dict.fromkeys(t for t in raw_texts if t))
+    if not texts:
+        return {}
+
+    async def _run():
+        parser = AsyncLLMParser(concurrency=concurrency, mock=mock, on_call=on_call, batch_size=batch_size)
+        try:
+            return await parser.parse_many(texts)
+        finally:
+            await parser.aclose()
+
+    return asyncio.run(_run())
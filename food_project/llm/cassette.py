@@ -0,0 +1,77 @@
+"""Record real LLM request/response pairs so they can be replayed offline.
+
+Set ``LLM_RECORD_CASSETTE=path.jsonl`` and every Together completion made
+by the pipeline is appended to that file as one JSON line.  The stand-in
+server in ``food_project.dev.llm_stub_server`` replays cassettes so runs
+can be load-tested without spending quota.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+CASSETTE_ENV = "LLM_RECORD_CASSETTE"
+
+
+def request_key(model: str, messages: list) -> str:
+    """Stable hash of the parts of a request that determine the answer."""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """An append-only JSONL file of recorded completions."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, dict]:
+        """Return ``{request_key: entry}``; later recordings win."""
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    entries[entry["key"]] = entry
+        return entries
+
+    def append(self, model: str, messages: list, content: str, seconds: float) -> None:
+        entry = {
+            "key": request_key(model, messages),
+            "model": model,
+            "messages": messages,
+            "content": content,
+            "seconds": round(seconds, 3),
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        # One write per line in append mode keeps concurrent recorders from interleaving
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+@lru_cache(maxsize=None)
+def _recorder_for(path: str) -> Cassette:
+    return Cassette(path)
+
+
+def get_recorder() -> Optional[Cassette]:
+    """The cassette named by ``LLM_RECORD_CASSETTE``, or ``None`` when not recording."""
+    path = os.getenv(CASSETTE_ENV)
+    return _recorder_for(path) if path else None
+
+
+def record_call(model: str, messages: list, content: Optional[str], seconds: float) -> None:
+    """Append one completion to the active cassette, if recording is on."""
+    recorder = get_recorder()
+    if recorder is not None and content is not None:
+        recorder.append(model, messages, content, seconds)
@@ -1,6 +1,15 @@
 """LLM fallback for estimating nutrition when API fails."""
 
-def estimate_nutrition_from_llm(text: str, mock=False) -> dict:
+from typing import Optional
+
+
+def estimate_nutrition_from_llm(text: str, mock=False) -> Optional[dict]:
+    """Per-100g nutrients for ``text``, or ``None`` when no estimate is available.
+
+    No LLM estimate is implemented yet, so outside mock mode this returns
+    ``None`` rather than placeholder numbers that would be stored as
+    nutrition data.
+    """
     if mock:
         return {
             "calories": 200,
@@ -9,11 +18,5 @@ def estimate_nutrition_from_llm(text: str, mock=False) -> dict:
             "carbs": 15,
         }
 
-    # TODO: Add real logic later
-    return {
-        "calories": 123,
-        "protein": 4,
-        "fat": 9,
-        "carbs": 12,
-    }
-
+    # TODO: ask the LLM once there is a prompt and a validator for its answer
+    return None
@@ -1,86 +1,133 @@
-"""LLM fallback parser using Together API with prompt templating and usage limits."""
+"""LLM fallback parser with prompt templating, sent through the shared LLM provider."""
 
 import re
-import os
 import json
-from pathlib import Path
+import traceback
 from dotenv import load_dotenv
-from together import Together
+
+from food_project.llm.llm_cache import get_cache
+from food_project.llm.providers import TOGETHER_MODEL, get_provider, parse_json_reply
+from food_project.llm.rate_limiter import RateLimitExceeded
+from food_project.net.http_client import metrics
+from food_project.processing.normalization import FRACTIONS, parse_ingredient
+from food_project.processing.units import COMMON_UNITS
 
 # -------------------------------
 # ✅ Load environment and config
 # -------------------------------
 load_dotenv()
 
-def get_together_client():
-    import streamlit as st
-    api_key = os.getenv("TOGETHER_API_KEY") or st.secrets["together"]["api_key"]
-    print("🔍 DEBUG Together API key loaded:", api_key[:6] + "..." if api_key else "None")
-    return Together(api_key=api_key)
-
-client = get_together_client()
-
-CACHE_PATH = Path("llm_full_parser_cache.json")
-USAGE_LOG = Path("together_llm_usage.json")
-MODEL = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
-DAILY_LIMIT = 100
+MODEL = TOGETHER_MODEL
 
 
 # ----------------------------
 # Helpers
 # ----------------------------
-def extract_json_block(text: str) -> str:
-    """Remove markdown-style wrappers and isolate raw JSON block."""
-    match = re.search(r"{[\s\S]*?}", text)
-    return match.group(0) if match else text.strip()
 
+# Cache keys replace quantities with this so "1 cup flour" and "2 cups flour" share an entry
+QUANTITY_PLACEHOLDER = "{qty}"
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?"
+_QUANTITY = re.compile(
+    rf"(?<![\w.])(?:{_NUMBER})(?:\s*(?:-|to)\s*(?:{_NUMBER}))?(?![\d.])(?!\s*%)"
+)
+_UNIT_AFTER_QUANTITY = re.compile(r"(\{qty\}\s*)([a-z]+)")
+_PARENTHESIZED = re.compile(r"\([^)]*\)")
+_WORD_AFTER = re.compile(r"[a-z]+")
+_UNIT_SET = set(COMMON_UNITS)
 
-def read_cache():
-    return json.loads(CACHE_PATH.read_text()) if CACHE_PATH.exists() else {}
 
+def _is_unit(word: str) -> bool:
+    return word in _UNIT_SET or (word.endswith("s") and word[:-1] in _UNIT_SET)
 
-def write_cache(cache):
-    CACHE_PATH.write_text(json.dumps(cache, indent=2))
 
+def _singular_unit(match) -> str:
+    unit = match.group(2)
+    if unit.endswith("s") and unit[:-1] in _UNIT_SET:
+        unit = unit[:-1]
+    return match.group(1) + unit
 
-def read_usage():
-    return json.loads(USAGE_LOG.read_text()) if USAGE_LOG.exists() else {"count": 0}
 
+def _templated(raw_text: str) -> tuple:
+    """``(cleaned text, text with its quantities replaced by {qty})``."""
+    text = (raw_text or "").lower()
+    for frac, ascii_frac in FRACTIONS.items():
+        text = text.replace(frac, f" {ascii_frac}")
+    text = re.sub(r"\s+", " ", text).strip()
+    kept = [m.span() for m in _PARENTHESIZED.finditer(text)]
 
-def write_usage(usage):
-    USAGE_LOG.write_text(json.dumps(usage, indent=2))
+    def replace(match):
+        start, end = match.span()
+        # Package sizes like "(14 oz)" tell foods apart
+        if any(a <= start < b for a, b in kept):
+            return match.group(0)
+        # Part of a name ("7up"), unless a unit is glued on ("2cups")
+        word = _WORD_AFTER.match(text, end)
+        if word and not _is_unit(word.group(0)):
+            return match.group(0)
+        return QUANTITY_PLACEHOLDER
 
+    key = _QUANTITY.sub(replace, text)
+    return text, _UNIT_AFTER_QUANTITY.sub(_singular_unit, key)
 
-# ----------------------------
-# Core Function
-# ----------------------------
-def parse_with_llm(raw_text: str, mock=False) -> dict:
-    cache = read_cache()
-    if raw_text in cache:
-        return cache[raw_text]
-
-    api_key = os.getenv("TOGETHER_API_KEY")  # recheck in case .env changed
-    if mock or not api_key:
-        print(f"⚠️ LLM fallback to mock mode (mock={mock}, key_set={bool(api_key)})")
-        result = {
-            "food": "mocked chicken",
-            "amount": 3,
-            "unit": "count",
-            "normalized_name": "chicken",
-            "food_score": 90,
-            "unit_score": 95,
-        }
-        cache[raw_text] = result
-        write_cache(cache)
+
+def template_key(raw_text: str) -> str:
+    """Canonical, quantity-agnostic cache key for an ingredient line.
+
+    Lowercased, unicode fractions spelled out, whitespace collapsed and
+    every quantity (or range) replaced by ``{qty}``, with the unit after
+    a quantity made singular ("cups" -> "cup").  Numbers that name a
+    different food are kept: percentages ("2% milk"), package sizes in
+    parentheses ("(14 oz) can") and numbers inside words ("7up").  A line
+    whose amount the deterministic parser cannot read keeps its own
+    quantities, so it gets its own entry and LLM call rather than another
+    line's amount.
+    """
+    text, key = _templated(raw_text)
+    if key != text and parse_ingredient(raw_text)[0] is None:
+        return text
+    return key
+
+
+def with_local_amount(result: dict, raw_text: str) -> dict:
+    """Fill a template-level LLM answer with this line's own amount.
+
+    The cached name and unit apply to every line of the same shape; the
+    amount comes from the deterministic parser.  Lines it cannot read are
+    keyed on their own text (see :func:`template_key`), so their answer
+    is already their own.
+    """
+    if not result or not result.get("food"):
+        return result
+    text, key = _templated(raw_text)
+    if key == text:
         return result
+    amount = parse_ingredient(raw_text)[0]
+    return result if amount is None else {**result, "amount": amount}
 
-    usage = read_usage()
-    if usage["count"] >= DAILY_LIMIT:
-        print("🚫 Together API daily limit reached. Using fallback.")
-        return {"food": None, "amount": None, "unit": None, "normalized_name": None}
 
-    # Compose prompt
-    prompt = f"""
+def empty_result() -> dict:
+    """Result returned when the LLM could not parse the ingredient."""
+    return {"food": None, "amount": None, "unit": None, "normalized_name": None}
+
+
+def mock_result() -> dict:
+    """Canned answer used in mock mode or when no API key is set."""
+    return {
+        "food": "mocked chicken",
+        "amount": 3,
+        "unit": "count",
+        "normalized_name": "chicken",
+        "food_score": 90,
+        "unit_score": 95,
+    }
+
+
+SYSTEM_PROMPT = "You extract clean, structured data from messy ingredient strings."
+
+
+def build_prompt(raw_text: str) -> str:
+    """Compose the single-ingredient extraction prompt."""
+    return f"""
 Extract structured ingredient data from the input text.
 
 Return *only* valid JSON — no explanation, no formatting, no markdown, no backticks.
@@ -98,39 +145,130 @@ Example output format:
 Text to parse: "{raw_text}"
 """
 
-    try:
-        print("🚀 Calling Together API...")
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You extract clean, structured data from messy ingredient strings."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=200,
-        )
-        print("📨 Raw response object:", json.dumps(response.model_dump(), indent=2))
-
-        text = response.choices[0].message.content.strip()
-        if not text:
-            print("⚠️ LLM returned empty string.")
-            return {"food": None, "amount": None, "unit": None, "normalized_name": None}
-
-        cleaned = extract_json_block(text)
-        try:
-            parsed = json.loads(cleaned)
-        except Exception as e:
-            print("❌ JSON parsing failed:", e)
-            print("🔎 Raw text that failed to parse:", repr(text))
-            return {"food": None, "amount": None, "unit": None, "normalized_name": None}
 
+def build_messages(raw_text: str) -> list:
+    """Chat messages sent to Together for one ingredient."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(raw_text)},
+    ]
+
+
+# Ingredient lines packed into one batched request
+BATCH_SIZE = 10
+
+
+def build_batch_prompt(raw_texts: list) -> str:
+    """Compose one prompt that asks for a JSON array covering every line."""
+    lines = "\n".join(f"{i}. {json.dumps(t)}" for i, t in enumerate(raw_texts, start=1))
+    return f"""
+Extract structured ingredient data from each numbered line below.
+
+Return *only* a valid JSON array with one object per line, in the same order.
+Each object must include "index" (the line number). No explanation, no markdown, no backticks.
+
+Example output format:
+[
+  {{"index": 1, "food": "carrot", "amount": 2, "unit": "count", "normalized_name": "carrot", "food_score": 0.95, "unit_score": 1.0}}
+]
+
+Lines to parse:
+{lines}
+"""
+
+
+def build_batch_messages(raw_texts: list) -> list:
+    """Chat messages sent to Together for a batch of ingredients."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_batch_prompt(raw_texts)},
+    ]
+
+
+def is_valid_result(result) -> bool:
+    """Check that one parsed ingredient has the fields the updater relies on."""
+    if not isinstance(result, dict):
+        return False
+    if not isinstance(result.get("food"), str) or not result["food"].strip():
+        return False
+    if not isinstance(result.get("normalized_name"), str) or not result["normalized_name"].strip():
+        return False
+    amount = result.get("amount")
+    if amount is not None and (isinstance(amount, bool) or not isinstance(amount, (int, float))):
+        return False
+    unit = result.get("unit")
+    return unit is None or isinstance(unit, str)
+
+
+def parse_batch_response_text(text: str, count: int) -> list:
+    """Match a JSON array reply back to ``count`` input lines.
+
+    Items are placed by their ``index`` field, falling back to position.
+    Lines with a missing or invalid item come back as ``None`` so the
+    caller can retry them one at a time.
+    """
+    results = [None] * count
+    items = parse_json_reply(text, expect=list)
+    if items is None:
+        print("❌ Batch JSON parsing failed:", repr((text or "")[:200]))
+        return results
+
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = item.pop("index", None)
+        slot = index - 1 if isinstance(index, int) and 1 <= index <= count else position
+        if slot < count and results[slot] is None and is_valid_result(item):
+            results[slot] = item
+    return results
+
+
+def parse_response_text(text: str):
+    """Turn the model's reply into a dict, or ``None`` if it isn't usable JSON."""
+    text = (text or "").strip()
+    if not text:
+        print("⚠️ LLM returned empty string.")
+        return None
+    parsed = parse_json_reply(text)
+    if parsed is None:
+        print("❌ JSON parsing failed")
+        print("🔎 Raw text that failed to parse:", repr(text))
+    return parsed
+
+
+# ----------------------------
+# Core Function
+# ----------------------------
+def parse_with_llm(raw_text: str, mock=False) -> dict:
+    cache = get_cache()
+    key = template_key(raw_text)
+    # Entries cached before template keys were keyed by the raw text
+    cached = cache.get(key) or cache.get(raw_text)
+    provider = get_provider()
+    if cached is not None:
+        metrics.record_cache_hit(provider.name)
+        return with_local_amount(cached, raw_text)
+
+    if mock or not provider.available():
+        print(f"⚠️ LLM fallback to mock mode (mock={mock}, provider={provider.name} available={provider.available()})")
+        # Not cached: a canned answer must never stand in for a real one later
+        return with_local_amount(mock_result(), raw_text)
+
+    try:
+        print(f"🚀 Calling {provider.name} LLM...")
+        # Waits for a free rate-limit slot; raises once the daily budget is spent
+        content = provider.complete(build_messages(raw_text), max_tokens=200)
+        print("📨 Raw response:", repr(content))
+        parsed = parse_response_text(content)
+        if parsed is None:
+            return empty_result()
+    except RateLimitExceeded as e:
+        print(f"🚫 {e}. Using fallback.")
+        return empty_result()
     except Exception as e:
         print("❌ LLM call failed:", e)
         traceback.print_exc()
-        return {"food": None, "amount": None, "unit": None, "normalized_name": None}
+        return empty_result()
 
-    cache[raw_text] = parsed
-    usage["count"] += 1
-    write_cache(cache)
-    write_usage(usage)
-    return parsed
+    cache.set(key, parsed)
+    return with_local_amount(parsed, raw_text)
@@ -1,40 +1,163 @@
-import requests
+"""Suggest cleaner normalized names with a Hugging Face model.
+
+Each prompt lists only the catalog names closest to the ingredient,
+found locally with :class:`FoodIndex`, instead of a fixed slice of the
+catalog.  Suggestions are cached by ``(raw, current normalized, catalog
+version)``, so the same question is never asked twice against the same
+catalog.  :func:`suggest_normalized_names` reviews several ingredients
+per request.
+"""
+
+import hashlib
 import os
-import streamlit as st
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from food_project.llm.providers import get_provider
+from food_project.net.http_client import metrics
+from food_project.processing.validator import FoodIndex
+
+# Backend for suggestions; ``LLM_REVIEW_PROVIDER=stub`` works offline
+REVIEW_PROVIDER = os.getenv("LLM_REVIEW_PROVIDER", "huggingface")
+
+# Catalog names retrieved for each ingredient
+TOP_K = 8
+# Retrieved names less similar than this (0-100) are left out, keeping at least one
+MIN_CANDIDATE_SIMILARITY = 50
+# Ingredients reviewed per request in batch mode
+REVIEW_BATCH_SIZE = 8
+
+CACHE_PREFIX = "review:"
+NUMBERED_LINE = re.compile(r"^\s*(\d+)[.):]\s*(.+?)\s*$")
+
+
+def _as_index(food_info_list: Union[FoodIndex, Iterable[str]]) -> FoodIndex:
+    return food_info_list if isinstance(food_info_list, FoodIndex) else FoodIndex(food_info_list)
+
+
+def catalog_version(index: FoodIndex) -> str:
+    """Short hash of the catalog names; changes whenever a food is added or renamed."""
+    return hashlib.sha1("\n".join(index.names).encode("utf-8")).hexdigest()[:12]
+
 
-# Try Streamlit secrets first, then fallback to env variable
-HF_API_KEY = st.secrets.get("huggingface", {}).get("api_key") or os.getenv("HF_API_KEY")
+def review_cache_key(raw_ingredient: str, current_normalized: str, version: str) -> str:
+    return f"{CACHE_PREFIX}{version}:{raw_ingredient}\x1f{current_normalized}"
 
-if not HF_API_KEY:
-    raise Exception("❌ Hugging Face API key not found. Add to secrets.toml or set HF_API_KEY env var.")
 
-API_URL = "https://api-inference.huggingface.co/models/google/flan-t5-base"
+def candidate_names(index: FoodIndex, raw_ingredient: str, current_normalized: str, k: int = TOP_K) -> List[str]:
+    """Up to ``k`` catalog names most similar to the current name (or the raw text)."""
+    matches = index.top_matches(current_normalized or raw_ingredient, limit=k)
+    return [name for i, (name, score) in enumerate(matches) if i == 0 or score >= MIN_CANDIDATE_SIMILARITY]
 
-HEADERS = {"Authorization": f"Bearer {HF_API_KEY}"}
 
-def suggest_normalized_name(raw_ingredient: str, current_normalized: str, food_info_list: list[str]) -> str:
-    prompt = f"""
+def build_prompt(raw_ingredient: str, current_normalized: str, candidates: Sequence[str]) -> str:
+    return f"""
 You are helping clean ingredient names.
 
 Raw ingredient: "{raw_ingredient}"
 Current normalized: "{current_normalized}"
-Available food options: {', '.join(food_info_list[:30])}...
+Closest food options: {', '.join(candidates)}
 
 Suggest a cleaner normalized name (e.g. just "parsley" instead of "flat-leaf parsley roughly") that would best match a real food entry.
 Respond only with the name.
 """
 
-    response = requests.post(API_URL, headers=HEADERS, json={
-        "inputs": prompt,
-        "parameters": {"max_new_tokens": 50, "temperature": 0.3}
-    })
 
-    if response.status_code != 200:
-        print(f"Error {response.status_code}: {response.text}")
+def build_batch_prompt(items: Sequence[Tuple[str, str, Sequence[str]]]) -> str:
+    """One prompt for several ``(raw, current_normalized, candidates)`` items."""
+    lines = [
+        "You are helping clean ingredient names.",
+        "For each numbered ingredient, suggest a cleaner normalized name that best matches a real food entry,",
+        'preferring one of its options (e.g. just "parsley" instead of "flat-leaf parsley roughly").',
+        'Respond with one line per ingredient in the form "<number>. <name>".',
+        "",
+    ]
+    for i, (raw, current, candidates) in enumerate(items, start=1):
+        lines.append(f'{i}. Raw: "{raw}" | Current: "{current}" | Options: {", ".join(candidates)}')
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_reply(text: str, count: int) -> List[Optional[str]]:
+    """Map numbered reply lines back to item positions; missing ones are ``None``."""
+    out: List[Optional[str]] = [None] * count
+    for line in (text or "").splitlines():
+        match = NUMBERED_LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            out[int(match.group(1)) - 1] = match.group(2).strip().strip('"').lower() or None
+    return out
+
+
+def _generate(prompt: str, max_new_tokens: int) -> Optional[str]:
+    try:
+        return get_provider(REVIEW_PROVIDER).complete([{"role": "user", "content": prompt}],
+                                                      max_tokens=max_new_tokens)
+    except Exception as e:
+        print(f"❌ Suggestion request failed: {e}")
         return None
 
-    result = response.json()
-    if isinstance(result, list):
-        return result[0]["generated_text"].split("\n")[-1].strip()
-    else:
+
+def _get_cache(cache):
+    if cache is not None:
+        return cache
+    from food_project.llm.llm_cache import get_cache
+    return get_cache()
+
+
+def suggest_normalized_name(raw_ingredient: str, current_normalized: str,
+                            food_info_list: Union[FoodIndex, Iterable[str]], cache=None) -> str:
+    """Suggest one normalized name; ``food_info_list`` may be a prebuilt :class:`FoodIndex`."""
+    index = _as_index(food_info_list)
+    cache = _get_cache(cache)
+    key = review_cache_key(raw_ingredient, current_normalized, catalog_version(index))
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.record_cache_hit(REVIEW_PROVIDER)
+        return cached["suggestion"]
+
+    candidates = candidate_names(index, raw_ingredient, current_normalized)
+    text = _generate(build_prompt(raw_ingredient, current_normalized, candidates), max_new_tokens=50)
+    if text is None:
         return None
+    suggestion = text.split("\n")[-1].strip()
+    if suggestion:
+        cache.set(key, {"suggestion": suggestion})
+    return suggestion
+
+
+def suggest_normalized_names(items: Iterable[Tuple[str, str]],
+                             food_info_list: Union[FoodIndex, Iterable[str]],
+                             batch_size: int = REVIEW_BATCH_SIZE, cache=None) -> List[Optional[str]]:
+    """Suggest names for many ``(raw, current_normalized)`` pairs.
+
+    Cached pairs are answered locally; the rest go out ``batch_size`` per
+    request.  Items a batch reply leaves out are retried one by one; when
+    the request itself fails, its items stay ``None`` without retries.
+    Returns suggestions in input order (``None`` where none was found).
+    """
+    items = list(items)
+    index = _as_index(food_info_list)
+    cache = _get_cache(cache)
+    version = catalog_version(index)
+    keys = [review_cache_key(raw, current, version) for raw, current in items]
+    cached = cache.get_many(keys)
+    results: List[Optional[str]] = [cached[k]["suggestion"] if k in cached else None for k in keys]
+
+    pending = [i for i, k in enumerate(keys) if k not in cached]
+    metrics.record_cache_hit(REVIEW_PROVIDER, len(items) - len(pending))
+    print(f"🔎 {len(items) - len(pending)} cached suggestion(s), {len(pending)} to review")
+    fresh = {}
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        prompt_items = [(items[i][0], items[i][1], candidate_names(index, *items[i])) for i in chunk]
+        text = _generate(build_batch_prompt(prompt_items), max_new_tokens=16 * len(chunk))
+        if text is None:
+            # The provider is failing; one request per item would only fail more
+            continue
+        for i, suggestion in zip(chunk, parse_batch_reply(text, len(chunk))):
+            if suggestion is None:
+                suggestion = suggest_normalized_name(items[i][0], items[i][1], index, cache=cache)
+            elif suggestion:
+                fresh[keys[i]] = {"suggestion": suggestion}
+            results[i] = suggestion
+    cache.set_many(fresh)
+    return results
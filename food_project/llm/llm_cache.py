@@ -0,0 +1,252 @@
+"""SQLite-backed cache for LLM results.
+
+Replaces the JSON file that had to be read and rewritten in full on every
+lookup.  Each entry is one JSON row, so lookups and upserts are indexed.
+Keys are ingredient templates from ``full_parser.template_key`` (parse
+results), ``completion:``-prefixed request hashes (raw provider
+completions) and ``review:``-prefixed name-review keys.  SQLite's file
+locking (WAL mode plus a busy timeout) keeps it safe to share between
+processes; one connection opened with ``check_same_thread=False`` and
+guarded by a lock serves every thread (Streamlit runs each rerun on a
+new one).  Entries can expire after a TTL, and the cache can be capped
+at a number of entries, evicting the least recently used first.  Reads
+do not write: LRU touches are buffered in memory and stored with the
+next upsert, on close, or once ``TOUCH_FLUSH_SIZE`` have piled up.
+"""
+
+import argparse
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+CACHE_DB_PATH = Path("llm_cache.db")
+# The JSON cache used before the SQLite store; migrated once on first open
+LEGACY_CACHE_PATH = Path("llm_full_parser_cache.json")
+
+# Seconds to wait on another process holding the write lock
+BUSY_TIMEOUT = 30.0
+# SQLite caps bound parameters per statement; stay well under it
+_CHUNK = 500
+# Buffered LRU touches written back in one go once this many pile up
+TOUCH_FLUSH_SIZE = 1000
+
+
+class LLMCache:
+    """Keyed store of ``key -> JSON-serializable result``.
+
+    ``ttl_seconds`` expires entries by age and ``max_entries`` bounds the
+    table size with LRU eviction; both are off when ``None``.  With
+    ``read_only=True`` the file is never created or modified, which the
+    dry-run planner relies on.
+    """
+
+    def __init__(self, path=CACHE_DB_PATH, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, read_only: bool = False,
+                 legacy_json=LEGACY_CACHE_PATH):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        # key -> last read time, not yet written to ``last_used``
+        self._touched: Dict[str, float] = {}
+
+        if read_only:
+            if not self.path.exists():
+                self.conn = None
+                return
+            uri = self.path.resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            return
+
+        is_new = not self.path.exists()
+        self.conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+
+        if is_new and legacy_json and Path(legacy_json).exists():
+            migrated = self.migrate_json(legacy_json)
+            print(f"📦 Migrated {migrated} LLM cache entries from {legacy_json} to {self.path}")
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+    def _expiry_cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for ``key`` or ``None``."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str], touch: bool = True) -> Dict[str, dict]:
+        """Return ``{key: result}`` for every key that is cached and fresh.
+
+        ``touch`` refreshes the LRU timestamp of the hits; the new
+        timestamps are buffered rather than written on every read.
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        with self._lock:
+            if not keys or self.conn is None:
+                return {}
+            return self._get_many_locked(keys, touch)
+
+    def _get_many_locked(self, keys: list, touch: bool) -> Dict[str, dict]:
+        cutoff = self._expiry_cutoff()
+        found = {}
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM llm_cache WHERE key IN ({marks}) AND created_at >= ?",
+                (*chunk, cutoff),
+            ).fetchall()
+            found.update((k, json.loads(v)) for k, v in rows)
+
+        if touch and found and not self.read_only:
+            now = time.time()
+            self._touched.update((k, now) for k in found)
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush_touches()
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+        return found
+
+    def _flush_touches(self) -> None:
+        """Write buffered LRU touches; call inside a write transaction."""
+        if not self._touched:
+            return
+        self.conn.executemany(
+            "UPDATE llm_cache SET last_used = MAX(last_used, ?) WHERE key = ?",
+            [(ts, k) for k, ts in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.get_many([key], touch=False))
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self.conn is None:
+                return 0
+            return self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def set(self, key: str, value: dict) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, dict]) -> None:
+        """Upsert every item in one transaction, then apply eviction."""
+        if not items:
+            return
+        if self.read_only:
+            raise RuntimeError("LLMCache opened read-only")
+        now = time.time()
+        rows = [(k, json.dumps(v), now, now) for k, v in items.items()]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("""
+                    INSERT INTO llm_cache (key, value, created_at, last_used) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        value = excluded.value,
+                        created_at = excluded.created_at,
+                        last_used = excluded.last_used
+                """, rows)
+                self._flush_touches()
+                self._evict()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (self._expiry_cutoff(),))
+        if self.max_entries:
+            self.conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def migrate_json(self, json_path=LEGACY_CACHE_PATH) -> int:
+        """Copy entries from the old JSON cache; existing keys are kept."""
+        data = json.loads(Path(json_path).read_text())
+        now = time.time()
+        rows = [(k, json.dumps(v), now, now) for k, v in data.items() if k]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO llm_cache (key, value, created_at, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self.conn.execute("COMMIT")
+        return len(rows)
+
+    def close(self) -> None:
+        """Write buffered LRU touches and close the connection."""
+        with self._lock:
+            if self.conn is not None:
+                if self._touched and not self.read_only:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    self._flush_touches()
+                    self.conn.execute("COMMIT")
+                self.conn.close()
+                self.conn = None
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Shared cache instance for this process, opened on first use; safe from any thread."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+            # Keep the LRU touches of reads since the last write
+            atexit.register(_default_cache.close)
+        return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or migrate the LLM parse cache")
+    parser.add_argument("--db", default=str(CACHE_DB_PATH), help="Path to the cache database")
+    parser.add_argument("--migrate", metavar="JSON", help="Import entries from an old JSON cache file")
+    parser.add_argument("--max-entries", type=int, help="Evict least recently used entries above this size")
+    parser.add_argument("--ttl-days", type=float, help="Drop entries older than this many days")
+    args = parser.parse_args()
+
+    ttl = args.ttl_days * 86400 if args.ttl_days else None
+    cache = LLMCache(args.db, ttl_seconds=ttl, max_entries=args.max_entries, legacy_json=None)
+    if args.migrate:
+        print(f"📦 Migrated {cache.migrate_json(args.migrate)} entries from {args.migrate}")
+    if ttl or args.max_entries:
+        cache.conn.execute("BEGIN IMMEDIATE")
+        cache._evict()
+        cache.conn.execute("COMMIT")
+    print(f"🗃 {len(cache)} cached LLM result(s) in {cache.path}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""One interface for every LLM backend the pipeline talks to.
+
+A provider turns chat ``messages`` into the model's reply text.  Every
+backend shares the same plumbing:
+
+- HTTP goes through the pooled session in ``food_project.net.http_client``,
+  so timeouts, retries and circuit breaking match the other external calls.
+- The provider's :class:`RateLimiter` is checked before each request.
+- Completions are recorded to the active cassette.
+- Replies can optionally be cached in the shared :class:`LLMCache`.
+
+``LLM_PROVIDER`` picks the default backend (``together``, ``huggingface``
+or ``stub``).  New backends are added with :func:`register_provider`.
+Replies are turned into JSON with :func:`parse_json_reply`, which repairs
+the usual model formatting slips.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from food_project.llm.cassette import Cassette, record_call, request_key
+from food_project.llm.rate_limiter import RateLimiter, get_together_limiter
+from food_project.net.http_client import metrics, request
+
+DEFAULT_PROVIDER = "together"
+PROVIDER_ENV = "LLM_PROVIDER"
+
+TOGETHER_MODEL = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+HUGGINGFACE_MODEL = "google/flan-t5-base"
+
+# Completions cached by request hash live under this prefix in ``LLMCache``
+RESPONSE_CACHE_PREFIX = "completion:"
+
+
+class ProviderError(Exception):
+    """The backend answered, but not with a usable completion."""
+
+
+# ----------------------------
+# JSON repair and validation
+# ----------------------------
+_FENCE = re.compile(r"```(?:json)?\s*([\s\S]*?)```", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def _balanced_block(text: str, opener: str) -> Optional[str]:
+    """First complete ``{...}`` or ``[...]`` block, ignoring brackets inside strings."""
+    closer = "}" if opener == "{" else "]"
+    start = text.find(opener)
+    while start != -1:
+        depth, in_string, escaped = 0, False, False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == opener:
+                depth += 1
+            elif ch == closer:
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        start = text.find(opener, start + 1)
+    return None
+
+
+def parse_json_reply(text: Optional[str], expect: type = dict):
+    """Pull a JSON object (``expect=dict``) or array (``expect=list``) out of a reply.
+
+    Strips markdown fences, smart quotes and trailing commas, and ignores
+    any chatter around the JSON.  Returns ``None`` when nothing of the
+    expected type can be recovered.
+    """
+    if not text or not text.strip():
+        return None
+    fenced = _FENCE.search(text)
+    body = (fenced.group(1) if fenced else text).translate(_SMART_QUOTES)
+    block = _balanced_block(body, "{" if expect is dict else "[")
+    if block is None:
+        return None
+    for candidate in (block, _TRAILING_COMMA.sub(r"\1", block)):
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        return value if isinstance(value, expect) else None
+    return None
+
+
+# ----------------------------
+# Providers
+# ----------------------------
+class ChatProvider:
+    """Base class: subclasses implement :meth:`_send` for one backend."""
+
+    name = "base"
+
+    def __init__(self, model: str, limiter: Optional[RateLimiter] = None, cache=None):
+        self.model = model
+        self.limiter = limiter
+        self._cache = cache
+
+    def available(self) -> bool:
+        """Whether the backend is configured (e.g. has an API key)."""
+        return True
+
+    def _send(self, messages: list, model: str, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    def _get_cache(self):
+        if self._cache is None:
+            from food_project.llm.llm_cache import get_cache
+            self._cache = get_cache()
+        return self._cache
+
+    def _cache_key(self, model: str, messages: list) -> str:
+        return RESPONSE_CACHE_PREFIX + request_key(model, messages)
+
+    def _cached(self, model: str, messages: list, use_cache: bool) -> Optional[str]:
+        if not use_cache:
+            return None
+        hit = self._get_cache().get(self._cache_key(model, messages))
+        if hit is None:
+            return None
+        metrics.record_cache_hit(self.name)
+        return hit["content"]
+
+    def _finish(self, model: str, messages: list, content: str, start: float, use_cache: bool) -> str:
+        record_call(model, messages, content, time.monotonic() - start)
+        if use_cache and content:
+            self._get_cache().set(self._cache_key(model, messages), {"content": content})
+        return content
+
+    def complete(self, messages: list, max_tokens: int = 200, temperature: float = 0.3,
+                 model: Optional[str] = None, use_cache: bool = False) -> str:
+        """Return the reply text for ``messages``.
+
+        Waits for a rate-limit slot first; raises ``RateLimitExceeded``,
+        ``CircuitOpenError`` or an HTTP/:class:`ProviderError` on failure.
+        """
+        model = model or self.model
+        cached = self._cached(model, messages, use_cache)
+        if cached is not None:
+            return cached
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = time.monotonic()
+        content = self._send(messages, model, max_tokens, temperature)
+        return self._finish(model, messages, content, start, use_cache)
+
+    async def acomplete(self, messages: list, max_tokens: int = 200, temperature: float = 0.3,
+                        model: Optional[str] = None, use_cache: bool = False) -> str:
+        """Async :meth:`complete`: waits for the limiter on the loop, sends on a worker thread."""
+        model = model or self.model
+        cached = self._cached(model, messages, use_cache)
+        if cached is not None:
+            return cached
+        if self.limiter is not None:
+            await self.limiter.acquire_async()
+        start = time.monotonic()
+        content = await asyncio.to_thread(self._send, messages, model, max_tokens, temperature)
+        return self._finish(model, messages, content, start, use_cache)
+
+
+class OpenAICompatibleProvider(ChatProvider):
+    """Any ``/chat/completions`` endpoint: Together, or the local stub server."""
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None,
+                 api_key_env: Optional[str] = None, http_provider: str = "together", **kwargs):
+        super().__init__(model, **kwargs)
+        self.base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self.api_key_env = api_key_env
+        self.http_provider = http_provider
+        self.name = http_provider
+
+    @property
+    def api_key(self) -> Optional[str]:
+        # Read from the environment on every call so a key set later is picked up
+        return self._api_key or (os.getenv(self.api_key_env) if self.api_key_env else None)
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _send(self, messages, model, max_tokens, temperature):
+        if not self.api_key:
+            raise ProviderError(f"{self.name}: no API key configured")
+        response = request(
+            self.http_provider, "POST", f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+        )
+        response.raise_for_status()
+        try:
+            payload = response.json()
+            content = payload["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ProviderError(f"{self.name}: malformed completion ({e})") from e
+        usage = payload.get("usage") or {}
+        event = metrics.last_event()
+        if event is not None:
+            event["prompt_tokens"] = usage.get("prompt_tokens")
+            event["completion_tokens"] = usage.get("completion_tokens")
+        return content
+
+
+class HuggingFaceProvider(ChatProvider):
+    """Hugging Face inference API text generation; messages are flattened into one prompt."""
+
+    name = "huggingface"
+    API_BASE = "https://api-inference.huggingface.co/models"
+
+    def __init__(self, model: str = HUGGINGFACE_MODEL, api_key: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self._api_key = api_key
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """Resolved on first use: Streamlit secrets, then ``HF_API_KEY``."""
+        if self._api_key is None:
+            try:
+                import streamlit as st
+                self._api_key = st.secrets.get("huggingface", {}).get("api_key")
+            except Exception:
+                pass
+            self._api_key = self._api_key or os.getenv("HF_API_KEY")
+        return self._api_key
+
+    def available(self) -> bool:
+        return bool(os.getenv("HF_API_KEY") or self._api_key)
+
+    def _send(self, messages, model, max_tokens, temperature):
+        if not self.api_key:
+            raise ProviderError("❌ Hugging Face API key not found. Add to secrets.toml or set HF_API_KEY env var.")
+        prompt = "\n\n".join(m["content"] for m in messages if m.get("role") != "system") or ""
+        response = request(
+            "huggingface", "POST", f"{self.API_BASE}/{model}",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"inputs": prompt, "parameters": {"max_new_tokens": max_tokens, "temperature": temperature}},
+        )
+        if response.status_code != 200:
+            raise ProviderError(f"huggingface: HTTP {response.status_code}: {response.text[:200]}")
+        result = response.json()
+        if not isinstance(result, list) or not result:
+            raise ProviderError(f"huggingface: unexpected reply {str(result)[:200]}")
+        return result[0].get("generated_text", "")
+
+
+class StubProvider(ChatProvider):
+    """In-process stand-in: replays cassettes, otherwise answers with the rule-based parser.
+
+    Shares its answering logic with ``food_project.dev.llm_stub_server``
+    but needs no server, key or network.
+    """
+
+    name = "stub"
+
+    def __init__(self, model: str = TOGETHER_MODEL, cassettes=(), **kwargs):
+        super().__init__(model, **kwargs)
+        self.recordings = {}
+        for path in cassettes:
+            self.recordings.update(Cassette(path).load())
+
+    def _send(self, messages, model, max_tokens, temperature):
+        entry = self.recordings.get(request_key(model, messages))
+        if entry is not None:
+            return entry["content"]
+        from food_project.dev.llm_stub_server import synthesize_content
+        return synthesize_content(messages)
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+def _together() -> ChatProvider:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return OpenAICompatibleProvider(
+        # Point at food_project.dev.llm_stub_server to run against a local server
+        os.getenv("TOGETHER_BASE_URL", "https://api.together.xyz/v1"),
+        TOGETHER_MODEL,
+        api_key_env="TOGETHER_API_KEY",
+        http_provider="together",
+        limiter=get_together_limiter(),
+    )
+
+
+def _huggingface() -> ChatProvider:
+    return HuggingFaceProvider()
+
+
+def _stub() -> ChatProvider:
+    paths = [p for p in os.getenv("LLM_STUB_CASSETTES", "").split(os.pathsep) if p]
+    return StubProvider(cassettes=paths)
+
+
+PROVIDER_FACTORIES: Dict[str, Callable[[], ChatProvider]] = {
+    "together": _together,
+    "huggingface": _huggingface,
+    "stub": _stub,
+}
+
+
+def register_provider(name: str, factory: Callable[[], ChatProvider]) -> None:
+    """Make a new backend available to :func:`get_provider` under ``name``."""
+    PROVIDER_FACTORIES[name] = factory
+    _build.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _build(name: str) -> ChatProvider:
+    if name not in PROVIDER_FACTORIES:
+        raise ValueError(f"Unknown LLM provider '{name}'. Choose from: {', '.join(PROVIDER_FACTORIES)}")
+    return PROVIDER_FACTORIES[name]()
+
+
+def get_provider(name: Optional[str] = None) -> ChatProvider:
+    """Shared provider instance; defaults to ``LLM_PROVIDER`` or Together."""
+    return _build(name or os.getenv(PROVIDER_ENV, DEFAULT_PROVIDER))
+
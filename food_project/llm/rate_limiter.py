@@ -0,0 +1,156 @@
+"""Sliding-window rate limiter shared by every Together call site.
+
+Each granted request is logged as a timestamp in a small SQLite file, so
+the per-minute and per-day windows hold across threads and processes.
+A call that would exceed a window waits until the oldest request in that
+window ages out instead of being dropped.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+RATE_LIMIT_DB_PATH = Path("llm_rate_limit.db")
+
+# Together free-tier budget; override with the env vars of the same name (0 = no limit)
+TOGETHER_REQUESTS_PER_MINUTE = int(os.getenv("TOGETHER_REQUESTS_PER_MINUTE", 60))
+TOGETHER_REQUESTS_PER_DAY = int(os.getenv("TOGETHER_REQUESTS_PER_DAY", 100))
+
+# Longest a caller will sleep for a slot before giving up
+DEFAULT_MAX_WAIT = 300.0
+
+MINUTE = 60.0
+DAY = 86400.0
+
+
+class RateLimitExceeded(Exception):
+    """No slot opens within ``max_wait``; ``retry_after`` is in seconds."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} rate limit reached; next slot in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Requests-per-minute and requests-per-day limits for one provider."""
+
+    def __init__(self, name: str, per_minute: Optional[int] = None, per_day: Optional[int] = None,
+                 path=RATE_LIMIT_DB_PATH, max_wait: float = DEFAULT_MAX_WAIT):
+        self.name = name
+        self.path = Path(path)
+        self.max_wait = max_wait
+        self.windows = {w: n for w, n in ((MINUTE, per_minute), (DAY, per_day)) if n}
+        self._conn = None
+        # Worker threads share one connection; its transactions must not interleave
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_calls (name TEXT NOT NULL, ts REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limit_calls ON rate_limit_calls(name, ts)")
+        return self._conn
+
+    def _try_acquire(self) -> float:
+        """Record a request if every window has room; else return the wait."""
+        if not self.windows:
+            return 0.0
+        with self._lock:
+            return self._try_acquire_locked()
+
+    def _try_acquire_locked(self) -> float:
+        conn = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock so check-and-insert is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rate_limit_calls WHERE name = ? AND ts < ?", (self.name, now - DAY))
+            wait = 0.0
+            for window, limit in self.windows.items():
+                rows = conn.execute(
+                    "SELECT ts FROM rate_limit_calls WHERE name = ? AND ts >= ? ORDER BY ts",
+                    (self.name, now - window),
+                ).fetchall()
+                if len(rows) >= limit:
+                    # The slot frees when the request ``limit`` places back ages out
+                    wait = max(wait, rows[len(rows) - limit][0] + window - now)
+            if wait <= 0:
+                conn.execute("INSERT INTO rate_limit_calls (name, ts) VALUES (?, ?)", (self.name, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(0.0, wait)
+
+    def acquire(self, block: bool = True) -> None:
+        """Take a slot, sleeping until one opens.
+
+        Raises :class:`RateLimitExceeded` when ``block`` is false or the
+        wait would be longer than ``max_wait`` (e.g. the day is used up).
+        """
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            if not block or wait > self.max_wait:
+                raise RateLimitExceeded(self.name, wait)
+            print(f"⏳ {self.name} rate limit: waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Async version of :meth:`acquire` that waits without blocking the loop.
+
+        The SQLite check runs on a worker thread, since it may wait up to
+        the busy timeout for another process's write lock.
+        """
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire)
+            if wait <= 0:
+                return
+            if wait > self.max_wait:
+                raise RateLimitExceeded(self.name, wait)
+            await asyncio.sleep(wait)
+
+    def remaining(self) -> Dict[str, int]:
+        """Requests left in each window, without recording anything."""
+        window_names = {MINUTE: "per_minute", DAY: "per_day"}
+        if not self.path.exists():
+            return {window_names[w]: n for w, n in self.windows.items()}
+        uri = self.path.resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        now = time.time()
+        left = {}
+        try:
+            for window, limit in self.windows.items():
+                used = conn.execute(
+                    "SELECT COUNT(*) FROM rate_limit_calls WHERE name = ? AND ts >= ?",
+                    (self.name, now - window),
+                ).fetchone()[0]
+                left[window_names[window]] = max(0, limit - used)
+        except sqlite3.OperationalError:
+            left = {window_names[w]: n for w, n in self.windows.items()}
+        finally:
+            conn.close()
+        return left
+
+
+_together_limiter = None
+
+
+def get_together_limiter() -> RateLimiter:
+    """Limiter shared by every Together request in this process."""
+    global _together_limiter
+    if _together_limiter is None:
+        _together_limiter = RateLimiter(
+            "together",
+            per_minute=TOGETHER_REQUESTS_PER_MINUTE,
+            per_day=TOGETHER_REQUESTS_PER_DAY,
+        )
+    return _together_limiter
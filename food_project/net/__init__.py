@@ -0,0 +1,4 @@
+"""Shared HTTP layer for external services."""
+
+# Modules in this package wrap outbound calls with per-provider timeouts,
+# retries with backoff, circuit breakers and latency metrics.
@@ -0,0 +1,325 @@
+"""Resilient HTTP calls with per-provider timeouts, retries and circuit breakers.
+
+Every outbound request goes through :func:`request`.  Each provider has
+its own timeouts and retry budget.  Retries on 429/5xx and connection
+errors use jittered exponential backoff and honour ``Retry-After``.  A
+circuit breaker fails fast while a provider keeps failing, and latency
+is tracked per provider.
+
+All calls share one pooled keep-alive session (:func:`get_session`), so
+repeated lookups against the same host skip the TCP and TLS handshakes.
+``HTTP_POOL_SIZE`` sets how many connections are kept open per host; keep
+it at least as large as the number of worker threads sharing the session.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Keep-alive connections kept open per host
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# Sent with every request unless the caller overrides them
+DEFAULT_HEADERS = {"User-Agent": "food-project/1.0"}
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    name: str
+    connect_timeout: float = 3.05
+    read_timeout: float = 15.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    "nutritionix": ProviderConfig("nutritionix", read_timeout=10.0),
+    "huggingface": ProviderConfig("huggingface", read_timeout=30.0),
+    "recipe_sites": ProviderConfig("recipe_sites", connect_timeout=5.0, read_timeout=20.0, max_retries=1),
+    "together": ProviderConfig("together", connect_timeout=5.0, read_timeout=60.0),
+}
+
+
+def provider_config(provider: str) -> ProviderConfig:
+    return PROVIDERS.get(provider) or ProviderConfig(provider)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling out while a provider's circuit is open."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"{key} circuit open; retry in {retry_in:.0f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open every call fails fast.  After ``reset_timeout`` one trial
+    call is let through (half-open); success closes the circuit and
+    failure opens it again.
+    """
+
+    def __init__(self, key: str, failure_threshold: int, reset_timeout: float):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise :class:`CircuitOpenError` or let the call through; True for the half-open trial."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(self.key, retry_in)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial_in_flight:
+                    print(f"⛔ {self.key} circuit opened after {self.failures} failure(s)")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def end_trial(self) -> None:
+        """Let the next trial through after one ended without recording an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(provider: str, key: Optional[str] = None) -> CircuitBreaker:
+    """Shared breaker for ``provider`` (or a finer ``key``, e.g. one host)."""
+    key = key or provider
+    with _breakers_lock:
+        if key not in _breakers:
+            config = provider_config(provider)
+            _breakers[key] = CircuitBreaker(key, config.failure_threshold, config.reset_timeout)
+        return _breakers[key]
+
+
+class LatencyMetrics:
+    """Per-provider call counts and a window of recent latencies.
+
+    Every call (and every cache hit that saved one) is also kept as an
+    event until :meth:`drain` hands it to ``database.call_metrics`` for
+    storage.
+    """
+
+    def __init__(self, window: int = 1000, max_events: int = 100_000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+        self._events = deque(maxlen=max_events)
+        self._local = threading.local()
+
+    def _stats_for(self, provider: str) -> dict:
+        return self._stats.setdefault(provider, {
+            "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0, "latencies": deque(maxlen=self.window),
+        })
+
+    def record(self, provider: str, seconds: float, ok: bool, retries: int = 0,
+               status: Optional[str] = None) -> dict:
+        """Record one external call; returns its event so callers can add token counts."""
+        event = {
+            "provider": provider, "seconds": seconds, "ok": ok, "retries": retries,
+            "status": status or ("ok" if ok else "error"), "cache_hit": False,
+            "prompt_tokens": None, "completion_tokens": None, "ts": time.time(),
+        }
+        with self._lock:
+            stats = self._stats_for(provider)
+            stats["calls"] += 1
+            stats["retries"] += retries
+            if not ok:
+                stats["errors"] += 1
+            stats["latencies"].append(seconds)
+            self._events.append(event)
+        self._local.last_event = event
+        return event
+
+    def record_cache_hit(self, provider: str, count: int = 1) -> None:
+        """Record lookups answered from a local cache instead of ``provider``."""
+        if count <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._stats_for(provider)["cache_hits"] += count
+            for _ in range(count):
+                self._events.append({
+                    "provider": provider, "seconds": 0.0, "ok": True, "retries": 0,
+                    "status": "cache", "cache_hit": True,
+                    "prompt_tokens": None, "completion_tokens": None, "ts": now,
+                })
+
+    def last_event(self) -> Optional[dict]:
+        """The most recent call recorded on this thread."""
+        return getattr(self._local, "last_event", None)
+
+    def drain(self) -> list:
+        """Return and forget every event recorded so far."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def snapshot(self) -> Dict[str, dict]:
+        """``{provider: {calls, errors, retries, cache_hits, p50, p95, max}}`` in seconds."""
+        out = {}
+        with self._lock:
+            for provider, stats in self._stats.items():
+                latencies = sorted(stats["latencies"])
+                out[provider] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "cache_hits": stats["cache_hits"],
+                    "p50": _percentile(latencies, 0.50),
+                    "p95": _percentile(latencies, 0.95),
+                    "max": latencies[-1] if latencies else None,
+                }
+        return out
+
+
+def _percentile(sorted_values, fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 4)
+
+
+metrics = LatencyMetrics()
+
+
+def backoff_delay(config: ProviderConfig, attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, or the server's ``Retry-After`` if given."""
+    if retry_after:
+        try:
+            return min(config.backoff_max, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * 2 ** attempt))
+
+
+def build_session(pool_size: int = POOL_SIZE, headers: Optional[Dict[str, str]] = None):
+    """A ``requests.Session`` keeping up to ``pool_size`` connections open per host.
+
+    Retries are left to :func:`request`, so the adapter never retries on
+    its own.  Threads may share the session: each request borrows its own
+    connection from the pool, and when more than ``pool_size`` requests
+    run at once the extras use a throwaway connection instead of waiting.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    """The process-wide pooled session used by :func:`request`."""
+    return build_session()
+
+
+def request(provider: str, method: str, url: str, breaker_key: Optional[str] = None,
+            session=None, **kwargs):
+    """Send an HTTP request through the provider's timeout, retry and breaker policy.
+
+    ``session`` defaults to :func:`get_session`; pass another pooled
+    session to send provider-specific default headers.  Returns the final
+    ``requests.Response`` (call ``raise_for_status`` as usual).  Raises
+    :class:`CircuitOpenError` without sending anything while the circuit
+    is open, the last connection error once retries are used up, or any
+    other ``requests`` error straight away.
+    """
+    config = provider_config(provider)
+    breaker = breaker_for(provider, breaker_key)
+    trial = breaker.before_call()
+    kwargs.setdefault("timeout", config.timeout)
+    try:
+        return _send(provider, config, breaker, session or get_session(), method, url, **kwargs)
+    finally:
+        if trial:
+            # No-op once an outcome was recorded; otherwise the circuit could never close again
+            breaker.end_trial()
+
+
+def _send(provider: str, config: ProviderConfig, breaker: CircuitBreaker, session, method: str,
+          url: str, **kwargs):
+    """The retry loop behind :func:`request`; records every outcome on ``breaker`` and ``metrics``."""
+    import requests
+
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+            if not retryable or attempt >= config.max_retries:
+                breaker.record_failure()
+                metrics.record(provider, time.monotonic() - start, ok=False, retries=attempt,
+                               status=type(e).__name__)
+                raise
+            delay = backoff_delay(config, attempt)
+            print(f"🔁 {provider}: {type(e).__name__}, retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= config.max_retries:
+                ok = response.status_code < 500 and response.status_code != 429
+                if ok:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                metrics.record(provider, time.monotonic() - start, ok=ok, retries=attempt,
+                               status=str(response.status_code))
+                return response
+            delay = backoff_delay(config, attempt, response.headers.get("Retry-After"))
+            print(f"🔁 {provider}: HTTP {response.status_code}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
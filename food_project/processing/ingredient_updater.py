@@ -1,32 +1,152 @@
 """Parse raw ingredient text and store structured info, with LLM fallback and nutrition enrichment."""
-import streamlit as st
-st.write("✅ ingredient_updater.py loaded")
 import sqlite3
-import os
-import argparse
 from pathlib import Path
 from food_project.processing.normalization import parse_ingredient
-from food_project.processing.validator import score_food_match, score_unit
+from food_project.processing.validator import FoodIndex, score_parse
 from food_project.processing.units import COMMON_UNITS
-from food_project.llm.full_parser import parse_with_llm
+from food_project.llm.async_parser import parse_many_with_llm, DEFAULT_CONCURRENCY
+from food_project.llm.full_parser import BATCH_SIZE
 from food_project.llm.estimate_nutrition import estimate_nutrition_from_llm
-from food_project.database.nutritionix_service import get_nutrition_data
+from food_project.processing.nutrition_estimator import NutritionEstimator
+from food_project.database.nutritionix_service import get_nutrition_data_many
+from food_project.database.food_info_cache import food_info_cache
+from food_project.database.lookup_failures import ensure_lookup_failures_table
 from food_project.database.sqlite_connector import init_db
+from food_project.database.batch_writer import BatchWriter, DEFAULT_BATCH_ROWS, DEFAULT_BATCH_SECONDS
+from food_project.database.pipeline_jobs import (
+    DONE, FAILED, MARK_ITEM_SQL, find_resumable_job, finish_job, start_job, unfinished_items,
+)
+from food_project.database.call_metrics import run_id_for, save_call_metrics
+from food_project.net.http_client import metrics
+from food_project.processing.progress import ProgressReporter, default_reporter
 
-print("🚨 ingredient_updater.py is running from:", __file__)
+JOB_TYPE = "update_ingredients"
 
-def update_ingredients(force=False, db_path="food_info.db", init=False, mock=False, mode="auto"):
-    """Update ingredients table with parsed amounts, units, match scores, LLM fallback, and nutrition."""
-    abs_path = Path(db_path).resolve()
-    st.write(f"📂 Opening DB at: {abs_path}")
+# Rows scoring below this on food or unit go to the LLM fallback
+CONFIDENCE_THRESHOLD = 80
+
+# Which ingredient rows each ``mode`` selects
+MODE_QUERIES = {
+    "auto": "SELECT id, food_name FROM ingredients WHERE normalized_name IS NULL",
+    "match": "SELECT id, food_name FROM ingredients WHERE normalized_name IS NOT NULL AND matched_food_id IS NULL",
+    "full": "SELECT id, food_name FROM ingredients WHERE normalized_name IS NULL OR matched_food_id IS NULL",
+    "all": "SELECT id, food_name FROM ingredients",
+}
+
+UPDATE_INGREDIENT_SQL = """
+    UPDATE ingredients
+    SET amount = ?, unit = ?, normalized_name = ?, estimated_grams = ?,
+        food_score = ?, unit_score = ?, matched_food_id = ?
+    WHERE id = ?
+"""
+
+INSERT_REVIEW_LOG_SQL = """
+    INSERT INTO ingredient_review_log (
+        ingredient_id, raw_text, normalized_name, amount, unit,
+        food_score, unit_score,
+        used_llm, used_llm_estimate, used_nutritionix, used_knn_estimate
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_ESTIMATE_SQL = """
+    INSERT OR IGNORE INTO food_info (
+        raw_name, normalized_name, serving_qty, serving_unit,
+        serving_weight_grams, calories, fat, saturated_fat, cholesterol,
+        sodium, carbs, fiber, sugars, protein, potassium,
+        match_type, approved
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _queue_food_info(conn, writer, normalized_name, resolved, queued, mock=False, estimator=None,
+                     progress: ProgressReporter = None):
+    """Queue a new ``food_info`` row for ``normalized_name`` on ``writer``.
+
+    ``resolved`` is the normalized name the batched Nutritionix lookup
+    returned for this name (its row is already queued on ``writer``
+    unless that name was stored or queued before).  ``queued`` holds
+    every normalized name queued for insert in this run; names in it
+    count as resolved even though ``food_info_cache`` cannot see them
+    before the writer's next checkpoint.  Otherwise a local
+    nearest-neighbour estimate from ``estimator`` is tried, and only then
+    the LLM estimate; when neither has one nothing is queued.  Returns
+    ``(used_nutritionix, used_llm_estimate, used_knn_estimate)``.
+    """
+    progress = default_reporter(progress)
+    used_nutritionix = 1 if resolved else 0
+    # Resolved by this lookup or by another one in the run ("1 egg" and "egg" -> "egg")
+    if normalized_name in queued or (resolved and (resolved == normalized_name or resolved in queued)):
+        return 1, 0, 0
+
+    # Stored earlier, possibly under the name Nutritionix returned
+    if food_info_cache.get(conn, normalized_name) or (resolved and food_info_cache.get(conn, resolved)):
+        return used_nutritionix, 0, 0
+
+    # Still not found? Average the nearest catalog foods
+    est = estimator.estimate(normalized_name) if estimator is not None else None
+    if est:
+        progress.message(f"📐 Estimated {normalized_name} from {', '.join(est['neighbors'])}")
+        _queue_estimate(writer, normalized_name, est, "knn_estimate")
+        queued.add(normalized_name)
+        return used_nutritionix, 0, 1
+
+    # Nothing similar in the catalog either; last resort is the LLM
+    est = estimate_nutrition_from_llm(normalized_name, mock=mock)
+    if not est:
+        progress.message(f"🤷 No nutrition found or estimated for: {normalized_name}")
+        return used_nutritionix, 0, 0
+    progress.message(f"⚠️ API failed. Estimated nutrition via LLM for: {normalized_name}")
+    _queue_estimate(writer, normalized_name, est, "llm_estimate")
+    queued.add(normalized_name)
+    return used_nutritionix, 1, 0
+
+
+def _queue_estimate(writer, normalized_name, est, match_type):
+    """Queue an unapproved per-100g ``food_info`` row from an estimate."""
+    writer.add(INSERT_ESTIMATE_SQL, (
+        normalized_name, normalized_name,
+        100, "g", 100,
+        est.get("calories"), est.get("fat"), est.get("saturated_fat"), est.get("cholesterol"),
+        est.get("sodium"), est.get("carbs"), est.get("fiber"), est.get("sugars"),
+        est.get("protein"), est.get("potassium"),
+        match_type, 0
+    ))
+
+
+def _lookup_food_ids(conn, names):
+    """Return ``{normalized_name: id}`` for the given names via ``food_info_cache``."""
+    return {name: row["id"] for name, row in food_info_cache.get_many(conn, names).items()}
+
+
+def update_ingredients(force=False, db_path="food_info.db", init=False, mock=False, mode="auto",
+                       llm_concurrency=DEFAULT_CONCURRENCY, batch_rows=DEFAULT_BATCH_ROWS,
+                       batch_seconds=DEFAULT_BATCH_SECONDS, resume=False,
+                       progress: ProgressReporter = None, llm_batch_size=BATCH_SIZE):
+    """Update ingredients table with parsed amounts, units, match scores, LLM fallback, and nutrition.
+
+    Rows whose logic-based scores are too low are sent to the LLM as one
+    concurrent batch, ``llm_batch_size`` lines per request and up to
+    ``llm_concurrency`` requests in flight.  All
+    writes go through a :class:`BatchWriter` that commits every
+    ``batch_rows`` statements or ``batch_seconds`` seconds.
+
+    Every run is recorded in ``pipeline_jobs``.  With ``resume=True`` the
+    most recent unfinished run is continued with its original parameters,
+    processing only the items that are still pending or failed.
+
+    Progress (messages, stage timings, rows done, external calls) is
+    reported through ``progress``; by default it is printed to the console.
+    Returns a summary dict, or ``None`` if nothing was run.
+    """
+    progress = default_reporter(progress)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
-    st.write("🛠 Connected to:", os.path.abspath(db_path))
-    st.write("📍 DB path in updater:", conn.execute("PRAGMA database_list").fetchone()[2])
+    progress.message(f"📍 DB path in updater: {Path(db_path).resolve()}")
 
     if init:
-        print("⚙️ init_db() is recreating the food_info table")
+        progress.message("⚙️ init_db() is recreating the food_info table")
         init_db(conn)
 
     # Ensure review log table exists
@@ -43,21 +163,27 @@ def update_ingredients(force=False, db_path="food_info.db", init=False, mock=Fal
         used_llm INTEGER,
         used_llm_estimate INTEGER,
         used_nutritionix INTEGER,
+        used_knn_estimate INTEGER,
         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
         approved TEXT DEFAULT 'pending'
     )
     """)
+    try:
+        cur.execute("ALTER TABLE ingredient_review_log ADD COLUMN used_knn_estimate INTEGER")
+    except sqlite3.OperationalError:
+        pass
+    # Lookup failures are queued on the batch writer, which never creates tables
+    ensure_lookup_failures_table(conn)
 
     try:
         cur.execute("SELECT COUNT(*) FROM ingredients")
     except sqlite3.OperationalError:
-        print("❌ Error: ingredients table missing. Did you initialize the DB?")
+        progress.message("❌ Error: ingredients table missing. Did you initialize the DB?")
         conn.close()
-        return
-    print("🚩 Ingredients table exists, continuing...")
+        return None
 
     total = cur.fetchone()[0]
-    st.write(f"📊 Total ingredients in DB: {total}")
+    progress.message(f"📊 Total ingredients in DB: {total}")
 
     # Ensure necessary columns exist
     for column_def in [
@@ -80,137 +206,188 @@ def update_ingredients(force=False, db_path="food_info.db", init=False, mock=Fal
     known_foods = [row["normalized_name"] for row in food_info_rows]
     food_name_to_id = {row["normalized_name"]: row["id"] for row in food_info_rows}
 
-    # Flexible logic based on `mode`
-    if mode == "auto":
-        query = "SELECT id, food_name FROM ingredients WHERE normalized_name IS NULL"
-    elif mode == "match":
-        query = "SELECT id, food_name FROM ingredients WHERE normalized_name IS NOT NULL AND matched_food_id IS NULL"
-    elif mode == "full":
-        query = "SELECT id, food_name FROM ingredients WHERE normalized_name IS NULL OR matched_food_id IS NULL"
-    elif mode == "all":
-        query = "SELECT id, food_name FROM ingredients"
+    job = None
+    if resume:
+        job = find_resumable_job(conn, JOB_TYPE)
+        if not job:
+            progress.message("✅ No unfinished update_ingredients run to resume.")
+            conn.close()
+            return None
+        mode = job["params"].get("mode", mode)
+        mock = job["params"].get("mock", mock)
+        pending_keys = set(unfinished_items(conn, job["id"]))
+        rows = [row for row in cur.execute("SELECT id, food_name FROM ingredients").fetchall()
+                if str(row["id"]) in pending_keys]
+        job_id = job["id"]
+        progress.message(f"🔁 Resuming job {job_id} (mode='{mode}'): {len(rows)} unfinished item(s)")
     else:
-        print(f"❌ Unknown mode '{mode}'. Use 'auto', 'match', 'full', or 'all'.")
-        conn.close()
-        return
-    print(f"DEBUG: About to set query for mode={mode}")
-    print(f"DEBUG: Query set to: {query}")
-    rows = cur.execute(query).fetchall()
-    print(f"🔍 Ingredients to update: {len(rows)}")
-    if len(rows) > 0:
-        print('Sample rows to update:', rows[:3])
+        # Flexible logic based on `mode`
+        query = MODE_QUERIES.get(mode)
+        if query is None:
+            progress.message(f"❌ Unknown mode '{mode}'. Use 'auto', 'match', 'full', or 'all'.")
+            conn.close()
+            return None
+        rows = cur.execute(query).fetchall()
+        job_id = start_job(conn, JOB_TYPE, {"mode": mode, "mock": mock}, [row["id"] for row in rows])
+        progress.message(f"🗂 Started job {job_id} (mode='{mode}')")
+    progress.run_started(len(rows), job_id=job_id, mode=mode)
+    # Calls made before this run are stored without a run id
+    save_call_metrics(conn, None)
 
-    updated = 0
-    for ing_id, raw_text in rows:
-        used_llm = 0
-        used_llm_estimate = 0
-        used_nutritionix = 0
-
-        amount, unit, normalized_name, est_grams = parse_ingredient(raw_text)
-        food_score = score_food_match(normalized_name, known_foods)
-        unit_score = score_unit(unit, set(COMMON_UNITS))
-
-        if (food_score < 80 or unit_score < 80) and raw_text:
-            used_llm = 1
-            print(f"🤖 Using LLM for ingredient {ing_id}: '{raw_text}' (scores: food={food_score}, unit={unit_score})")
-            llm_result = parse_with_llm(raw_text, mock=mock)
-            if llm_result.get("food"):
-                amount = llm_result.get("amount")
-                unit = llm_result.get("unit")
-                normalized_name = llm_result.get("normalized_name")
-                est_grams = None
-                food_score = llm_result.get("food_score", 60.0)
-                unit_score = llm_result.get("unit_score", 60.0)
-
-        matched_food_id = food_name_to_id.get(normalized_name)
-        result = None
-        if not matched_food_id and normalized_name:
-            print(f"🥣 Fetching nutrition info for: {normalized_name}")
-            result = get_nutrition_data(normalized_name, conn, use_mock=mock, skip_if_exists=True)
-            used_nutritionix = 1 if result else 0
-
-            # Check again if inserted from nutritionix
-            cur.execute("SELECT id FROM food_info WHERE normalized_name = ?", (normalized_name,))
-            row = cur.fetchone()
-            matched_food_id = row["id"] if row else None
-
-            # Still not found? Try LLM estimate
-            if not matched_food_id:
-                used_llm_estimate = 1
-                print(f"⚠️ API failed. Estimating nutrition via LLM for: {normalized_name}")
-                est = estimate_nutrition_from_llm(normalized_name, mock=mock)
-                if est:
-                    try:
-                        cur.execute("""
-                            INSERT INTO food_info (
-                                raw_name, normalized_name, serving_qty, serving_unit,
-                                serving_weight_grams, calories, fat, saturated_fat, cholesterol,
-                                sodium, carbs, fiber, sugars, protein, potassium,
-                                match_type, approved
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            normalized_name, normalized_name,
-                            100, "g", 100,
-                            est.get("calories"), est.get("fat"), est.get("saturated_fat"), est.get("cholesterol"),
-                            est.get("sodium"), est.get("carbs"), est.get("fiber"), est.get("sugars"),
-                            est.get("protein"), est.get("potassium"),
-                            "llm_estimate", 0
-                        ))
-                        conn.commit()
-                    except sqlite3.IntegrityError:
-                        print(f"⏩ Skipped duplicate: {normalized_name}")
-
-            cur.execute("SELECT id FROM food_info WHERE normalized_name = ?", (normalized_name,))
-            row = cur.fetchone()
-            matched_food_id = row["id"] if row else None
-
-        cur.execute("""
-            UPDATE ingredients
-            SET amount = ?, unit = ?, normalized_name = ?, estimated_grams = ?,
-                food_score = ?, unit_score = ?, matched_food_id = ?
-            WHERE id = ?
-        """, (
-            amount, unit, normalized_name, est_grams,
-            food_score, unit_score, matched_food_id,
-            ing_id
-        ))
-        updated += 1
-
-        # Log this update
-        cur.execute("""
-            INSERT INTO ingredient_review_log (
-                ingredient_id, raw_text, normalized_name, amount, unit,
-                food_score, unit_score,
-                used_llm, used_llm_estimate, used_nutritionix
+    # First pass: logic-based parse and scoring, once per distinct raw text
+    unit_set = set(COMMON_UNITS)
+    food_index = FoodIndex(known_foods)
+    parsed_by_text = {}
+    with progress.stage("parse", total=len(rows)):
+        for _, raw_text in rows:
+            if raw_text in parsed_by_text:
+                continue
+            amount, unit, normalized_name, est_grams = parse_ingredient(raw_text)
+            food_score, unit_score, needs_llm = score_parse(
+                raw_text, amount, unit, normalized_name, food_index, unit_set, CONFIDENCE_THRESHOLD
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            ing_id, raw_text, normalized_name, amount, unit,
-            food_score, unit_score,
-            used_llm, used_llm_estimate, used_nutritionix
-        ))
-
-    conn.commit()
-
-    if updated:
-        cur.execute("""
-            SELECT food_name, normalized_name, amount, unit, food_score, unit_score
-            FROM ingredients
-            ORDER BY id DESC
-            LIMIT 3
-        """)
-        print("🧾 Example updates:")
-        for row in cur.fetchall():
-            print(" -", tuple(row))
+            parsed_by_text[raw_text] = (amount, unit, normalized_name, est_grams,
+                                        food_score, unit_score, needs_llm)
+    progress.message(f"🧮 {len(rows)} row(s) share {len(parsed_by_text)} distinct raw text(s)")
+
+    # Send all low-confidence texts to the LLM in one concurrent batch
+    llm_texts = [text for text, parsed in parsed_by_text.items() if parsed[6]]
+    llm_results = {}
+    if llm_texts:
+        with progress.stage("llm", total=len(llm_texts)):
+            progress.message(f"🤖 Using LLM for {len(llm_texts)} distinct ingredient text(s) "
+                             f"(batch size={llm_batch_size}, concurrency={llm_concurrency})")
+            llm_results = parse_many_with_llm(
+                llm_texts, mock=mock, concurrency=llm_concurrency,
+                on_call=lambda: progress.external_call("together"),
+                batch_size=llm_batch_size,
+            )
+
+    # Apply LLM results so each raw text has its final parse
+    for raw_text in llm_texts:
+        llm_result = llm_results.get(raw_text) or {}
+        if llm_result.get("food"):
+            parsed_by_text[raw_text] = (
+                llm_result.get("amount"),
+                llm_result.get("unit"),
+                llm_result.get("normalized_name"),
+                None,
+                llm_result.get("food_score", 60.0),
+                llm_result.get("unit_score", 60.0),
+                True,
+            )
+
+    writer = BatchWriter(conn, batch_rows=batch_rows, batch_seconds=batch_seconds)
+    updated = 0
+    try:
+        # Resolve each distinct unmatched normalized name once.  New food_info
+        # rows are queued on the writer and their ids looked up in one pass.
+        flags = {}
+        with progress.stage("resolve"):
+            lookups = []
+            for parsed in parsed_by_text.values():
+                normalized_name = parsed[2]
+                if not normalized_name or normalized_name in flags:
+                    continue
+                if normalized_name in food_name_to_id:
+                    flags[normalized_name] = (0, 0, 0)
+                    continue
+                flags[normalized_name] = None
+                lookups.append(normalized_name)
+
+            nutritionix_calls = 0
+            resolved_as = {}
+            if lookups:
+                progress.message(f"🥣 Fetching nutrition info for {len(lookups)} food(s)")
 
+                def count_call():
+                    nonlocal nutritionix_calls
+                    nutritionix_calls += 1
+                    progress.external_call("nutritionix")
+
+                fetched = get_nutrition_data_many(
+                    lookups, conn, use_mock=mock, skip_if_exists=True, writer=writer, on_call=count_call,
+                    resolved_as=resolved_as,
+                )
+                queued = {row["normalized_name"] for row in fetched.values() if row}
+                estimator = NutritionEstimator.from_db(conn)
+                for normalized_name in lookups:
+                    flags[normalized_name] = _queue_food_info(conn, writer, normalized_name,
+                                                              resolved_as.get(normalized_name), queued,
+                                                              mock=mock, estimator=estimator,
+                                                              progress=progress)
+            writer.checkpoint()
+            new_names = [name for name in flags if name not in food_name_to_id]
+            ids = _lookup_food_ids(conn, new_names + list(resolved_as.values()))
+            food_name_to_id.update((name, ids[name]) for name in new_names if name in ids)
+            # Names stored under the food Nutritionix returned match that row
+            for name, target in resolved_as.items():
+                if name not in food_name_to_id and target in ids:
+                    food_name_to_id[name] = ids[target]
+        llm_estimates = sum(f[1] for f in flags.values())
+        knn_estimates = sum(f[2] for f in flags.values())
+        progress.message(f"🔗 Resolved {len(flags)} distinct name(s) with {nutritionix_calls} Nutritionix "
+                         f"request(s), {llm_estimates} LLM estimate(s) and {knn_estimates} kNN estimate(s)")
+
+        with progress.stage("write", total=len(rows)):
+            for ing_id, raw_text in rows:
+                (amount, unit, normalized_name, est_grams,
+                 food_score, unit_score, used_llm) = parsed_by_text[raw_text]
+                used_llm = 1 if used_llm else 0
+                matched_food_id = food_name_to_id.get(normalized_name)
+                used_nutritionix, used_llm_estimate, used_knn_estimate = flags.get(normalized_name, (0, 0, 0))
+
+                writer.add(UPDATE_INGREDIENT_SQL, (
+                    amount, unit, normalized_name, est_grams,
+                    food_score, unit_score, matched_food_id,
+                    ing_id
+                ))
+                updated += 1
+
+                # Log this update
+                writer.add(INSERT_REVIEW_LOG_SQL, (
+                    ing_id, raw_text, normalized_name, amount, unit,
+                    food_score, unit_score,
+                    used_llm, used_llm_estimate, used_nutritionix, used_knn_estimate
+                ))
+
+                # Record the item outcome in the same checkpoint as its data
+                error = None
+                if used_llm and not (llm_results.get(raw_text) or {}).get("food"):
+                    error = "LLM fallback returned no result"
+                elif normalized_name and not matched_food_id:
+                    error = "No food_info match"
+                writer.add(MARK_ITEM_SQL, (FAILED if error else DONE, error, job_id, str(ing_id)))
+
+                if updated % 25 == 0 or updated == len(rows):
+                    progress.rows_done(updated, len(rows), stage="write")
+            writer.checkpoint()
+    except BaseException:
+        # Keep finished work so --resume can pick up from here.  A failed
+        # checkpoint has already dropped its batch, so this only writes
+        # statements queued since; it must not hide the original error.
+        try:
+            writer.checkpoint()
+        except Exception as e:
+            progress.message(f"⚠️ Could not save pending work: {e}")
+        save_call_metrics(conn, run_id_for(JOB_TYPE, job_id))
+        raise
+
+    progress.message(f"💾 Wrote {writer.rows_written} statement(s) in {writer.checkpoints} checkpoint(s)")
+    counts = finish_job(conn, job_id)
+    saved = save_call_metrics(conn, run_id_for(JOB_TYPE, job_id))
+    progress.message(f"📈 Recorded {saved} external call/cache event(s) in call_metrics")
     conn.close()
-    print(f"✅ Updated {updated} ingredient(s). (mode='{mode}')")
+
+    progress.message(f"✅ Updated {updated} ingredient(s). (mode='{mode}', items: {counts})")
+    latency = metrics.snapshot()
+    progress.run_finished(updated, len(rows), job_id=job_id, items=counts, latency=latency)
+    return {"job_id": job_id, "mode": mode, "updated": updated, "items": counts,
+            "stage_timings": dict(progress.stage_timings),
+            "external_calls": dict(progress.external_calls),
+            "latency": latency}
+
 
 if __name__ == "__main__":
-    # call update_ingredients(...)
-    print("🚩 Running update_ingredients from __main__")
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", default="auto", help="Mode for updating ingredients")
-    args = parser.parse_args()
-    update_ingredients(mode=args.mode)
+    from food_project.processing.update_worker import main
+    main()
@@ -1,12 +1,22 @@
 """Functions for cleaning and parsing raw ingredient text."""
 
 import re
-import inflect
+from functools import lru_cache
 from pathlib import Path
 from fractions import Fraction
 from food_project.processing.units import COMMON_UNITS, extract_unit_size
 
-p = inflect.engine()
+@lru_cache(maxsize=None)
+def _inflect_engine():
+    # inflect takes well over a second to import, so load it on first use
+    import inflect
+    return inflect.engine()
+
+
+@lru_cache(maxsize=4096)
+def singular_noun(word):
+    """``inflect``'s singular form of ``word``, or ``False`` if already singular."""
+    return _inflect_engine().singular_noun(word)
 
 FRACTIONS = {
     "½": "1/2", "¼": "1/4", "¾": "3/4", "⅓": "1/3", "⅔": "2/3", "⅛": "1/8"
@@ -38,7 +48,10 @@ def load_descriptor_phrases():
 
 DESCRIPTOR_PHRASES = load_descriptor_phrases()
 
+@lru_cache(maxsize=8192)
 def normalize_food_name(text):
+    # Pure function of the text; cached because inflect is slow and the
+    # same names are normalized again at every lookup
     if not text:
         return ""
 
@@ -66,7 +79,7 @@ def normalize_food_name(text):
 
     filtered = []
     for w in words:
-        if w in DESCRIPTORS or (p.singular_noun(w) in DESCRIPTORS):
+        if w in DESCRIPTORS or (singular_noun(w) in DESCRIPTORS):
             if len(words) > 1:
                 continue
         filtered.append(w)
@@ -74,7 +87,7 @@ def normalize_food_name(text):
 
     skip_singularization = {"boneless", "skinless", "seedless", "fatless", "skin-on", "bone-in"}
     singular_words = [
-        w if w in skip_singularization else p.singular_noun(w) or w
+        w if w in skip_singularization else singular_noun(w) or w
         for w in words
     ]
 
@@ -95,9 +108,9 @@ def is_countable_item(normalized_name: str) -> bool:
 def parse_ingredient(raw: str):
     original = raw.strip()
 
-    # Remove fractions and normalize
+    # Remove fractions and normalize ("1½" -> "1 1/2", not "11/2")
     for frac, ascii_frac in FRACTIONS.items():
-        raw = raw.replace(frac, ascii_frac)
+        raw = raw.replace(frac, " " + ascii_frac)
 
     # Pre-clean multi-quantity formats (e.g., "1/4 cup plus 2 Tbsp")
     raw = re.sub(r"\bor more\b", "", raw, flags=re.IGNORECASE)
@@ -147,7 +160,7 @@ def parse_ingredient(raw: str):
     amount = total_amount if matched_amounts else None
 
     # Remove descriptors from name
-    name_words = [w for w in final_words if w not in DESCRIPTORS and p.singular_noun(w) not in DESCRIPTORS]
+    name_words = [w for w in final_words if w not in DESCRIPTORS and singular_noun(w) not in DESCRIPTORS]
 
     normalized_name = normalize_food_name(" ".join(name_words))
     est_grams = extract_unit_size(amount, unit, normalized_name)
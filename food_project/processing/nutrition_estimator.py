@@ -0,0 +1,129 @@
+"""Estimate per-100g nutrition for an unknown food from its nearest catalog foods.
+
+Every ``food_info`` row with a serving weight is scaled to per-100g and
+kept in one NumPy matrix.  Names are embedded as hashed character
+trigrams, so one matrix-vector product scores a query against the whole
+catalog.  Foods that share the query's head noun ("onion" in "red
+onion") get a bonus; this is the closest thing to a category the schema
+has.  The estimate is the similarity-weighted mean of the top ``k``
+neighbours' nutrient vectors.
+"""
+
+import sqlite3
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+NUTRIENT_COLUMNS = (
+    "calories", "fat", "saturated_fat", "cholesterol", "sodium",
+    "carbs", "fiber", "sugars", "protein", "potassium",
+)
+
+# Rows produced by an estimate are never used as neighbours
+ESTIMATE_MATCH_TYPES = ("llm_estimate", "knn_estimate")
+
+HASH_DIM = 4096
+DEFAULT_K = 5
+# Added to the cosine similarity when the head nouns match
+CATEGORY_BONUS = 0.15
+# Below this best similarity the catalog has nothing close enough
+MIN_SIMILARITY = 0.35
+# Neighbours scoring under this fraction of the best one get no vote
+NEIGHBOR_RATIO = 0.8
+
+
+def _trigrams(name: str) -> List[str]:
+    padded = f"  {name.strip().lower()} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def embed_name(name: str) -> np.ndarray:
+    """Unit-length hashed trigram vector for ``name``."""
+    vec = np.zeros(HASH_DIM, dtype=np.float32)
+    for gram in _trigrams(name):
+        vec[zlib.crc32(gram.encode("utf-8")) % HASH_DIM] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def head_noun(name: str) -> str:
+    words = name.strip().lower().split()
+    return words[-1] if words else ""
+
+
+class NutritionEstimator:
+    """Nearest-neighbour nutrition estimates over a preloaded catalog."""
+
+    def __init__(self, names: List[str], per_100g: np.ndarray, k: int = DEFAULT_K,
+                 min_similarity: float = MIN_SIMILARITY):
+        self.names = list(names)
+        self.per_100g = per_100g
+        self.k = k
+        self.min_similarity = min_similarity
+        self.embeddings = (np.vstack([embed_name(n) for n in self.names])
+                           if self.names else np.zeros((0, HASH_DIM), dtype=np.float32))
+        self.heads = np.array([head_noun(n) for n in self.names], dtype=object)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection, **kwargs) -> "NutritionEstimator":
+        """Load every measured ``food_info`` row, scaled to per-100g."""
+        columns = ", ".join(NUTRIENT_COLUMNS)
+        placeholders = ", ".join("?" for _ in ESTIMATE_MATCH_TYPES)
+        rows = conn.execute(
+            f"SELECT normalized_name, serving_weight_grams, {columns} FROM food_info "
+            f"WHERE serving_weight_grams > 0 "
+            f"AND (match_type IS NULL OR match_type NOT IN ({placeholders}))",
+            ESTIMATE_MATCH_TYPES,
+        ).fetchall()
+        names = [row[0] for row in rows]
+        values = np.array([[np.nan if v is None else v for v in row[2:]] for row in rows],
+                          dtype=np.float64).reshape(len(rows), len(NUTRIENT_COLUMNS))
+        grams = np.array([row[1] for row in rows], dtype=np.float64).reshape(-1, 1)
+        per_100g = values * (100.0 / grams) if len(rows) else values
+        return cls(names, per_100g, **kwargs)
+
+    def _ranked(self, name: str):
+        """Indices of the top ``k`` catalog foods (best first) and all scores."""
+        scores = self.embeddings @ embed_name(name)
+        scores = scores + CATEGORY_BONUS * (self.heads == head_noun(name))
+        k = min(self.k, len(self.names))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])], scores
+
+    def neighbors(self, name: str):
+        """Return ``[(catalog_name, score)]`` for the top ``k`` matches, best first."""
+        if not self.names or not name:
+            return []
+        top, scores = self._ranked(name)
+        return [(self.names[i], float(scores[i])) for i in top]
+
+    def estimate(self, name: str) -> Optional[dict]:
+        """Per-100g nutrients for ``name``, or ``None`` when nothing is similar enough.
+
+        The result also carries ``neighbors`` (the catalog names used) and
+        ``similarity`` (the best neighbour's score).
+        """
+        if not self.names or not name:
+            return None
+        top, scores = self._ranked(name)
+        if scores[top[0]] < self.min_similarity:
+            return None
+
+        top = top[scores[top] >= scores[top[0]] * NEIGHBOR_RATIO]
+        weights = scores[top].astype(np.float64)
+        values = self.per_100g[top]
+        known = ~np.isnan(values)
+        weighted = np.where(known, values, 0.0) * weights[:, None]
+        totals = (known * weights[:, None]).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = weighted.sum(axis=0) / totals
+
+        result = {col: (None if np.isnan(v) else round(float(v), 2))
+                  for col, v in zip(NUTRIENT_COLUMNS, means)}
+        result["neighbors"] = [self.names[i] for i in top]
+        result["similarity"] = round(float(scores[top[0]]), 3)
+        return result
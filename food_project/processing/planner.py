@@ -0,0 +1,210 @@
+"""Dry-run planner that predicts external call volume before a pipeline run.
+
+The planner only parses, scores and checks local caches.  It opens the
+database read-only and never calls Together or Nutritionix.
+"""
+
+import math
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict
+
+from food_project.processing.normalization import parse_ingredient, normalize_food_name
+from food_project.processing.validator import FoodIndex, score_parse
+from food_project.processing.units import COMMON_UNITS
+from food_project.processing.ingredient_updater import CONFIDENCE_THRESHOLD, MODE_QUERIES
+from food_project.database.call_metrics import recent_latency
+from food_project.database.lookup_failures import blocked_names
+from food_project.database.nutritionix_service import (
+    BATCH_SIZE as NUTRITIONIX_BATCH_SIZE, NUTRITIONIX_REQUESTS_PER_MINUTE,
+)
+from food_project.llm.full_parser import BATCH_SIZE, MODEL, build_batch_messages, build_messages, template_key
+from food_project.llm.llm_cache import LLMCache
+from food_project.llm.rate_limiter import get_together_limiter
+from food_project.llm.async_parser import DEFAULT_CONCURRENCY
+from food_project.ingestion.populate_food_info import DEFAULT_WORKERS, MAX_API_CALLS, read_food_list
+
+# Typical per-call latency (seconds) used for wall-time estimates when
+# ``call_metrics`` has no recorded calls for a provider yet
+DEFAULT_LATENCY_SECONDS = {"together": 2.0, "nutritionix": 0.5}
+
+# Pricing used for cost estimates.  The default model is on Together's
+# free tier; paid Llama 3.3 70B Turbo is about $0.88 per million tokens.
+TOGETHER_PRICE_PER_MILLION_TOKENS = 0.0 if MODEL.endswith("-Free") else 0.88
+NUTRITIONIX_COST_PER_CALL = 0.0
+# Rough completion size of one ingredient parse
+LLM_OUTPUT_TOKENS = 60
+
+
+def _open_read_only(db_path) -> sqlite3.Connection:
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _select_rows(conn, mode: str):
+    """Run ``MODE_QUERIES[mode]``, reading columns the updater has not added yet as NULL.
+
+    Returns ``(rows, missing_columns)``.  ``update_ingredients`` adds
+    ``normalized_name`` and ``matched_food_id`` with ``ALTER TABLE``; on a
+    database it has never run against they would start out NULL, so that
+    is how the plan treats them.
+    """
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(ingredients)")}
+    missing = [c for c in ("normalized_name", "matched_food_id") if c not in columns]
+    if not missing:
+        return conn.execute(MODE_QUERIES[mode]).fetchall(), missing
+    # A CTE named like the table shadows it for the mode query
+    select = ", ".join(["*"] + [f"NULL AS {c}" for c in missing])
+    query = f"WITH ingredients AS (SELECT {select} FROM main.ingredients) {MODE_QUERIES[mode]}"
+    return conn.execute(query).fetchall(), missing
+
+
+def _latencies(conn) -> Dict[str, float]:
+    """Median recorded latency per provider, falling back to the defaults."""
+    return {provider: recent_latency(conn, provider) or default
+            for provider, default in DEFAULT_LATENCY_SECONDS.items()}
+
+
+def _estimate_tokens(raw_texts: list) -> int:
+    """Approximate prompt + completion tokens (~4 characters per token)."""
+    messages = build_messages(raw_texts[0]) if len(raw_texts) == 1 else build_batch_messages(raw_texts)
+    prompt_chars = sum(len(m["content"]) for m in messages)
+    return prompt_chars // 4 + LLM_OUTPUT_TOKENS * len(raw_texts)
+
+
+def plan_update(db_path="food_info.db", mode="auto",
+                llm_concurrency=DEFAULT_CONCURRENCY, llm_batch_size=BATCH_SIZE) -> Dict[str, Any]:
+    """Predict what ``update_ingredients(mode=...)`` would send to external APIs."""
+    if mode not in MODE_QUERIES:
+        raise ValueError(f"Unknown mode '{mode}'. Use 'auto', 'match', 'full', or 'all'.")
+
+    conn = _open_read_only(db_path)
+    rows, missing_columns = _select_rows(conn, mode)
+    known_foods = {r[0] for r in conn.execute("SELECT normalized_name FROM food_info")}
+    latency = _latencies(conn)
+    blocked = blocked_names(conn)
+    conn.close()
+
+    unit_set = set(COMMON_UNITS)
+    food_index = FoodIndex(known_foods)
+
+    parsed_by_text = {}
+    for _, raw_text in rows:
+        if raw_text in parsed_by_text:
+            continue
+        amount, unit, normalized_name, _ = parse_ingredient(raw_text)
+        _, _, needs_llm = score_parse(
+            raw_text, amount, unit, normalized_name, food_index, unit_set, CONFIDENCE_THRESHOLD
+        )
+        parsed_by_text[raw_text] = (normalized_name, needs_llm)
+
+    llm_rows = sum(1 for _, raw_text in rows if parsed_by_text[raw_text][1])
+    llm_texts = [t for t, (_, needs_llm) in parsed_by_text.items() if needs_llm]
+    keys = {t: template_key(t) for t in llm_texts}
+    llm_cache = LLMCache(read_only=True)
+    cached = llm_cache.get_many(set(keys.values()) | set(llm_texts), touch=False)
+    llm_cache.close()
+    cache = {t: cached.get(keys[t]) or cached.get(t) for t in llm_texts}
+    llm_cached = [t for t in llm_texts if cache[t]]
+    # One request per uncached ingredient shape, not per line
+    llm_calls = list({keys[t]: t for t in llm_texts if not cache[t]}.values())
+
+    # Final names: cached LLM answers where known, logic parse otherwise
+    final_names = {}
+    for raw_text, (normalized_name, needs_llm) in parsed_by_text.items():
+        if needs_llm and (cache.get(raw_text) or {}).get("normalized_name"):
+            normalized_name = cache[raw_text]["normalized_name"]
+        final_names[raw_text] = normalized_name
+    nutritionix_rows = sum(
+        1 for _, raw_text in rows
+        if final_names[raw_text] and final_names[raw_text] not in known_foods
+    )
+    nutritionix_names = {n for n in final_names.values() if n and n not in known_foods}
+    # Names that failed recently are skipped without a call
+    nutritionix_blocked = nutritionix_names & blocked
+    nutritionix_names -= blocked
+
+    batch = max(1, llm_batch_size) if len(llm_calls) > 1 else 1
+    llm_batches = [llm_calls[i:i + batch] for i in range(0, len(llm_calls), batch)]
+    tokens = sum(_estimate_tokens(chunk) for chunk in llm_batches)
+    budget = get_together_limiter().remaining()
+    llm_wall = math.ceil(len(llm_batches) / max(1, llm_concurrency)) * latency["together"]
+    nutritionix_requests = math.ceil(len(nutritionix_names) / NUTRITIONIX_BATCH_SIZE)
+    nutritionix_wall = nutritionix_requests * latency["nutritionix"]
+
+    return {
+        "mode": mode,
+        "needs_migration": bool(missing_columns),
+        "rows": len(rows),
+        "distinct_texts": len(parsed_by_text),
+        "llm_rows": llm_rows,
+        "llm_distinct": len(llm_texts),
+        "llm_cache_hits": len(llm_cached),
+        "llm_shapes_to_send": len(llm_calls),
+        "together_calls": len(llm_batches),
+        "together_tokens": tokens,
+        "together_budget_left": budget.get("per_day"),
+        "exceeds_daily_limit": len(llm_batches) > budget.get("per_day", len(llm_batches)),
+        "nutritionix_rows": nutritionix_rows,
+        "nutritionix_foods": len(nutritionix_names),
+        "nutritionix_blocked": len(nutritionix_blocked),
+        "nutritionix_calls": nutritionix_requests,
+        "estimated_cost_usd": round(
+            tokens / 1_000_000 * TOGETHER_PRICE_PER_MILLION_TOKENS
+            + nutritionix_requests * NUTRITIONIX_COST_PER_CALL, 4
+        ),
+        "estimated_seconds": round(llm_wall + nutritionix_wall, 1),
+    }
+
+
+def plan_populate(foods_path, db_path="food_info.db", max_calls=MAX_API_CALLS,
+                  batch_size=NUTRITIONIX_BATCH_SIZE, workers=DEFAULT_WORKERS) -> Dict[str, Any]:
+    """Predict the Nutritionix calls ``populate_food_info`` would make.
+
+    Each distinct name is looked up once, and ``workers`` requests run at
+    a time, limited by ``NUTRITIONIX_REQUESTS_PER_MINUTE``.
+    """
+    foods = read_food_list(foods_path)
+    conn = _open_read_only(db_path)
+    known_foods = {r[0] for r in conn.execute("SELECT normalized_name FROM food_info")}
+    latency = _latencies(conn)
+    blocked = blocked_names(conn)
+    conn.close()
+
+    missing = [f for f in foods if normalize_food_name(f) not in known_foods]
+    distinct_missing = {normalize_food_name(f) for f in missing}
+    fetchable = [f for f in missing if normalize_food_name(f) not in blocked]
+    distinct_fetchable = {normalize_food_name(f) for f in fetchable}
+    foods_to_fetch = min(len(distinct_fetchable), max_calls)
+    calls = math.ceil(foods_to_fetch / max(1, batch_size))
+    seconds = math.ceil(calls / max(1, workers)) * latency["nutritionix"]
+    if NUTRITIONIX_REQUESTS_PER_MINUTE > 0:
+        seconds = max(seconds, 60.0 * (calls - 1) / NUTRITIONIX_REQUESTS_PER_MINUTE)
+    return {
+        "foods": len(foods),
+        "already_in_db": len(foods) - len(missing),
+        "nutritionix_rows": len(missing),
+        "nutritionix_distinct": len(distinct_missing),
+        "nutritionix_foods": foods_to_fetch,
+        "nutritionix_blocked": len(missing) - len(fetchable),
+        "nutritionix_calls": calls,
+        "exceeds_max_api_calls": len(distinct_fetchable) > max_calls,
+        "estimated_cost_usd": round(calls * NUTRITIONIX_COST_PER_CALL, 4),
+        "estimated_seconds": round(seconds, 1),
+    }
+
+
+def print_plan(plan: Dict[str, Any]) -> None:
+    """Pretty-print a plan returned by ``plan_update`` or ``plan_populate``."""
+    print("🧭 Dry-run plan (no external calls, nothing written):")
+    for key, value in plan.items():
+        print(f"   {key:<24} {value}")
+    if plan.get("needs_migration"):
+        print("⚠️ ingredients has no normalized_name/matched_food_id yet; the update adds them "
+              "and every row counts as pending.")
+    if plan.get("exceeds_daily_limit"):
+        print("🚫 Together calls would exceed today's remaining request budget.")
+    if plan.get("exceeds_max_api_calls"):
+        print("🚫 Nutritionix calls would be cut off by the --max limit.")
@@ -0,0 +1,130 @@
+"""Progress events for long pipeline runs.
+
+Pipeline code reports what it is doing through a :class:`ProgressReporter`
+instead of printing to a particular UI.  Subscribers are plain callables
+that receive :class:`ProgressEvent` objects, so the same run can drive a
+console, a JSON log or the Streamlit app.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Event kinds
+RUN_STARTED = "run_started"
+RUN_FINISHED = "run_finished"
+STAGE_STARTED = "stage_started"
+STAGE_FINISHED = "stage_finished"
+ROWS_DONE = "rows_done"
+EXTERNAL_CALL = "external_call"
+MESSAGE = "message"
+
+
+@dataclass
+class ProgressEvent:
+    kind: str
+    stage: str = ""
+    message: str = ""
+    done: int = 0
+    total: int = 0
+    elapsed: float = 0.0
+    data: Dict = field(default_factory=dict)
+
+
+Subscriber = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """Send progress events to every subscriber and keep run totals.
+
+    ``stage_timings`` maps stage name to seconds and ``external_calls``
+    maps provider name to the number of calls reported during the run.
+    """
+
+    def __init__(self, *subscribers: Subscriber):
+        self._subscribers: List[Subscriber] = list(subscribers)
+        self._started = time.monotonic()
+        self.stage_timings: Dict[str, float] = {}
+        self.external_calls: Dict[str, int] = {}
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    def emit(self, kind: str, **fields) -> None:
+        fields.setdefault("elapsed", time.monotonic() - self._started)
+        event = ProgressEvent(kind=kind, **fields)
+        for subscriber in self._subscribers:
+            subscriber(event)
+
+    def message(self, text: str) -> None:
+        self.emit(MESSAGE, message=text)
+
+    def run_started(self, total: int, **data) -> None:
+        self._started = time.monotonic()
+        self.emit(RUN_STARTED, total=total, data=data, elapsed=0.0)
+
+    def run_finished(self, done: int, total: int, **data) -> None:
+        data.setdefault("stage_timings", dict(self.stage_timings))
+        data.setdefault("external_calls", dict(self.external_calls))
+        self.emit(RUN_FINISHED, done=done, total=total, data=data)
+
+    @contextmanager
+    def stage(self, name: str, total: int = 0):
+        """Time a block of work and report its start and end."""
+        start = time.monotonic()
+        self.emit(STAGE_STARTED, stage=name, total=total)
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            self.stage_timings[name] = self.stage_timings.get(name, 0.0) + duration
+            self.emit(STAGE_FINISHED, stage=name, total=total, data={"seconds": duration})
+
+    def rows_done(self, done: int, total: int, stage: str = "") -> None:
+        self.emit(ROWS_DONE, stage=stage, done=done, total=total)
+
+    def external_call(self, provider: str, count: int = 1) -> None:
+        self.external_calls[provider] = self.external_calls.get(provider, 0) + count
+        self.emit(EXTERNAL_CALL, data={"provider": provider, "count": count})
+
+
+def console_subscriber(event: ProgressEvent) -> None:
+    """Render events as plain console lines (the default for CLIs)."""
+    if event.kind == MESSAGE:
+        print(event.message)
+    elif event.kind == STAGE_STARTED:
+        print(f"▶️ {event.stage}" + (f" ({event.total})" if event.total else ""))
+    elif event.kind == STAGE_FINISHED:
+        print(f"⏱ {event.stage} took {event.data['seconds']:.2f}s")
+    elif event.kind == ROWS_DONE:
+        width = 30
+        filled = int(width * event.done / event.total) if event.total else width
+        bar = "█" * filled + "·" * (width - filled)
+        end = "\n" if event.done >= event.total else ""
+        sys.stdout.write(f"\r   [{bar}] {event.done}/{event.total}{end}")
+        sys.stdout.flush()
+    elif event.kind == RUN_FINISHED:
+        print(f"🏁 Finished {event.done}/{event.total} in {event.elapsed:.2f}s")
+        for name, seconds in event.data.get("stage_timings", {}).items():
+            print(f"   {name:<10} {seconds:.2f}s")
+        for provider, count in event.data.get("external_calls", {}).items():
+            print(f"   {provider} calls: {count}")
+        for provider, stats in event.data.get("latency", {}).items():
+            if stats["calls"]:
+                print(f"   {provider} latency p50={stats['p50']}s p95={stats['p95']}s "
+                      f"errors={stats['errors']} retries={stats['retries']}")
+            if stats.get("cache_hits"):
+                print(f"   {provider} cache hits: {stats['cache_hits']}")
+
+
+def json_subscriber(event: ProgressEvent) -> None:
+    """Write one JSON object per event, for cron jobs and container logs."""
+    print(json.dumps(asdict(event), default=str), flush=True)
+
+
+def default_reporter(progress: Optional[ProgressReporter] = None) -> ProgressReporter:
+    """Return ``progress`` or a reporter that prints to the console."""
+    return progress if progress is not None else ProgressReporter(console_subscriber)
@@ -0,0 +1,61 @@
+"""Headless command line worker for ``update_ingredients``.
+
+Runs without Streamlit so it can be used from cron jobs or containers.
+Progress is printed to the console, or as JSON lines with ``--json``.
+"""
+
+import argparse
+
+from food_project.database.batch_writer import DEFAULT_BATCH_ROWS, DEFAULT_BATCH_SECONDS
+from food_project.llm.async_parser import DEFAULT_CONCURRENCY
+from food_project.llm.full_parser import BATCH_SIZE
+from food_project.processing.ingredient_updater import MODE_QUERIES, update_ingredients
+from food_project.processing.progress import ProgressReporter, console_subscriber, json_subscriber
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Parse, match and enrich ingredients without the UI")
+    parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
+    parser.add_argument("--mode", default="auto", choices=sorted(MODE_QUERIES), help="Which rows to update")
+    parser.add_argument("--mock", action="store_true", help="Use mock LLM and Nutritionix responses")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Max LLM requests in flight at once")
+    parser.add_argument("--llm-batch-size", type=int, default=BATCH_SIZE,
+                        help="Ingredient lines packed into each LLM request (1 disables batching)")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS,
+                        help="Commit after this many buffered writes")
+    parser.add_argument("--batch-seconds", type=float, default=DEFAULT_BATCH_SECONDS,
+                        help="Commit at least this often (seconds)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last unfinished run, retrying only failed items")
+    parser.add_argument("--plan", action="store_true",
+                        help="Report expected external calls, cost and time without calling or writing anything")
+    parser.add_argument("--json", action="store_true", help="Emit progress events as JSON lines")
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+
+    if args.plan:
+        from food_project.processing.planner import plan_update, print_plan
+        print_plan(plan_update(db_path=args.db, mode=args.mode, llm_concurrency=args.concurrency,
+                               llm_batch_size=args.llm_batch_size))
+        return
+
+    progress = ProgressReporter(json_subscriber if args.json else console_subscriber)
+    update_ingredients(
+        db_path=args.db,
+        mode=args.mode,
+        mock=args.mock,
+        llm_concurrency=args.concurrency,
+        llm_batch_size=args.llm_batch_size,
+        batch_rows=args.batch_rows,
+        batch_seconds=args.batch_seconds,
+        resume=args.resume,
+        progress=progress,
+    )
+
+
+if __name__ == "__main__":
+    main()
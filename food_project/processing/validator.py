@@ -1,7 +1,175 @@
-"""Logic-based checks for ingredient parsing and matching."""
+"""Logic-based checks for ingredient parsing and matching.
 
-def score_food_match(normalized_name: str, known_foods: list[str]) -> float:
-    return 100.0 if normalized_name in known_foods else 60.0
+Scores are confidences on a 0-100 scale.  ``update_ingredients`` sends a
+line to the LLM only when either score falls below its threshold, so the
+scorers try to flag lines that are genuinely ambiguous rather than every
+food that is new to the catalog or every line without a unit.
+"""
 
-def score_unit(unit: str, known_units: set[str]) -> float:
-    return 100.0 if unit in known_units else 50.0
+import re
+from collections import defaultdict
+from typing import Iterable, List, Optional, Tuple, Union
+
+from rapidfuzz import fuzz, process
+
+from food_project.processing.normalization import is_countable_item
+from food_project.processing.units import COMMON_UNITS
+
+# Phrases that mark a line as deliberately unitless ("salt to taste")
+UNITLESS_PHRASES = (
+    "to taste", "as needed", "as desired", "for garnish", "for serving",
+    "for dusting", "for frying", "optional",
+)
+
+# Words that join two foods or an amount range; left in a name they mean
+# the rules split the line in the wrong place ("sage or teaspoon")
+CONNECTOR_WORDS = {"or", "to", "and", "plus", "&"}
+# Units that also name part of a food ("garlic clove", "celery stalk")
+FOOD_PART_UNITS = {
+    "clove", "cloves", "ear", "ears", "stalk", "stalks", "sprig", "sprigs", "slice", "slices",
+    "strip", "chunk", "chunks", "cube", "cubes", "piece", "pieces", "sheet", "sheets", "eggs",
+}
+UNIT_WORDS = {u.rstrip(".") for u in COMMON_UNITS if " " not in u} - FOOD_PART_UNITS
+# Most a clean (or least a messy) parse moves the fuzzy similarity
+MAX_PARSE_BONUS = 15.0
+
+
+class FoodIndex:
+    """Known food names indexed for fast exact and fuzzy lookups.
+
+    Exact hits are a set lookup.  Fuzzy lookups only score names that
+    share at least one token with the query, falling back to the whole
+    catalog when nothing shares a token.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = sorted({n for n in names if n})
+        self._exact = set(self.names)
+        self._by_token = defaultdict(set)
+        for name in self.names:
+            for token in name.split():
+                self._by_token[token].add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._exact
+
+    def best_match(self, name: str) -> Tuple[Optional[str], float]:
+        """Return ``(closest_name, similarity)`` with similarity on 0-100."""
+        if not name or not self.names:
+            return None, 0.0
+        if name in self._exact:
+            return name, 100.0
+
+        candidates = set()
+        for token in name.split():
+            candidates |= self._by_token.get(token, set())
+        match = process.extractOne(name, candidates or self.names, scorer=fuzz.token_sort_ratio)
+        if match is None:
+            return None, 0.0
+        return match[0], float(match[1])
+
+    def top_matches(self, name: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` ``(name, similarity)`` pairs, best first."""
+        if not name or not self.names:
+            return []
+        candidates = set()
+        for token in name.split():
+            candidates |= self._by_token.get(token, set())
+        # Token-sharing names first, then fill up from the whole catalog
+        matches = []
+        if candidates:
+            matches = process.extract(name, candidates, scorer=fuzz.token_sort_ratio, limit=limit)
+        if len(matches) < limit:
+            seen = {m[0] for m in matches}
+            rest = [n for n in self.names if n not in seen]
+            matches += process.extract(name, rest, scorer=fuzz.token_sort_ratio, limit=limit - len(matches))
+        return [(m[0], float(m[1])) for m in matches]
+
+
+def _as_index(known_foods) -> FoodIndex:
+    return known_foods if isinstance(known_foods, FoodIndex) else FoodIndex(known_foods)
+
+
+def parse_quality(normalized_name: str) -> float:
+    """Confidence that a name parsed by rules is a clean food name.
+
+    Short alphabetic names ("chicken thigh") look clean.  Leftover
+    digits, punctuation, unit words ("salt teaspoon"), connectors
+    ("kalamata olive to"), stray hyphens ("zucchini -inch stick") or long
+    phrases suggest the rules missed something.
+    """
+    if not normalized_name:
+        return 0.0
+    words = normalized_name.split()
+    if re.search(r"[^a-z\s\-']", normalized_name):
+        return 40.0
+    if any(w.startswith("-") or w.endswith("-") for w in words):
+        return 10.0
+    if any(w in CONNECTOR_WORDS or w.rstrip(".") in UNIT_WORDS for w in words):
+        return 10.0
+    if len(words) <= 3:
+        return 85.0
+    if len(words) == 4:
+        return 70.0
+    return 50.0
+
+
+def score_food_match(normalized_name: str, known_foods: Union[FoodIndex, Iterable[str]]) -> float:
+    """Graded confidence that ``normalized_name`` is a correct food name.
+
+    Exact catalog hits score 100.  Otherwise the score is the fuzzy
+    similarity to the closest catalog entry less 10 points, moved by up
+    to ``MAX_PARSE_BONUS`` either way by :func:`parse_quality`: a clean
+    name close to a catalog entry clears 80, a messy one or a name far
+    from everything known does not.  Pass a :class:`FoodIndex` when
+    scoring many names against the same catalog.
+    """
+    if not normalized_name:
+        return 0.0
+    index = _as_index(known_foods)
+    if normalized_name in index:
+        return 100.0
+    _, similarity = index.best_match(normalized_name)
+    bonus = MAX_PARSE_BONUS * (parse_quality(normalized_name) - 50.0) / 50.0
+    return min(99.0, max(0.0, similarity - 10.0 + bonus))
+
+
+def score_unit(unit: Optional[str], known_units: set[str], normalized_name: str = "",
+               amount: Optional[float] = None, raw_text: str = "") -> float:
+    """Graded confidence that ``unit`` is right for the line.
+
+    A missing unit is fine for countable foods ("2 eggs"), whole-number
+    counts ("3 chicken thighs") and lines that are unitless on purpose
+    ("salt to taste").  Unknown units and fractional amounts with no
+    unit stay low so they still go to the LLM.
+    """
+    if unit:
+        return 100.0 if unit in known_units else 40.0
+
+    text = (raw_text or "").lower()
+    if any(phrase in text for phrase in UNITLESS_PHRASES):
+        return 95.0
+    # "red onion" counts like "onion"
+    if normalized_name and is_countable_item(normalized_name.split()[-1]):
+        return 95.0
+    if amount is None:
+        return 85.0 if normalized_name else 50.0
+    if float(amount).is_integer():
+        return 85.0
+    return 50.0
+
+
+def score_parse(raw_text: str, amount, unit, normalized_name: str,
+                known_foods: Union[FoodIndex, Iterable[str]], known_units: set[str],
+                threshold: float) -> Tuple[float, float, bool]:
+    """Score one rule-based parse and decide whether it needs the LLM.
+
+    Returns ``(food_score, unit_score, needs_llm)``.
+    """
+    food_score = score_food_match(normalized_name, known_foods)
+    unit_score = score_unit(unit, known_units, normalized_name, amount, raw_text)
+    needs_llm = (food_score < threshold or unit_score < threshold) and bool(raw_text)
+    return food_score, unit_score, needs_llm
@@ -0,0 +1,36 @@
+import streamlit as st
+
+from food_project.processing.progress import (
+    EXTERNAL_CALL,
+    MESSAGE,
+    ROWS_DONE,
+    RUN_FINISHED,
+    STAGE_STARTED,
+    ProgressReporter,
+)
+
+
+def streamlit_reporter() -> ProgressReporter:
+    """Build a ProgressReporter that renders pipeline events in the app."""
+    status = st.empty()
+    bar = st.progress(0)
+    calls = st.empty()
+
+    def subscriber(event):
+        if event.kind == MESSAGE:
+            st.write(event.message)
+        elif event.kind == STAGE_STARTED:
+            status.write(f"▶️ {event.stage}" + (f" ({event.total})" if event.total else ""))
+        elif event.kind == ROWS_DONE and event.total:
+            bar.progress(min(1.0, event.done / event.total))
+        elif event.kind == EXTERNAL_CALL:
+            calls.caption(", ".join(f"{p}: {n}" for p, n in reporter.external_calls.items()))
+        elif event.kind == RUN_FINISHED:
+            bar.progress(1.0)
+            status.write(f"🏁 Finished {event.done}/{event.total} in {event.elapsed:.2f}s")
+            timings = event.data.get("stage_timings", {})
+            if timings:
+                st.caption(" · ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+    reporter = ProgressReporter(subscriber)
+    return reporter
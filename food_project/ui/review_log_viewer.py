@@ -2,6 +2,8 @@ import streamlit as st
 import sqlite3
 import pandas as pd
 
+from food_project.database.call_metrics import summarize
+
 def show_review_log(db_path="food_info.db"):
     st.header("🧪 Ingredient Review Log")
 
@@ -53,3 +55,28 @@ def show_review_log(db_path="food_info.db"):
     st.dataframe(df, use_container_width=True)
 
     conn.close()
+
+
+def show_call_metrics(db_path="food_info.db"):
+    st.subheader("⏱ External Call Metrics")
+
+    conn = sqlite3.connect(db_path)
+    summary = summarize(conn)
+    conn.close()
+
+    if not summary:
+        st.info("No external calls recorded yet.")
+        return
+
+    df = pd.DataFrame(summary).drop(columns=["last_at"])
+    runs = list(dict.fromkeys(df["run_id"].fillna("(no run)")))
+    run = st.selectbox("Run", runs)
+    df = df[df["run_id"].fillna("(no run)") == run]
+
+    # Which provider dominated this run's wall time
+    st.bar_chart(df.set_index("provider")["total_seconds"])
+    st.dataframe(
+        df[["provider", "calls", "cache_hits", "hit_rate", "errors", "p50_ms", "p95_ms",
+            "total_seconds", "prompt_tokens", "completion_tokens"]],
+        use_container_width=True,
+    )
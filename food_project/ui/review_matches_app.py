@@ -52,38 +52,43 @@ def load_food_options():
     conn.close()
     return {row[1]: row[0] for row in options}
 
-# Streamlit App UI
-st.title("🔍 Review Ingredient Matches")
+def show_review_matches():
+    """Render the review page's matches; the caller supplies the heading."""
+    matches = get_fuzzy_matches()
+    food_options = load_food_options()
 
-matches = get_fuzzy_matches()
-food_options = load_food_options()
+    if not matches:
+        # Nothing to review — show a friendly message
+        st.success("✅ No fuzzy matches to review.")
+    else:
+        for row in matches:
+            # Show details for each fuzzy match
+            with st.expander(f"🔎 {row['raw_name']} → {row['matched_food']} (score: {row['fuzz_score']})"):
+                st.markdown(f"- **Normalized:** `{row['normalized_name']}`")
+                st.markdown(f"- **Matched to:** `{row['matched_food']}`")
+                st.markdown(f"- **Fuzz Score:** `{row['fuzz_score']}`")
 
-if not matches:
-    # Nothing to review — show a friendly message
-    st.success("✅ No fuzzy matches to review.")
-else:
-    for row in matches:
-        # Show details for each fuzzy match
-        with st.expander(f"🔎 {row['raw_name']} → {row['matched_food']} (score: {row['fuzz_score']})"):
-            st.markdown(f"- **Normalized:** `{row['normalized_name']}`")
-            st.markdown(f"- **Matched to:** `{row['matched_food']}`")
-            st.markdown(f"- **Fuzz Score:** `{row['fuzz_score']}`")
+                # Three columns: approve, reject, or override
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.button("✅ Approve", key=f"approve_{row['id']}"):
+                        update_match(row["id"], row["food_id"], "manual")
+                        st.success("Approved.")
 
-            # Three columns: approve, reject, or override
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("✅ Approve", key=f"approve_{row['id']}"):
-                    update_match(row["id"], row["food_id"], "manual")
-                    st.success("Approved.")
+                with col2:
+                    if st.button("❌ Reject", key=f"reject_{row['id']}"):
+                        reject_match(row["id"])
+                        st.warning("Rejected.")
 
-            with col2:
-                if st.button("❌ Reject", key=f"reject_{row['id']}"):
-                    reject_match(row["id"])
-                    st.warning("Rejected.")
+                with col3:
+                    override = st.selectbox("🔄 Override Match", ["-- Select --"] + list(food_options.keys()), key=f"override_{row['id']}")
+                    if override != "-- Select --":
+                        new_id = food_options[override]
+                        update_match(row["id"], new_id, "manual")
+                        st.info(f"Overridden to: {override}")
 
-            with col3:
-                override = st.selectbox("🔄 Override Match", ["-- Select --"] + list(food_options.keys()), key=f"override_{row['id']}")
-                if override != "-- Select --":
-                    new_id = food_options[override]
-                    update_match(row["id"], new_id, "manual")
-                    st.info(f"Overridden to: {override}")
+
+# ``streamlit run`` executes this file as __main__; app.py calls show_review_matches in its review tab
+if __name__ == "__main__":
+    st.title("🔍 Review Ingredient Matches")
+    show_review_matches()
@@ -0,0 +1,130 @@
+"""Time ``import_fdc`` on a generated FoodData Central export.
+
+Writes ``nutrient.csv``, ``food.csv`` and ``food_nutrient.csv`` shaped
+like a real FDC CSV export (optionally zipped) into a temp directory,
+imports them into a copy of the database and reports rows/sec per
+stage.  Some names repeat across data types to exercise the
+de-duplication, and some rows use data types the import skips.
+
+    python scripts/benchmark_fdc_import.py --foods 300000 --nutrients-per-food 20
+    python scripts/benchmark_fdc_import.py --foods 50000 --zip
+"""
+
+import argparse
+import csv
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.ingestion.import_fdc import NUTRIENT_COLUMNS, import_fdc
+from food_project.processing.progress import ProgressReporter, console_subscriber
+
+WORDS = ["apple", "bean", "cheese", "dill", "egg", "fig", "grape", "ham", "kale", "leek", "mango",
+         "noodle", "oat", "pea", "quince", "rice", "squash", "tofu", "yam", "walnut"]
+STYLES = ["raw", "boiled", "baked", "canned", "dried", "frozen", "roasted", "smoked"]
+DATA_TYPES = ["foundation_food", "sr_legacy_food", "survey_fndds_food", "sub_sample_food"]
+
+
+def _letters(i: int) -> str:
+    # Digits are stripped by normalization, so made-up names count in letters
+    out = ""
+    while True:
+        i, r = divmod(i, 26)
+        out = chr(ord("a") + r) + out
+        if i == 0:
+            return out
+
+
+def write_export(target: Path, foods: int, per_food: int, seed: int) -> int:
+    """Write the three CSVs into ``target``; returns the food_nutrient row count."""
+    rng = random.Random(seed)
+    mapped = sorted({i for ids in NUTRIENT_COLUMNS.values() for i in ids})
+    extra = list(range(1100, 1100 + max(0, per_food - len(mapped)) * 2))
+    with open(target / "nutrient.csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, quoting=csv.QUOTE_ALL)
+        w.writerow(["id", "name", "unit_name", "nutrient_nbr", "rank"])
+        for i in mapped + extra:
+            w.writerow([i, f"Nutrient {i}", "G", str(i - 700), i])
+
+    with open(target / "food.csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, quoting=csv.QUOTE_ALL)
+        w.writerow(["fdc_id", "data_type", "description", "food_category_id", "publication_date"])
+        for n in range(foods):
+            # About one name in twenty repeats an earlier food's
+            base = rng.randrange(n) if n and rng.random() < 0.05 else n
+            description = (f"{WORDS[base % len(WORDS)]} {_letters(base)}, "
+                           f"{STYLES[base % len(STYLES)]}, with salt")
+            w.writerow([100000 + n, rng.choice(DATA_TYPES), description, "", "2019-04-01"])
+
+    rows = 0
+    with open(target / "food_nutrient.csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, quoting=csv.QUOTE_ALL)
+        w.writerow(["id", "fdc_id", "nutrient_id", "amount", "data_points", "derivation_id", "min", "max",
+                    "median", "footnote", "min_year_acquired"])
+        for n in range(foods):
+            ids = mapped[:per_food] + rng.sample(extra, max(0, per_food - len(mapped)))
+            for nutrient_id in ids:
+                rows += 1
+                w.writerow([rows, 100000 + n, nutrient_id, round(rng.uniform(0, 500), 3), "", "", "", "",
+                            "", "", ""])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FDC bulk import on generated data")
+    parser.add_argument("--db", default="food_info.db", help="Source database (copied, never modified)")
+    parser.add_argument("--foods", type=int, default=100_000, help="Foods in the generated export")
+    parser.add_argument("--nutrients-per-food", type=int, default=20, help="food_nutrient rows per food")
+    parser.add_argument("--zip", action="store_true", help="Import from a .zip of the export")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="fdc_import_"))
+    try:
+        export = workdir / "FoodData_Central_csv"
+        export.mkdir()
+        start = time.perf_counter()
+        nutrient_rows = write_export(export, args.foods, args.nutrients_per_food, args.seed)
+        print(f"🧪 Generated {args.foods:,} foods and {nutrient_rows:,} nutrient rows "
+              f"in {time.perf_counter() - start:.1f}s")
+        if args.zip:
+            archive = workdir / "FoodData_Central_csv.zip"
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+                for path in export.iterdir():
+                    zf.write(path, f"{export.name}/{path.name}")
+            export = archive
+
+        db = workdir / "food_info.db"
+        shutil.copyfile(args.db, db)
+        conn = sqlite3.connect(db)
+        progress = ProgressReporter(console_subscriber)
+        start = time.perf_counter()
+        counts = import_fdc(conn, export, progress=progress)
+        elapsed = time.perf_counter() - start
+
+        filled = conn.execute(
+            "SELECT COUNT(*) FROM food_info WHERE match_type = 'fdc' AND calories IS NOT NULL"
+        ).fetchone()[0]
+        conn.close()
+        print(f"\n📊 {counts['foods_inserted']:,} foods, {counts['nutrient_amounts']:,} nutrient amounts "
+              f"in {elapsed:.1f}s ({counts['foods_inserted'] / elapsed:,.0f} foods/s, "
+              f"{counts['nutrient_amounts'] / elapsed:,.0f} amounts/s)")
+        print(f"   duplicates {counts['duplicates']:,}   other types {counts['other_types']:,}   "
+              f"already in DB {counts['already_in_db']:,}   calories filled {filled:,}")
+        for stage, seconds in progress.stage_timings.items():
+            print(f"   {stage:<15} {seconds:.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
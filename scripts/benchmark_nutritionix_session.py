@@ -0,0 +1,137 @@
+"""Compare a new connection per Nutritionix lookup with the pooled keep-alive session.
+
+Starts a local stand-in for ``/v2/natural/nutrients`` and sends the same
+lookups two ways: ``requests.post`` per call (a fresh TCP connection
+every time, as the service used to do) and ``nutritionix_service``'s
+pooled session.  ``--connect-delay`` adds a pause to every new
+connection to stand in for the TLS handshake and round trip the real
+API costs; it is 0 by default, so the numbers show plain local TCP.
+
+    python scripts/benchmark_nutritionix_session.py --requests 300 --workers 8
+    python scripts/benchmark_nutritionix_session.py --connect-delay 0.05
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+FOOD = {
+    "food_name": "carrot", "serving_qty": 100, "serving_unit": "g", "serving_weight_grams": 100,
+    "nf_calories": 41, "nf_total_fat": 0.2, "nf_saturated_fat": 0, "nf_cholesterol": 0,
+    "nf_sodium": 69, "nf_total_carbohydrate": 10, "nf_dietary_fiber": 2.8, "nf_sugars": 4.7,
+    "nf_protein": 0.9, "nf_potassium": 320,
+}
+
+
+def make_handler(stats, lock, connect_delay):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so clients may keep the connection open between requests
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, Nagle's
+        # algorithm holds the body for the client's delayed ACK (~40ms)
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+            time.sleep(connect_delay)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+            with lock:
+                stats["requests"] += 1
+            foods = [dict(FOOD, food_name=line.strip()) for line in query.splitlines() if line.strip()]
+            body = json.dumps({"foods": foods}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def run(label, send, names, workers, stats):
+    """Send every name through ``send``; print per-request latency and connections opened."""
+    before = stats["connections"]
+    latencies = []
+
+    def timed(name):
+        start = time.perf_counter()
+        send(name)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            latencies = list(pool.map(timed, names))
+    else:
+        latencies = [timed(n) for n in names]
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+    print(f"{label:<22} mean={statistics.mean(latencies) * 1000:7.2f}ms p50={p50:7.2f}ms "
+          f"p95={p95:7.2f}ms  {len(names) / elapsed:8.1f} req/s  "
+          f"connections={stats['connections'] - before}")
+    return statistics.mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-request Nutritionix connections")
+    parser.add_argument("--requests", type=int, default=200, help="Lookups per run")
+    parser.add_argument("--workers", type=int, default=1, help="Threads sharing the session")
+    parser.add_argument("--connect-delay", type=float, default=0.0,
+                        help="Seconds the server waits on each new connection (handshake stand-in)")
+    args = parser.parse_args()
+
+    stats, lock = {"connections": 0, "requests": 0}, threading.Lock()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stats, lock, args.connect_delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v2"
+
+    # Set before import so the service points at the stand-in
+    os.environ["NUTRITIONIX_BASE_URL"] = base_url
+    os.environ.setdefault("NUTRITIONIX_APP_ID", "bench")
+    os.environ.setdefault("NUTRITIONIX_API_KEY", "bench")
+    os.environ["NUTRITIONIX_REQUESTS_PER_MINUTE"] = "0"
+    import requests
+    from food_project.database import nutritionix_service as nx
+    from food_project.net.http_client import POOL_SIZE
+
+    headers = {"x-app-id": "bench", "x-app-key": "bench"}
+
+    def fresh(name):
+        response = requests.post(nx.API_URL, json={"query": name}, headers=headers, timeout=10)
+        response.raise_for_status()
+        return response.json()["foods"]
+
+    names = [f"food {i}" for i in range(args.requests)]
+    print(f"🧪 {args.requests} lookups, {args.workers} worker(s), "
+          f"connect delay {args.connect_delay * 1000:.0f}ms, pool size {POOL_SIZE}")
+    nx._post_query("warm up")
+    fresh_mean = run("new connection / call", fresh, names, args.workers, stats)
+    pooled_mean = run("pooled session", nx._post_query, names, args.workers, stats)
+    print(f"⚡ Saved {(fresh_mean - pooled_mean) * 1000:.2f}ms per request "
+          f"({(1 - pooled_mean / fresh_mean):.0%})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
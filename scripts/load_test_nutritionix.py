@@ -0,0 +1,153 @@
+"""Drive populate_food_info and update runs against the local Nutritionix stand-in.
+
+Each scenario runs on a throwaway copy of the database with its
+``food_info`` rows removed, so every food has to be looked up.  The stub
+(``food_project.dev.nutritionix_stub_server``) serves the original rows
+as fixtures.  The pipeline runs as a subprocess exactly as from the
+command line; update runs use the in-process LLM stub.  Reports
+end-to-end time, requests/sec and what the stub saw.
+
+    python scripts/load_test_nutritionix.py --scenario both --latency 0.3 --rate-limit 5
+    python scripts/load_test_nutritionix.py --scenario populate --foods 500 --batch-size 20
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.nutritionix_service import BATCH_SIZE
+from food_project.dev.nutritionix_stub_server import add_fault_arguments, load_fixtures, start_server, state_from_args
+
+
+def prepare_db(source: Path, workdir: Path) -> Path:
+    """Copy ``source`` into ``workdir`` and empty its ``food_info`` table."""
+    target = workdir / "food_info.db"
+    shutil.copyfile(source, target)
+    conn = sqlite3.connect(target)
+    with conn:
+        conn.execute("DELETE FROM food_info")
+    conn.close()
+    return target
+
+
+def _letters(i: int) -> str:
+    # Digits are stripped by normalization, so made-up names count in letters
+    out = ""
+    while True:
+        i, r = divmod(i, 26)
+        out = chr(ord("a") + r) + out
+        if i == 0:
+            return out
+
+
+def food_list(fixtures, count: int) -> list:
+    """``count`` names: every fixture name, then made-up ones past the fixtures."""
+    names = sorted(fixtures)[:count]
+    names += [f"stub food {_letters(i)}" for i in range(count - len(names))]
+    return names
+
+
+def run_scenario(name, command, workdir: Path, env: dict, state) -> dict:
+    before = state.snapshot()
+    log_path = workdir / f"{name}.log"
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        code = subprocess.call(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+    after = state.snapshot()
+    seen = {key: after[key] - before[key] for key in after}
+
+    conn = sqlite3.connect(workdir / "food_info.db")
+    rows = conn.execute("SELECT COUNT(*) FROM food_info").fetchone()[0]
+    conn.close()
+    if code != 0:
+        print(f"❌ {name} exited with {code}; see {log_path}")
+    return {"scenario": name, "exit_code": code, "seconds": elapsed, "food_info_rows": rows, **seen}
+
+
+def print_report(result: dict) -> None:
+    seconds = result["seconds"]
+    print(f"\n📊 {result['scenario']}: {seconds:.2f}s end to end, exit code {result['exit_code']}")
+    print(f"   requests        {result['requests']:<6} ({result['requests'] / seconds:.1f} req/s)")
+    print(f"   foods requested {result['foods_requested']:<6} ({result['foods_requested'] / seconds:.1f} foods/s)")
+    print(f"   food_info rows  {result['food_info_rows']}")
+    print(f"   connections     {result['connections']}")
+    print(f"   rate limited    {result['rate_limited']}   errors {result['errors']}   "
+          f"not found {result['not_found']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test populate and update runs against a local Nutritionix stub")
+    parser.add_argument("--db", default="food_info.db", help="Source database (copied, never modified)")
+    parser.add_argument("--scenario", choices=("populate", "update", "both"), default="both")
+    parser.add_argument("--foods", type=int, default=200, help="Foods in the populate list")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Foods per Nutritionix request")
+    parser.add_argument("--keep", action="store_true", help="Keep the working directory with logs and DBs")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    source = Path(args.db).resolve()
+    fixtures = load_fixtures(str(source))
+    state = state_from_args(args, fixtures)
+    server = start_server(state)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v2"
+    print(f"🧪 Nutritionix stub on {base_url} with {len(fixtures)} fixture food(s)")
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")])),
+        "NUTRITIONIX_BASE_URL": base_url,
+        "NUTRITIONIX_APP_ID": "load-test",
+        "NUTRITIONIX_API_KEY": "load-test",
+        "LLM_PROVIDER": "stub",
+        "LLM_REVIEW_PROVIDER": "stub",
+    })
+    # Client-side throttling would hide the stub's own --rate-limit
+    env.setdefault("NUTRITIONIX_REQUESTS_PER_MINUTE", "0")
+
+    results = []
+    workroot = Path(tempfile.mkdtemp(prefix="nutritionix_load_"))
+    try:
+        if args.scenario in ("populate", "both"):
+            workdir = workroot / "populate"
+            workdir.mkdir()
+            db = prepare_db(source, workdir)
+            foods_path = workdir / "foods.txt"
+            foods_path.write_text("\n".join(food_list(fixtures, args.foods)) + "\n", encoding="utf-8")
+            results.append(run_scenario("populate", [
+                sys.executable, "-m", "food_project.ingestion.populate_food_info",
+                "--db", str(db), "--file", str(foods_path),
+                "--batch-size", str(args.batch_size), "--max", str(args.foods),
+            ], workdir, env, state))
+
+        if args.scenario in ("update", "both"):
+            workdir = workroot / "update"
+            workdir.mkdir()
+            db = prepare_db(source, workdir)
+            results.append(run_scenario("update", [
+                sys.executable, "-m", "food_project.processing.update_worker",
+                "--db", str(db), "--mode", "all",
+            ], workdir, env, state))
+    finally:
+        server.shutdown()
+        if args.keep:
+            print(f"📁 Logs and databases kept in {workroot}")
+        else:
+            shutil.rmtree(workroot, ignore_errors=True)
+
+    for result in results:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+import argparse
+import sqlite3
+from collections import Counter
+
+# Add project root to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from food_project.processing.normalization import parse_ingredient
+from food_project.processing.units import COMMON_UNITS
+from food_project.processing.validator import FoodIndex, score_parse
+from food_project.processing.ingredient_updater import CONFIDENCE_THRESHOLD
+
+
+def legacy_needs_llm(raw_text, unit, normalized_name, known_foods, unit_set):
+    """The old rule: exact catalog membership and a known, non-empty unit."""
+    food_score = 100.0 if normalized_name in known_foods else 60.0
+    unit_score = 100.0 if unit in unit_set else 50.0
+    return (food_score < CONFIDENCE_THRESHOLD or unit_score < CONFIDENCE_THRESHOLD) and bool(raw_text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare LLM fallbacks under the old and graded validators")
+    parser.add_argument("--db", default="food_info.db", help="Path to SQLite database")
+    parser.add_argument("--show", type=int, default=10, help="Example lines to print from each group")
+    args = parser.parse_args()
+
+    uri = Path(args.db).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    rows = [r[0] for r in conn.execute("SELECT food_name FROM ingredients WHERE food_name IS NOT NULL")]
+    known_foods = {r[0] for r in conn.execute("SELECT normalized_name FROM food_info") if r[0]}
+    conn.close()
+
+    unit_set = set(COMMON_UNITS)
+    food_index = FoodIndex(known_foods)
+    row_counts = Counter(rows)
+
+    legacy, graded = set(), set()
+    for raw_text in row_counts:
+        amount, unit, normalized_name, _ = parse_ingredient(raw_text)
+        if legacy_needs_llm(raw_text, unit, normalized_name, known_foods, unit_set):
+            legacy.add(raw_text)
+        if score_parse(raw_text, amount, unit, normalized_name, food_index, unit_set, CONFIDENCE_THRESHOLD)[2]:
+            graded.add(raw_text)
+
+    def rows_in(texts):
+        return sum(row_counts[t] for t in texts)
+
+    saved = legacy - graded
+    print(f"📊 {len(rows)} ingredient row(s), {len(row_counts)} distinct line(s), {len(known_foods)} known food(s)")
+    print(f"   old validator:    {len(legacy)} LLM call(s) covering {rows_in(legacy)} row(s)")
+    print(f"   graded validator: {len(graded)} LLM call(s) covering {rows_in(graded)} row(s)")
+    if legacy:
+        print(f"✅ Saves {len(saved)} call(s) ({len(saved) / len(legacy):.0%})")
+    if graded - legacy:
+        print(f"⚠️ {len(graded - legacy)} line(s) newly sent to the LLM")
+
+    if args.show:
+        print("\nNo longer sent to the LLM:")
+        for raw_text in sorted(saved)[:args.show]:
+            print(f"   - {raw_text}")
+        print("\nStill sent to the LLM:")
+        for raw_text in sorted(graded)[:args.show]:
+            print(f"   - {raw_text}")
+
+
+if __name__ == "__main__":
+    main()
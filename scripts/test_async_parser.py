@@ -0,0 +1,114 @@
+"""AsyncLLMParser: concurrency cap, coalescing and batch-item retries.
+
+Requests go to an in-process :class:`StubProvider` that counts calls and
+overlapping requests; results go to a temporary cache.  Run with pytest
+or directly:
+
+    python scripts/test_async_parser.py
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.llm.async_parser import AsyncLLMParser
+from food_project.llm.full_parser import is_valid_result
+from food_project.llm.llm_cache import LLMCache
+from food_project.llm.providers import StubProvider
+
+FOODS = ["flour", "sugar", "butter", "milk", "rice", "oats"]
+
+
+class CountingStub(StubProvider):
+    """Stub that is slow enough to overlap and breaks the batch items of ``invalid`` lines."""
+
+    def __init__(self, delay=0.05, invalid=()):
+        super().__init__()
+        self.delay = delay
+        self.invalid = set(invalid)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _send(self, messages, model, max_tokens, temperature):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls.append(messages[-1]["content"])
+        try:
+            time.sleep(self.delay)
+            content = super()._send(messages, model, max_tokens, temperature)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        items = json.loads(content)
+        if isinstance(items, list):
+            for item in items:
+                if any(f'{item["index"]}. "{text}"' in messages[-1]["content"] for text in self.invalid):
+                    item["food"] = ""
+            content = json.dumps(items)
+        return content
+
+
+def _run(provider, texts, **kwargs):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", legacy_json=None)
+
+        async def go():
+            parser = AsyncLLMParser(provider=provider, cache=cache, **kwargs)
+            return parser, await parser.parse_many(texts)
+
+        try:
+            return asyncio.run(go())
+        finally:
+            cache.close()
+
+
+def test_concurrency_is_capped():
+    stub = CountingStub()
+    parser, results = _run(stub, [f"1 cup {food}" for food in FOODS], concurrency=2, batch_size=1)
+    assert len(stub.calls) == len(FOODS)
+    assert stub.max_in_flight == 2
+    assert all(is_valid_result(r) for r in results.values())
+
+
+def test_duplicate_lines_share_one_call():
+    stub = CountingStub()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", legacy_json=None)
+
+        async def go():
+            parser = AsyncLLMParser(provider=stub, cache=cache, batch_size=1)
+            return await asyncio.gather(*(parser.parse(t) for t in ("2 cups flour", "2 cups flour", "1 cup flour")))
+
+        results = asyncio.run(go())
+        cache.close()
+    assert len(stub.calls) == 1
+    assert [r["amount"] for r in results] == [2.0, 2.0, 1.0]
+
+
+def test_invalid_batch_items_retried_alone():
+    stub = CountingStub(invalid={"1 cup sugar"})
+    texts = ["1 cup flour", "1 cup sugar", "1 cup milk"]
+    parser, results = _run(stub, texts, batch_size=10)
+    # One batch request, then one request for the line whose item was invalid
+    assert len(stub.calls) == 2
+    assert parser.retried_alone == 1
+    assert "sugar" in stub.calls[1] and "flour" not in stub.calls[1]
+    assert all(is_valid_result(results[t]) for t in texts)
+
+
+if __name__ == "__main__":
+    test_concurrency_is_capped()
+    test_duplicate_lines_share_one_call()
+    test_invalid_batch_items_retried_alone()
+    print("✅ Async LLM parser passes")
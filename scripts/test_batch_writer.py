@@ -0,0 +1,105 @@
+"""BatchWriter checkpoints: by row count, by time, and after a failure.
+
+Uses a temporary database; a second connection checks what is really
+committed.  Run with pytest or directly:
+
+    python scripts/test_batch_writer.py
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.batch_writer import BatchWriter
+from food_project.database.lookup_failures import ensure_lookup_failures_table, record_failures
+
+INSERT_SQL = "INSERT INTO items (name) VALUES (?)"
+
+
+def _open(tmp):
+    path = Path(tmp) / "batch.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+    conn.commit()
+    return path, conn
+
+
+def _committed(path, table="items"):
+    other = sqlite3.connect(path)
+    try:
+        return other.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        other.close()
+
+
+def test_checkpoint_by_row_count():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, conn = _open(tmp)
+        writer = BatchWriter(conn, batch_rows=3, batch_seconds=3600)
+        writer.add(INSERT_SQL, ("a",))
+        writer.add(INSERT_SQL, ("b",))
+        assert writer.pending == 2 and _committed(path) == 0
+        writer.add(INSERT_SQL, ("c",))
+        assert writer.pending == 0 and writer.checkpoints == 1 and _committed(path) == 3
+        conn.close()
+
+
+def test_checkpoint_by_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, conn = _open(tmp)
+        writer = BatchWriter(conn, batch_rows=1000, batch_seconds=0.05)
+        writer.add(INSERT_SQL, ("a",))
+        assert _committed(path) == 0
+        time.sleep(0.06)
+        writer.add(INSERT_SQL, ("b",))
+        assert writer.checkpoints == 1 and _committed(path) == 2
+        conn.close()
+
+
+def test_failed_checkpoint_rolls_back_and_drops_the_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, conn = _open(tmp)
+        writer = BatchWriter(conn, batch_rows=1000, batch_seconds=3600)
+        writer.add(INSERT_SQL, ("a",))
+        writer.add(INSERT_SQL, ("a",))
+        try:
+            writer.checkpoint()
+            raise AssertionError("duplicate key was accepted")
+        except sqlite3.IntegrityError:
+            pass
+        assert _committed(path) == 0, "nothing of a failed batch may be committed"
+        assert writer.pending == 0 and not conn.in_transaction
+
+        # The next batch is not poisoned by the failed one
+        writer.add(INSERT_SQL, ("b",))
+        writer.checkpoint()
+        assert _committed(path) == 1
+        conn.close()
+
+
+def test_queued_lookup_failures_wait_for_the_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, conn = _open(tmp)
+        ensure_lookup_failures_table(conn)
+        writer = BatchWriter(conn, batch_rows=1000, batch_seconds=3600)
+        writer.add(INSERT_SQL, ("a",))
+        record_failures(conn, {"dragon fruit": "not_found"}, writer=writer)
+        assert not conn.in_transaction
+        assert _committed(path, "lookup_failures") == 0
+        writer.checkpoint()
+        assert _committed(path, "lookup_failures") == 1 and _committed(path) == 1
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_checkpoint_by_row_count()
+    test_checkpoint_by_time()
+    test_failed_checkpoint_rolls_back_and_drops_the_batch()
+    test_queued_lookup_failures_wait_for_the_checkpoint()
+    print("✅ BatchWriter checkpoints pass")
@@ -0,0 +1,77 @@
+"""When the per-connection ``food_info`` cache must, and must not, refresh.
+
+Uses a temporary database.  Run with pytest or directly:
+
+    python scripts/test_food_info_cache.py
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.batch_writer import BatchWriter
+from food_project.database.food_info_cache import FoodInfoCache, food_info_cache
+from food_project.database.nutritionix_service import FOOD_INFO_INSERT_SQL, food_info_values, mock_food
+
+
+def _db(tmp):
+    path = Path(tmp) / "food_info.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE food_info (
+            id INTEGER PRIMARY KEY, raw_name TEXT, normalized_name TEXT UNIQUE, serving_qty REAL,
+            serving_unit TEXT, serving_weight_grams REAL, calories REAL, fat REAL, saturated_fat REAL,
+            cholesterol REAL, sodium REAL, carbs REAL, fiber REAL, sugars REAL, protein REAL, potassium REAL
+        );
+        CREATE TABLE ingredients (id INTEGER PRIMARY KEY, food_name TEXT);
+    """)
+    conn.execute(FOOD_INFO_INSERT_SQL, food_info_values("egg", "egg", mock_food("egg")))
+    conn.commit()
+    return path, conn
+
+
+def test_other_tables_keep_the_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, conn = _db(tmp)
+        cache = FoodInfoCache()
+        assert cache.get(conn, "egg")
+        with conn:
+            conn.execute("INSERT INTO ingredients (food_name) VALUES ('1 egg')")
+        writer = BatchWriter(conn)
+        writer.add("INSERT INTO ingredients (food_name) VALUES (?)", ("2 eggs",))
+        writer.checkpoint()
+        assert cache.get(conn, "egg")
+        assert (cache.hits, cache.misses) == (1, 1)
+        conn.close()
+
+
+def test_food_info_writes_refresh_the_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, conn = _db(tmp)
+        assert food_info_cache.get(conn, "butter") is None
+
+        # Own writes through a BatchWriter
+        writer = BatchWriter(conn)
+        writer.add(FOOD_INFO_INSERT_SQL, food_info_values("butter", "butter", mock_food("butter")))
+        writer.checkpoint()
+        assert food_info_cache.get(conn, "butter")
+
+        # Another connection's commit
+        assert food_info_cache.get(conn, "flour") is None
+        other = sqlite3.connect(path)
+        with other:
+            other.execute(FOOD_INFO_INSERT_SQL, food_info_values("flour", "flour", mock_food("flour")))
+        other.close()
+        assert food_info_cache.get(conn, "flour")
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_other_tables_keep_the_cache()
+    test_food_info_writes_refresh_the_cache()
+    print("✅ food_info cache invalidation passes")
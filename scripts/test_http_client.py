@@ -0,0 +1,83 @@
+"""Circuit breaker recovery in ``food_project.net.http_client``.
+
+A half-open trial that ends in any error must still record an outcome,
+or the circuit never closes again.  No network is used: a fake session
+raises or answers in-process.  Run with pytest or directly:
+
+    python scripts/test_http_client.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.net import http_client
+from food_project.net.http_client import CircuitBreaker, request
+
+
+class FakeSession:
+    """Raises each queued exception, then answers 200."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+
+def _half_open_breaker(key):
+    """A breaker for ``key`` that is open and already past its reset timeout."""
+    breaker = CircuitBreaker(key, failure_threshold=1, reset_timeout=0.05)
+    http_client._breakers[key] = breaker
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_non_retryable_error_in_half_open_trial():
+    breaker = _half_open_breaker("test-redirects")
+    session = FakeSession(requests.TooManyRedirects("loop"))
+    before = http_client.metrics.snapshot().get("test-redirects", {}).get("errors", 0)
+    try:
+        request("test-redirects", "GET", "http://example.invalid", session=session)
+        raise AssertionError("TooManyRedirects was swallowed")
+    except requests.TooManyRedirects:
+        pass
+    assert session.calls == 1, "non-retryable errors must not be retried"
+    assert breaker.state == "open", "a failed trial re-opens the circuit"
+    assert http_client.metrics.snapshot()["test-redirects"]["errors"] == before + 1
+
+    # The next trial goes through and closes the circuit
+    time.sleep(0.06)
+    assert request("test-redirects", "GET", "http://example.invalid", session=session).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_unexpected_error_in_half_open_trial_frees_the_trial():
+    breaker = _half_open_breaker("test-unexpected")
+    try:
+        request("test-unexpected", "GET", "http://example.invalid", session=FakeSession(RuntimeError("bug")))
+        raise AssertionError("RuntimeError was swallowed")
+    except RuntimeError:
+        pass
+    # Still half-open, and another trial is allowed
+    assert breaker.before_call() is True
+
+
+if __name__ == "__main__":
+    test_non_retryable_error_in_half_open_trial()
+    test_unexpected_error_in_half_open_trial_frees_the_trial()
+    print("✅ Circuit breaker recovers from any failed trial")
@@ -0,0 +1,146 @@
+"""Import a four-food FoodData Central export, including failed and killed runs.
+
+Writes the CSVs into a temporary directory and imports them into a fresh
+database; no network calls.  Run with pytest or directly:
+
+    python scripts/test_import_fdc.py
+"""
+
+import csv
+import sqlite3
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.sqlite_connector import get_connection, init_db
+from food_project.ingestion.import_fdc import INDEXES, LOADING, ensure_fdc_tables, import_fdc
+
+NUTRIENTS = [(1008, "Energy", "KCAL", "208"), (1003, "Protein", "G", "203"), (1004, "Total lipid (fat)", "G", "204")]
+FOODS = [
+    (1001, "foundation_food", "Onions, raw"),
+    (1002, "sr_legacy_food", "Onion, raw"),          # same name; foundation_food wins
+    (1003, "sr_legacy_food", "Butter, salted"),
+    (1004, "sub_sample_food", "Egg, whole, raw, fresh"),  # data type not imported
+]
+AMOUNTS = {
+    1001: {1008: 40, 1003: 1.1, 1004: 0.1},
+    1002: {1008: 42, 1003: 0.9, 1004: 0.2},
+    1003: {1008: 717, 1003: 0.9, 1004: 81.1},
+    1004: {1008: 143, 1003: 12.6, 1004: 9.5},
+}
+
+
+def _write(path: Path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, quoting=csv.QUOTE_ALL)
+        w.writerow(header)
+        w.writerows(rows)
+
+
+def write_export(target: Path, bad_nutrient_id=False) -> Path:
+    target.mkdir()
+    _write(target / "nutrient.csv", ["id", "name", "unit_name", "nutrient_nbr", "rank"],
+           [(*n, i) for i, n in enumerate(NUTRIENTS)])
+    _write(target / "food.csv", ["fdc_id", "data_type", "description", "food_category_id"],
+           [(*f, "") for f in FOODS])
+    rows = [(fdc_id, nutrient_id, amount)
+            for fdc_id, amounts in AMOUNTS.items() for nutrient_id, amount in amounts.items()]
+    if bad_nutrient_id:
+        # Read after the foods are committed, so a partial load is on disk when it fails
+        rows.append((1003, "energy", 1.0))
+    rows = [(i, *row) for i, row in enumerate(rows, start=1)]
+    _write(target / "food_nutrient.csv", ["id", "fdc_id", "nutrient_id", "amount"], rows)
+    return target
+
+
+def _db(tmp) -> sqlite3.Connection:
+    conn = get_connection(Path(tmp) / "food_info.db")
+    init_db(conn)
+    return conn
+
+
+def _indexes(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def _foods(conn):
+    return {r["normalized_name"]: dict(r) for r in conn.execute(
+        "SELECT normalized_name, raw_name, match_type, calories, protein, fat FROM food_info")}
+
+
+def test_import_four_foods():
+    with tempfile.TemporaryDirectory() as tmp:
+        export = write_export(Path(tmp) / "FoodData_Central_csv")
+        archive = Path(tmp) / "FoodData_Central_csv.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            for path in export.iterdir():
+                zf.write(path, f"{export.name}/{path.name}")
+
+        conn = _db(tmp)
+        counts = import_fdc(conn, archive)
+        assert counts["foods_inserted"] == 2
+        assert (counts["read"], counts["duplicates"], counts["other_types"]) == (4, 1, 1)
+        assert counts["nutrient_amounts"] == 6
+        foods = _foods(conn)
+        assert foods["onion"] == {"normalized_name": "onion", "raw_name": "Onions, raw", "match_type": "fdc",
+                                  "calories": 40.0, "protein": 1.1, "fat": 0.1}
+        assert foods["butter"]["calories"] == 717.0
+        sources = conn.execute("SELECT source_id, data_type FROM food_sources ORDER BY source_id").fetchall()
+        assert [tuple(r) for r in sources] == [("1001", "foundation_food"), ("1003", "sr_legacy_food")]
+        assert set(INDEXES) <= _indexes(conn)
+
+        # Names already in food_info are left alone on a second run
+        assert import_fdc(conn, export)["already_in_db"] == 3
+        conn.close()
+
+
+def test_failed_import_is_removed_and_rerun():
+    with tempfile.TemporaryDirectory() as tmp:
+        bad = write_export(Path(tmp) / "bad", bad_nutrient_id=True)
+        conn = _db(tmp)
+        try:
+            import_fdc(conn, bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a bad nutrient_id should fail the import")
+        assert set(INDEXES) <= _indexes(conn)
+        assert _foods(conn) == {}
+        assert conn.execute("SELECT COUNT(*) FROM food_sources").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM food_nutrients").fetchone()[0] == 0
+
+        counts = import_fdc(conn, write_export(Path(tmp) / "good"))
+        assert counts["foods_inserted"] == 2
+        assert {f["match_type"] for f in _foods(conn).values()} == {"fdc"}
+        conn.close()
+
+
+def test_killed_import_is_cleaned_up_next_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = _db(tmp)
+        ensure_fdc_tables(conn)
+        # What a process killed mid-load leaves behind
+        conn.execute("INSERT INTO food_info (id, raw_name, normalized_name, match_type) VALUES (7, 'Onions, raw', "
+                     "'onion', ?)", (LOADING,))
+        conn.execute("INSERT INTO food_sources VALUES (7, 'fdc', '1001', 'foundation_food')")
+        conn.execute("INSERT INTO food_nutrients VALUES (7, 1008, 40)")
+        conn.commit()
+
+        counts = import_fdc(conn, write_export(Path(tmp) / "FoodData_Central_csv"))
+        assert counts["foods_inserted"] == 2 and counts["already_in_db"] == 0
+        assert _foods(conn)["onion"]["calories"] == 40.0
+        assert conn.execute("SELECT COUNT(*) FROM food_nutrients WHERE food_info_id = 7").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM food_sources").fetchone()[0] == 2
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_import_four_foods()
+    test_failed_import_is_removed_and_rerun()
+    test_killed_import_is_cleaned_up_next_run()
+    print("✅ FDC import passes")
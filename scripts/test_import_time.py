@@ -0,0 +1,106 @@
+"""Import every food_project module in a fresh interpreter and check its cost.
+
+Fails when a module takes longer than its budget to import, raises at
+import (e.g. because an API key is missing), or pulls in Streamlit
+outside ``food_project.ui``.  Run with pytest or directly:
+
+    python scripts/test_import_time.py
+"""
+
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds allowed for a cold import of one module
+DEFAULT_BUDGET = 1.0
+# Modules that legitimately load heavy UI or scraping libraries
+BUDGET_OVERRIDES = {
+    "food_project.ui": 6.0,
+    "food_project.ingestion.parse_recipe_url": 3.0,
+}
+# Superseded code that is kept for reference only
+SKIP_PREFIXES = ("food_project.archive",)
+
+# Credentials are removed so a module that needs them at import fails loudly.
+# The probe also disables load_dotenv (which finds the repo's .env from the
+# module's own path) and runs outside the repo, away from .streamlit/secrets.
+SECRET_VARS = ("TOGETHER_API_KEY", "NUTRITIONIX_APP_ID", "NUTRITIONIX_API_KEY", "HF_API_KEY")
+
+PROBE = """
+import json, os, sys, time
+import dotenv
+dotenv.load_dotenv = lambda *args, **kwargs: False
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "streamlit": "streamlit" in sys.modules,
+                  "secrets": sorted(k for k in {secrets!r} if os.environ.get(k))}}))
+"""
+
+
+def iter_modules():
+    import food_project
+    for info in pkgutil.walk_packages(food_project.__path__, "food_project."):
+        if not info.name.startswith(SKIP_PREFIXES):
+            yield info.name
+
+
+def budget_for(module: str) -> float:
+    matches = [p for p in BUDGET_OVERRIDES if module == p or module.startswith(p + ".")]
+    return BUDGET_OVERRIDES[max(matches, key=len)] if matches else DEFAULT_BUDGET
+
+
+def measure(module: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in SECRET_VARS}
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, secrets=SECRET_VARS)],
+            capture_output=True, text=True, env=env, cwd=cwd,
+        )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "exit code " + str(proc.returncode)}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check_imports():
+    """Return ``(results, failures)`` for every module."""
+    sys.path.insert(0, str(ROOT))
+    results, failures = {}, []
+    for module in iter_modules():
+        result = measure(module)
+        results[module] = result
+        if "error" in result:
+            failures.append(f"{module}: import failed ({result['error']})")
+            continue
+        if result["seconds"] > budget_for(module):
+            failures.append(f"{module}: {result['seconds']:.2f}s > budget {budget_for(module):.2f}s")
+        if result["streamlit"] and not module.startswith("food_project.ui"):
+            failures.append(f"{module}: imports streamlit")
+        if result["secrets"]:
+            failures.append(f"{module}: loads {', '.join(result['secrets'])} at import")
+    return results, failures
+
+
+def test_import_time_budget():
+    _, failures = check_imports()
+    assert not failures, "\n".join(failures)
+
+
+if __name__ == "__main__":
+    results, failures = check_imports()
+    for module, result in sorted(results.items(), key=lambda kv: -kv[1].get("seconds", 0)):
+        if "error" in result:
+            print(f"❌ {module:<55} {result['error']}")
+        else:
+            flag = "⚠️" if result["seconds"] > budget_for(module) else "✅"
+            print(f"{flag} {module:<55} {result['seconds']:.3f}s (budget {budget_for(module):.1f}s)")
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+    print("\n✅ All modules within their import budget")
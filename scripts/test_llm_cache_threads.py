@@ -0,0 +1,93 @@
+"""Use one LLMCache from several threads, as Streamlit reruns do.
+
+Each rerun runs on a new thread, so the shared cache must not be tied to
+the thread that opened it.  Lookups must also stay reads: LRU touches
+are buffered until the next write.  Run with pytest or directly:
+
+    python scripts/test_llm_cache_threads.py
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.llm.llm_cache import LLMCache
+
+
+def _in_thread(fn):
+    """Run ``fn`` on a new thread; re-raise whatever it raised."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def test_cache_used_from_two_threads():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", legacy_json=None)
+        _in_thread(lambda: cache.set("1 cup flour", {"food": "flour"}))
+        assert _in_thread(lambda: cache.get("1 cup flour")) == {"food": "flour"}
+        assert cache.get("1 cup flour") == {"food": "flour"}
+        assert _in_thread(lambda: len(cache)) == 1
+        cache.close()
+
+
+def test_cache_concurrent_writers():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", legacy_json=None)
+        errors = []
+
+        def work(n):
+            try:
+                for i in range(50):
+                    cache.set(f"item {n} {i}", {"n": n, "i": i})
+                    assert cache.get(f"item {n} {i}") == {"n": n, "i": i}
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert len(cache) == 200
+        cache.close()
+
+
+def test_reads_buffer_lru_touches():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", max_entries=2, legacy_json=None)
+        cache.set("old", {"n": 1})
+        cache.set("new", {"n": 2})
+        writes = cache.conn.total_changes
+        for _ in range(10):
+            assert cache.get("old") == {"n": 1}
+        assert cache.conn.total_changes == writes, "lookups must not write"
+
+        # The buffered touch lands with the next write, so "new" is evicted, not "old"
+        cache.set("newest", {"n": 3})
+        assert "old" in cache and "newest" in cache and "new" not in cache
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_cache_used_from_two_threads()
+    test_cache_concurrent_writers()
+    test_reads_buffer_lru_touches()
+    print("✅ LLMCache works across threads")
@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 load_dotenv()  # ⬅️ Loads variables from .env if present
 
-from food_project.llm.ingredient_name_reviewer import suggest_normalized_name
+from food_project.llm.ingredient_name_reviewer import suggest_normalized_name, suggest_normalized_names
 
 # Test values
 raw_ingredient = "1 tbsp roughly chopped flat-leaf parsley"
@@ -15,3 +15,11 @@ suggestion = suggest_normalized_name(raw_ingredient, current_normalized, existin
 
 print("🧠 LLM Suggestion:", suggestion)
 
+# Batch mode: several ingredients per request, cached ones answered locally
+batch = [
+    (raw_ingredient, current_normalized),
+    ("2 sprigs fresh thyme leaves", "fresh thyme leaves"),
+    ("a handful of torn basil", "torn basil"),
+]
+for (raw, _), name in zip(batch, suggest_normalized_names(batch, existing_options)):
+    print(f"🧠 {raw!r} -> {name}")
@@ -0,0 +1,74 @@
+"""Which failed Nutritionix lookups are remembered, and for how long.
+
+Uses an in-memory database and fixed timestamps.  Run with pytest or
+directly:
+
+    python scripts/test_lookup_failures.py
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.lookup_failures import (
+    DAY, UPSERT_FAILURE_SQL, blocked_names, clear_failures, ensure_lookup_failures_table, failure_params,
+)
+from food_project.database.nutritionix_service import FoodNotFoundError, failure_reason
+from food_project.net.http_client import CircuitOpenError
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+def test_failure_classification():
+    assert failure_reason(FoodNotFoundError("No foods returned for query: 'xyz'")) == "not_found"
+    assert failure_reason(_http_error(404)) == "not_found"
+    assert failure_reason(_http_error(503)) == "server_error"
+    # Nothing to do with the food: not remembered
+    assert failure_reason(requests.JSONDecodeError("Expecting value", '{"foods": [', 10)) is None
+    assert failure_reason(ValueError("bad value")) is None
+    assert failure_reason(_http_error(401)) is None
+    assert failure_reason(_http_error(429)) is None
+    assert failure_reason(requests.Timeout("slow")) is None
+    assert failure_reason(CircuitOpenError("nutritionix", 30)) is None
+
+
+def _fail(conn, name, reason, now):
+    with conn:
+        conn.execute(UPSERT_FAILURE_SQL, failure_params(name, reason, now=now))
+
+
+def test_backoff_expires_and_doubles():
+    conn = sqlite3.connect(":memory:")
+    ensure_lookup_failures_table(conn)
+    t0 = 1_000_000.0
+    _fail(conn, "xyz", "not_found", t0)
+    assert blocked_names(conn, ["xyz", "egg"], now=t0 + DAY - 1) == {"xyz"}
+    assert blocked_names(conn, ["xyz"], now=t0 + DAY + 1) == set()
+
+    # Failing again after the retry doubles the wait
+    t1 = t0 + DAY + 1
+    _fail(conn, "xyz", "not_found", t1)
+    assert blocked_names(conn, ["xyz"], now=t1 + 2 * DAY - 1) == {"xyz"}
+    assert blocked_names(conn, ["xyz"], now=t1 + 2 * DAY + 1) == set()
+
+    # A later success forgets the failure
+    _fail(conn, "xyz", "not_found", t1 + 2 * DAY + 1)
+    clear_failures(conn, ["xyz"])
+    assert blocked_names(conn, None, now=t1 + 2 * DAY + 2) == set()
+    conn.close()
+
+
+if __name__ == "__main__":
+    test_failure_classification()
+    test_backoff_expires_and_doubles()
+    print("✅ Lookup failure classification and backoff pass")
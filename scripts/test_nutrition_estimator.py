@@ -0,0 +1,140 @@
+"""Nearest-neighbour nutrition estimates and the updater's fallback order.
+
+Uses a hand-built catalog of a few foods and an in-memory database; no
+API is called.  Run with pytest or directly:
+
+    python scripts/test_nutrition_estimator.py
+"""
+
+import math
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.nutritionix_service import FOOD_INFO_INSERT_SQL, food_info_values, mock_food
+from food_project.processing.ingredient_updater import _queue_food_info
+from food_project.processing.nutrition_estimator import (
+    CATEGORY_BONUS, MIN_SIMILARITY, NUTRIENT_COLUMNS, NutritionEstimator, embed_name,
+)
+
+# name -> calories per 100g (every other nutrient is calories / 10)
+CATALOG = {
+    "red onion": 40.0,
+    "white onion": 42.0,
+    "onion rings": 410.0,
+    "garlic": 149.0,
+    "chicken breast": 165.0,
+    "carrot": 41.0,
+}
+FIBER = NUTRIENT_COLUMNS.index("fiber")
+
+
+def _estimator(k=3, fiber_nan=()):
+    names = list(CATALOG)
+    per_100g = np.array([[cal] + [cal / 10] * (len(NUTRIENT_COLUMNS) - 1) for cal in CATALOG.values()])
+    for name in fiber_nan:
+        per_100g[names.index(name), FIBER] = np.nan
+    return NutritionEstimator(names, per_100g, k=k)
+
+
+def test_top_k_best_first():
+    neighbors = _estimator(k=3).neighbors("yellow onion")
+    assert len(neighbors) == 3
+    scores = [score for _, score in neighbors]
+    assert scores == sorted(scores, reverse=True)
+    assert {name for name, _ in neighbors[:2]} == {"red onion", "white onion"}
+
+
+def test_head_noun_bonus():
+    scores = dict(_estimator(k=len(CATALOG)).neighbors("yellow onion"))
+    query = embed_name("yellow onion")
+    # Same head noun: cosine plus the bonus; otherwise the plain cosine
+    assert math.isclose(scores["red onion"], float(embed_name("red onion") @ query) + CATEGORY_BONUS, rel_tol=1e-5)
+    assert math.isclose(scores["onion rings"], float(embed_name("onion rings") @ query), rel_tol=1e-5)
+
+
+def test_nothing_similar_enough():
+    estimator = _estimator()
+    assert max(score for _, score in estimator.neighbors("quinoa")) < MIN_SIMILARITY
+    assert estimator.estimate("quinoa") is None
+    assert NutritionEstimator([], np.zeros((0, len(NUTRIENT_COLUMNS)))).estimate("onion") is None
+
+
+def test_estimate_is_weighted_mean_of_close_neighbors():
+    est = _estimator().estimate("yellow onion")
+    assert set(est["neighbors"]) == {"red onion", "white onion"}
+    assert 40.0 <= est["calories"] <= 42.0
+    assert est["similarity"] >= MIN_SIMILARITY
+
+
+def test_missing_nutrients_are_skipped_not_zero():
+    est = _estimator(fiber_nan=["red onion"]).estimate("yellow onion")
+    # Only white onion knows fiber, so its value is the mean
+    assert est["fiber"] == 4.2
+    est = _estimator(fiber_nan=["red onion", "white onion"]).estimate("yellow onion")
+    assert est["fiber"] is None
+    assert est["calories"] is not None
+
+
+class ListWriter:
+    """Stands in for ``BatchWriter``: just records what would be written."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, sql, params):
+        self.rows.append(params)
+
+    def match_types(self):
+        return [params[-2] for params in self.rows]
+
+
+def _conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE food_info (
+            id INTEGER PRIMARY KEY, raw_name TEXT, normalized_name TEXT UNIQUE, serving_qty REAL,
+            serving_unit TEXT, serving_weight_grams REAL, calories REAL, fat REAL, saturated_fat REAL,
+            cholesterol REAL, sodium REAL, carbs REAL, fiber REAL, sugars REAL, protein REAL, potassium REAL
+        )
+    """)
+    conn.execute(FOOD_INFO_INSERT_SQL, food_info_values("egg", "egg", mock_food("egg")))
+    conn.commit()
+    return conn
+
+
+def _queue(name, resolved=None, queued=(), mock=False):
+    conn, writer, queued = _conn(), ListWriter(), set(queued)
+    flags = _queue_food_info(conn, writer, name, resolved, queued, mock=mock, estimator=_estimator())
+    conn.close()
+    return flags, writer.match_types(), queued
+
+
+def test_fallback_order():
+    # Resolved by Nutritionix in this run: nothing more to do
+    assert _queue("2 eggs", resolved="egg", queued={"egg"})[:2] == ((1, 0, 0), [])
+    # Already stored
+    assert _queue("egg")[:2] == ((0, 0, 0), [])
+    # Unknown but close to catalog foods: kNN, not the LLM
+    flags, types, queued = _queue("yellow onion")
+    assert (flags, types) == ((0, 0, 1), ["knn_estimate"])
+    assert "yellow onion" in queued
+    # Nothing similar: no LLM estimate exists outside mock mode, so nothing is stored
+    assert _queue("quinoa")[:2] == ((0, 0, 0), [])
+    assert _queue("quinoa", mock=True)[:2] == ((0, 1, 0), ["llm_estimate"])
+
+
+if __name__ == "__main__":
+    test_top_k_best_first()
+    test_head_noun_bonus()
+    test_nothing_similar_enough()
+    test_estimate_is_weighted_mean_of_close_neighbors()
+    test_missing_nutrients_are_skipped_not_zero()
+    test_fallback_order()
+    print("✅ Nutrition estimator passes")
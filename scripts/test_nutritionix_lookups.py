@@ -0,0 +1,90 @@
+"""Batched Nutritionix lookups against the local stand-in server.
+
+No real API is called: ``food_project.dev.nutritionix_stub_server`` runs
+in-process and counts the requests it sees.  Run with pytest or
+directly:
+
+    python scripts/test_nutritionix_lookups.py
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+import food_project.database.nutritionix_service as nx
+from food_project.dev.nutritionix_stub_server import StubState, start_server, synthesize_food
+from food_project.net import http_client
+
+FIXTURES = {name: synthesize_food(name) for name in ("egg", "butter", "flour", "milk")}
+
+
+@contextmanager
+def stub_api(**faults):
+    """Point the service at a fresh stub; yields its :class:`StubState`."""
+    state = StubState(FIXTURES, latency=0, jitter=0, per_food_latency=0, unknown="skip", **faults)
+    server = start_server(state)
+    saved = (nx.API_URL, nx.NUTRITIONIX_REQUESTS_PER_MINUTE, dict(os.environ))
+    os.environ.update(NUTRITIONIX_APP_ID="stub", NUTRITIONIX_API_KEY="stub")
+    nx.API_URL = f"http://127.0.0.1:{server.server_port}/v2/natural/nutrients"
+    # No limiter file: the stub does not need a request budget
+    nx.NUTRITIONIX_REQUESTS_PER_MINUTE = 0
+    for cached in (nx.get_credentials, nx.get_session, nx.get_limiter):
+        cached.cache_clear()
+    http_client._breakers.pop("nutritionix", None)
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        nx.API_URL, nx.NUTRITIONIX_REQUESTS_PER_MINUTE = saved[:2]
+        os.environ.clear()
+        os.environ.update(saved[2])
+        for cached in (nx.get_credentials, nx.get_session, nx.get_limiter):
+            cached.cache_clear()
+        http_client._breakers.pop("nutritionix", None)
+
+
+def test_unmatched_names_retried_singly():
+    calls, failures = [], {}
+    with stub_api() as state:
+        found = nx.fetch_many_from_api(["egg", "butter", "dragon fruit"], batch_size=3,
+                                       on_call=lambda: calls.append(1), failures=failures)
+        requests = state.snapshot()["requests"]
+    assert set(found) == {"egg", "butter"}
+    assert failures == {"dragon fruit": "not_found"}
+    assert requests == len(calls) == 2
+
+
+def test_failed_batch_not_retried_singly():
+    calls, failures = [], {}
+    with stub_api(error_rate=1.0, error_status=401) as state:
+        found = nx.fetch_many_from_api(list(FIXTURES), batch_size=2,
+                                       on_call=lambda: calls.append(1), failures=failures)
+        requests = state.snapshot()["requests"]
+    assert found == {}
+    # Auth errors say nothing about the foods
+    assert failures == {}
+    assert requests == len(calls) == 2
+
+
+def test_open_circuit_sends_and_counts_nothing():
+    calls = []
+    with stub_api() as state:
+        breaker = http_client.breaker_for("nutritionix")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        found = nx.fetch_many_from_api(list(FIXTURES), batch_size=2, on_call=lambda: calls.append(1))
+        requests = state.snapshot()["requests"]
+    assert found == {}
+    assert requests == len(calls) == 0
+
+
+if __name__ == "__main__":
+    test_unmatched_names_retried_singly()
+    test_failed_batch_not_retried_singly()
+    test_open_circuit_sends_and_counts_nothing()
+    print("✅ Nutritionix batch lookups pass")
@@ -0,0 +1,99 @@
+"""Interrupt a populate run, then resume it; never resume a live run.
+
+Runs ``populate_food_info`` in mock mode on a temporary database, so no
+API is called.  Run with pytest or directly:
+
+    python scripts/test_pipeline_resume.py
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.pipeline_jobs import DONE, PENDING, find_resumable_job, mark_item, start_job
+from food_project.database.sqlite_connector import get_connection, init_db
+from food_project.ingestion.populate_food_info import JOB_TYPE
+
+FOODS = ["egg", "butter", "flour", "milk", "sugar", "salt"]
+
+# Starts a job, finishes two foods, then dies without cleaning up
+CRASHING_RUN = """
+import os, sys
+from pathlib import Path
+from food_project.database.pipeline_jobs import DONE, mark_item, start_job
+from food_project.database.sqlite_connector import get_connection
+conn = get_connection(Path(sys.argv[1]))
+job_id = start_job(conn, {job_type!r}, {{"mock": True}}, {foods!r})
+conn.execute("INSERT INTO food_info (raw_name, normalized_name) VALUES ('egg', 'egg'), ('butter', 'butter')")
+mark_item(conn, job_id, "egg", DONE, commit=False)
+mark_item(conn, job_id, "butter", DONE)
+os._exit(1)
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _new_db(tmp) -> Path:
+    db = Path(tmp) / "food_info.db"
+    conn = get_connection(db)
+    init_db(conn)
+    conn.close()
+    return db
+
+
+def test_interrupted_run_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _new_db(tmp)
+        crash = subprocess.run([sys.executable, "-c", CRASHING_RUN.format(job_type=JOB_TYPE, foods=FOODS), str(db)],
+                               env=_env(), cwd=tmp, capture_output=True, text=True)
+        assert crash.returncode == 1, crash.stderr
+
+        resume = subprocess.run([sys.executable, "-m", "food_project.ingestion.populate_food_info",
+                                 "--db", str(db), "--resume"],
+                                env=_env(), cwd=tmp, capture_output=True, text=True)
+        assert resume.returncode == 0, resume.stderr
+        assert "4 unfinished food(s)" in resume.stdout, resume.stdout
+
+        conn = sqlite3.connect(db)
+        assert conn.execute("SELECT status FROM pipeline_jobs").fetchall() == [("completed",)]
+        names = {r[0] for r in conn.execute("SELECT normalized_name FROM food_info")}
+        assert names == set(FOODS)
+        conn.close()
+
+
+def test_live_run_is_not_resumed():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = get_connection(_new_db(tmp))
+        # Owned by this (live) process, as if another worker were mid-run
+        live = start_job(conn, JOB_TYPE, {"mock": True}, FOODS)
+        mark_item(conn, live, "egg", DONE)
+        assert find_resumable_job(conn, JOB_TYPE) is None
+
+        # An older job whose owner is gone is still found, and claimed
+        with conn:
+            conn.execute("UPDATE pipeline_jobs SET owner_pid = NULL, owner_host = NULL, "
+                         "updated_at = datetime('now', '-1 day')")
+            conn.execute("UPDATE pipeline_job_items SET updated_at = datetime('now', '-1 day')")
+        job = find_resumable_job(conn, JOB_TYPE)
+        assert job is not None and job["id"] == live
+        assert find_resumable_job(conn, JOB_TYPE) is None, "a claimed job must not be handed out twice"
+        pending = conn.execute("SELECT COUNT(*) FROM pipeline_job_items WHERE status = ?", (PENDING,)).fetchone()[0]
+        assert pending == len(FOODS) - 1
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_interrupted_run_resumes()
+    test_live_run_is_not_resumed()
+    print("✅ Pipeline jobs resume only abandoned runs")
@@ -0,0 +1,108 @@
+"""The dry-run planner writes nothing and makes no network calls.
+
+Plans against a temporary copy of ``food_info.db`` with an LLM cache and
+a rate-limit file beside it, with sockets blocked, and checks every file
+is byte-for-byte unchanged afterwards.  Run with pytest or directly:
+
+    python scripts/test_planner.py
+"""
+
+import hashlib
+import os
+import shutil
+import socket
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.database.lookup_failures import record_failures
+from food_project.database.sqlite_connector import get_connection
+from food_project.llm.full_parser import mock_result, template_key
+from food_project.llm.llm_cache import LLMCache
+from food_project.llm.rate_limiter import RateLimiter
+from food_project.processing.ingredient_updater import MODE_QUERIES
+from food_project.processing.planner import plan_populate, plan_update
+
+FOODS = ["egg", "butter", "dragon fruit", "unobtainium"]
+
+
+def _snapshot(directory: Path) -> dict:
+    """``{file name: sha256}``, leaving out SQLite's ``-wal``/``-shm`` sidecar files."""
+    return {p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in sorted(directory.iterdir())
+            if not p.name.endswith(("-wal", "-shm"))}
+
+
+@contextmanager
+def no_network():
+    """Make any attempt to open a connection fail loudly."""
+    def refuse(*args, **kwargs):
+        raise AssertionError(f"network access attempted: {args[1:] or kwargs}")
+
+    saved = socket.socket.connect, socket.socket.connect_ex, socket.create_connection
+    socket.socket.connect = socket.socket.connect_ex = socket.create_connection = refuse
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.socket.connect_ex, socket.create_connection = saved
+
+
+@contextmanager
+def planning_dir():
+    """A cwd holding a DB, LLM cache and rate-limit file, as the pipeline leaves them."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        shutil.copy(ROOT / "food_info.db", tmp / "food_info.db")
+        (tmp / "foods.txt").write_text("\n".join(FOODS) + "\n")
+        os.chdir(tmp)
+        try:
+            conn = get_connection(tmp / "food_info.db")
+            record_failures(conn, {"unobtainium": "not_found"})
+            line = conn.execute("SELECT food_name FROM ingredients LIMIT 1").fetchone()[0]
+            conn.close()
+            cache = LLMCache(tmp / "llm_cache.db", legacy_json=None)
+            cache.set(template_key(line), mock_result())
+            cache.close()
+            limiter = RateLimiter("together", per_day=100, path=tmp / "llm_rate_limit.db")
+            limiter.acquire()
+            limiter._conn.close()
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def test_plans_write_nothing_and_call_nothing():
+    with planning_dir() as tmp:
+        before = _snapshot(tmp)
+        with no_network():
+            for mode in MODE_QUERIES:
+                plan = plan_update(db_path=tmp / "food_info.db", mode=mode)
+                assert plan["rows"] >= 0
+            plan = plan_populate(tmp / "foods.txt", db_path=tmp / "food_info.db")
+        after = _snapshot(tmp)
+        # A read-only open of a WAL database may leave an empty log behind, never data
+        logs = {p.name: p.stat().st_size for p in tmp.glob("*-wal")}
+    assert after == before
+    assert not any(logs.values()), logs
+    assert plan["foods"] == len(FOODS)
+    assert plan["nutritionix_blocked"] == 1
+
+
+def test_network_guard_blocks():
+    with no_network():
+        try:
+            socket.create_connection(("127.0.0.1", 9))
+        except AssertionError:
+            return
+    raise AssertionError("no_network() let a connection through")
+
+
+if __name__ == "__main__":
+    test_plans_write_nothing_and_call_nothing()
+    test_network_guard_blocks()
+    print("✅ Planner makes no writes and no calls")
@@ -0,0 +1,71 @@
+"""The match review page renders standalone and inside ``app.py``.
+
+Runs both scripts with Streamlit's ``AppTest`` against a temporary copy
+of ``food_info.db`` with one fuzzy match.  Run with pytest or directly:
+
+    python scripts/test_review_page.py
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from streamlit.testing.v1 import AppTest
+
+
+@contextmanager
+def fuzzy_match_db():
+    """A cwd whose ``food_info.db`` has one ingredient matched by fuzzy logic."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(ROOT / "food_info.db", Path(tmp) / "food_info.db")
+        conn = sqlite3.connect(Path(tmp) / "food_info.db")
+        with conn:
+            conn.execute("""
+                UPDATE ingredients SET match_type = 'fuzzy', fuzz_score = 88
+                WHERE id = (SELECT MIN(id) FROM ingredients WHERE matched_food_id IN (SELECT id FROM food_info))
+            """)
+        conn.close()
+        os.chdir(tmp)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def _review_controls(block):
+    return [b.label for b in block.button]
+
+
+def test_standalone_page():
+    with fuzzy_match_db():
+        at = AppTest.from_file(str(ROOT / "food_project" / "ui" / "review_matches_app.py"), default_timeout=60).run()
+    assert not at.exception
+    assert [t.value for t in at.title] == ["🔍 Review Ingredient Matches"]
+    assert len(at.expander) == 1
+    assert _review_controls(at) == ["✅ Approve", "❌ Reject"]
+
+
+def test_page_in_app_review_tab():
+    with fuzzy_match_db():
+        at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+        at.secrets["general"] = {"STREAMLIT_BRANCH": "main"}
+        at.run()
+    assert not at.exception
+    review_tab = at.tabs[1]
+    assert len(review_tab.expander) == 1
+    assert _review_controls(review_tab) == ["✅ Approve", "❌ Reject"]
+
+
+if __name__ == "__main__":
+    test_standalone_page()
+    test_page_in_app_review_tab()
+    print("✅ Review page renders in both entry points")
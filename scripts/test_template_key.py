@@ -0,0 +1,80 @@
+"""Template cache keys for LLM parses, and the amounts filled back in.
+
+Lines that differ only in quantity share one key; anything else that
+tells foods apart must not.  Uses a temporary cache.  Run with pytest or
+directly:
+
+    python scripts/test_template_key.py
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.llm import full_parser, llm_cache
+from food_project.llm.async_parser import AsyncLLMParser
+from food_project.llm.full_parser import parse_with_llm, template_key, with_local_amount
+from food_project.llm.llm_cache import LLMCache
+from food_project.processing.normalization import parse_ingredient
+
+
+def test_quantities_share_a_key():
+    assert template_key("2 cups flour") == template_key("1 Cup  Flour") == template_key("1½ cups flour")
+    assert template_key("1-2 tbsp oil") == template_key("3 tbsp oil")
+
+
+def test_numbers_that_name_a_food_are_kept():
+    assert template_key("1 (14 oz) can tomatoes") != template_key("1 (28 oz) can tomatoes")
+    assert template_key("1 can 7up") != template_key("1 can 8up")
+    assert "7up" in template_key("2 cans 7up")
+    assert template_key("1 cup 2% milk") != template_key("1 cup 1% milk")
+
+
+def test_lines_without_a_local_amount_keep_their_own_key():
+    # The parser cannot read an amount here, so no other line's answer may be reused
+    assert parse_ingredient("salt, 1 tsp")[0] is None
+    assert template_key("salt, 1 tsp") != template_key("salt, 2 tsp")
+    answer = {"food": "salt", "amount": 1, "unit": "tsp", "normalized_name": "salt"}
+    assert with_local_amount(answer, "salt, 1 tsp") == answer
+
+
+def test_local_amount_filled_in():
+    answer = {"food": "flour", "amount": 2, "unit": "cup", "normalized_name": "flour"}
+    assert with_local_amount(answer, "1½ cups flour")["amount"] == 1.5
+
+
+def test_unicode_fraction_after_whole_number():
+    # "1½" must read as 1 1/2, not 11/2
+    assert parse_ingredient("1½ cups flour")[0] == 1.5
+    assert parse_ingredient("½ cup sugar")[0] == 0.5
+
+
+def test_mock_results_are_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(Path(tmp) / "llm_cache.db", legacy_json=None)
+        saved = llm_cache._default_cache
+        llm_cache._default_cache = cache
+        try:
+            assert parse_with_llm("2 cups flour", mock=True)["food"] == full_parser.mock_result()["food"]
+            parser = AsyncLLMParser(mock=True, cache=cache)
+            results = asyncio.run(parser.parse_many(["3 cups sugar", "1 cup milk"]))
+            assert len(results) == 2
+            assert len(cache) == 0
+        finally:
+            llm_cache._default_cache = saved
+            cache.close()
+
+
+if __name__ == "__main__":
+    test_quantities_share_a_key()
+    test_numbers_that_name_a_food_are_kept()
+    test_lines_without_a_local_amount_keep_their_own_key()
+    test_local_amount_filled_in()
+    test_unicode_fraction_after_whole_number()
+    test_mock_results_are_not_cached()
+    print("✅ LLM template keys pass")
@@ -0,0 +1,63 @@
+"""Misparsed ingredient names must still go to the LLM.
+
+Regression cases from rule-based parses whose leftover unit words,
+connectors or hyphens used to be waved through as clean new foods.  Run
+with pytest or directly:
+
+    python scripts/test_validator_scoring.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Add project root to Python path
+sys.path.append(str(ROOT))
+
+from food_project.processing.ingredient_updater import CONFIDENCE_THRESHOLD
+from food_project.processing.validator import FoodIndex, parse_quality, score_food_match
+
+CATALOG = FoodIndex([
+    "salt", "kosher salt", "black pepper", "sage", "olive oil", "black olive", "kalamata olive",
+    "zucchini", "red pepper flake", "parmesan cheese", "chicken thigh", "garlic clove",
+])
+
+MISPARSES = [
+    "salt teaspoon",
+    "sage or teaspoon",
+    "tbsp olive oil",
+    "kalamata olive to",
+    "zucchini -inch stick",
+    "kosher salt pepper",
+    "red pepper flake to",
+]
+
+
+def test_misparses_need_llm():
+    for name in MISPARSES:
+        score = score_food_match(name, CATALOG)
+        assert score < CONFIDENCE_THRESHOLD, f"{name!r} scored {score:.1f}"
+
+
+def test_misparses_have_low_parse_quality():
+    for name in MISPARSES:
+        if name != "kosher salt pepper":
+            assert parse_quality(name) < 50, name
+
+
+def test_clean_names_skip_llm():
+    assert score_food_match("garlic clove", CATALOG) == 100.0
+    assert score_food_match("parmesan chese", CATALOG) >= CONFIDENCE_THRESHOLD
+
+
+def test_parse_quality_is_a_bonus_not_a_floor():
+    # Clean but unlike anything in the catalog
+    assert score_food_match("dragon fruit", CATALOG) < CONFIDENCE_THRESHOLD
+
+
+if __name__ == "__main__":
+    test_misparses_need_llm()
+    test_misparses_have_low_parse_quality()
+    test_clean_names_skip_llm()
+    test_parse_quality_is_a_bonus_not_a_floor()
+    print("✅ Validator scoring regressions pass")
@@ -9,6 +9,7 @@ import time  # for optional sleep during debug
 from food_project.ingestion.parse_recipe_url import parse_recipe
 from food_project.database.sqlite_connector import save_recipe_and_ingredients
 from food_project.processing.ingredient_updater import update_ingredients
+from food_project.ui.progress_view import streamlit_reporter
 from food_project.ingestion.match_ingredients_to_food_info import match_ingredients
 
 # Print current working directory for debugging purposes
@@ -114,7 +115,7 @@ if selected_id:
     if not st.session_state.update_done:
         st.write("⚙️ Starting update_ingredients and match_ingredients...")
         with st.spinner("🔄 Parsing and matching ingredients..."):
-            update_ingredients(mode="full")
+            update_ingredients(mode="full", progress=streamlit_reporter())
             match_ingredients()
         st.session_state.update_done = True
         st.success("✅ Parsing + Matching complete.")